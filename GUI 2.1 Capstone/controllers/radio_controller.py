@@ -2,6 +2,7 @@ import serial
 import threading
 import time
 import logging
+from utils.framing import StreamFramer
 
 class RadioController:
     def __init__(self, telemetry_model):
@@ -17,6 +18,16 @@ class RadioController:
         self.CONTROL_TO_POWER_HEADER = b'\xAA\xBB'  # Example header bytes
         self.POWER_TO_CONTROL_HEADER = b'\xCC\xDD'  # Example header bytes
         self.PACKET_FOOTER = b'\xEE\xFF'  # Example footer bytes
+        
+        self.framer = StreamFramer({
+            self.CONTROL_TO_POWER_HEADER: "control_to_power",
+            self.POWER_TO_CONTROL_HEADER: "power_to_control",
+        }, self.PACKET_FOOTER)
+        self.parsers = {
+            "control_to_power": self.telemetry_model.parse_control_to_power_packet,
+            "power_to_control": self.telemetry_model.parse_power_to_control_packet,
+        }
+        self.parse_errors = 0
     
     def register_connection_callback(self, callback):
         """Register a callback to be notified of connection status changes"""
@@ -67,7 +78,7 @@ class RadioController:
     
     def _receive_loop(self):
         """Main receive loop to process incoming packets"""
-        buffer = bytearray()
+        self.framer.reset()
         
         while self.running:
             try:
@@ -75,9 +86,7 @@ class RadioController:
                     # Read data from serial port
                     data = self.serial.read(256)
                     if data:
-                        # Add to buffer and process
-                        buffer.extend(data)
-                        self._process_buffer(buffer)
+                        self._process_data(data)
                         
                 # Small delay to prevent CPU hogging
                 time.sleep(0.01)
@@ -86,43 +95,14 @@ class RadioController:
                 self.logger.error(f"Error in receive loop: {e}")
                 time.sleep(1.0)
     
-    def _process_buffer(self, buffer):
-        """Process the buffer for complete packets"""
-        # Look for Control to Power packets
-        self._find_and_process_packet(buffer, self.CONTROL_TO_POWER_HEADER, 
-                                     self.telemetry_model.parse_control_to_power_packet)
-        
-        # Look for Power to Control packets
-        self._find_and_process_packet(buffer, self.POWER_TO_CONTROL_HEADER,
-                                     self.telemetry_model.parse_power_to_control_packet)
-        
-        # Prevent buffer from growing too large
-        if len(buffer) > 1024:
-            del buffer[:-512]  # Keep the last 512 bytes
+    def _process_data(self, data):
+        """Frame received bytes and parse the complete packets"""
+        for packet_type, packet_data in self.framer.feed(data):
+            if not self.parsers[packet_type](packet_data):
+                self.parse_errors += 1
     
-    def _find_and_process_packet(self, buffer, header, parser_func):
-        """Find and process packets with the given header"""
-        header_pos = 0
-        
-        while True:
-            # Find header starting from current position
-            header_pos = buffer.find(header, header_pos)
-            if header_pos == -1:
-                break  # No more headers found
-            
-            # Look for footer after header
-            footer_pos = buffer.find(self.PACKET_FOOTER, header_pos + len(header))
-            if footer_pos == -1:
-                break  # No complete packet found
-            
-            # Extract packet data between header and footer
-            packet_data = buffer[header_pos + len(header):footer_pos]
-            
-            # Parse the packet
-            if parser_func(packet_data):
-                # Successfully parsed, remove packet from buffer
-                del buffer[:footer_pos + len(self.PACKET_FOOTER)]
-                header_pos = 0  # Start from beginning of new buffer
-            else:
-                # Parse failed, move to next header position
-                header_pos += len(header)
\ No newline at end of file
+    def get_framing_stats(self):
+        """Framer statistics plus packets the telemetry model rejected"""
+        stats = self.framer.get_stats()
+        stats['parse_errors'] = self.parse_errors
+        return stats
@@ -3,6 +3,7 @@ import threading
 import queue
 import time
 from PyQt5.QtCore import QObject, pyqtSignal
+from utils.framing import StreamFramer
 
 class SerialController(QObject):
     """Controller for serial port communications"""
@@ -20,6 +21,12 @@ class SerialController(QObject):
         self.read_thread = None
         self.stop_thread = False
         self.data_callbacks = []
+        
+        # Binary packet framing (see process_buffer)
+        self.framer = StreamFramer({
+            b'\xAA\xBB': "control_to_power",  # Example header bytes
+            b'\xEE\xFF': "power_to_control",  # Example header bytes
+        }, footer=b'\xCC\xDD')  # Example footer bytes
     
     def get_available_ports(self):
         """Get list of available serial ports"""
@@ -107,51 +114,17 @@ class SerialController(QObject):
 
     def process_buffer(self, buffer):
         """Process the buffer for packets"""
-        # Define packet markers
-        CONTROL_TO_POWER_HEADER = b'\xAA\xBB'  # Example header bytes
-        POWER_TO_CONTROL_HEADER = b'\xEE\xFF'  # Example header bytes
-        PACKET_FOOTER = b'\xCC\xDD'  # Example footer bytes
-        
-        # Process buffer until no complete packets remain
-        while len(buffer) >= 4:  # Minimum size for header + footer
-            # Check for Control to Power packet
-            if buffer[0:2] == CONTROL_TO_POWER_HEADER:
-                # Find packet end
-                for i in range(2, len(buffer) - 1):
-                    if buffer[i:i+2] == PACKET_FOOTER:
-                        packet_data = buffer[2:i]
-                        # Notify callbacks with packet data
-                        for callback in self.data_callbacks:
-                            callback(packet_data, "control_to_power")
-                        # Remove processed packet from buffer
-                        del buffer[:i+2]
-                        break
-                else:
-                    # No complete packet found
-                    if len(buffer) > 1024:  # Prevent buffer from growing too large
-                        del buffer[0]
-                    break
-                    
-            # Check for Power to Control packet
-            elif buffer[0:2] == POWER_TO_CONTROL_HEADER:
-                # Find packet end
-                for i in range(2, len(buffer) - 1):
-                    if buffer[i:i+2] == PACKET_FOOTER:
-                        packet_data = buffer[2:i]
-                        # Notify callbacks with packet data
-                        for callback in self.data_callbacks:
-                            callback(packet_data, "power_to_control")
-                        # Remove processed packet from buffer
-                        del buffer[:i+2]
-                        break
-                else:
-                    # No complete packet found
-                    if len(buffer) > 1024:  # Prevent buffer from growing too large
-                        del buffer[0]
-                    break
-            else:
-                # Unknown packet type, discard first byte and continue
-                del buffer[0]
+        # The framer keeps any incomplete packet, so the caller's buffer is consumed entirely
+        data = bytes(buffer)
+        del buffer[:]
+        for packet_type, packet_data in self.framer.feed(data):
+            # Notify callbacks with packet data
+            for callback in self.data_callbacks:
+                callback(packet_data, packet_type)
+
+    def get_framing_stats(self):
+        """Bytes, frames, dropped bytes and framing errors seen by process_buffer"""
+        return self.framer.get_stats()
 
     def register_data_callback(self, callback):
         """Register a callback to receive data packets"""
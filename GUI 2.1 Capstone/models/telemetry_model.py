@@ -1,7 +1,7 @@
 from PyQt5.QtCore import QObject, pyqtSignal
 import time
-import struct
 import logging
+from utils.packet_structs import decode_control_to_power, decode_power_to_control
 
 class TelemetryModel(QObject):
     """
@@ -107,6 +107,8 @@ class TelemetryModel(QObject):
             "time_to_landing": 0
         }
         self.callbacks = []
+        # Callbacks run on the GUI thread even when a radio thread parsed the packet
+        self.data_updated.connect(self._notify_callbacks)
         self.last_altitude = 0
         self.last_altitude_time = time.time()
         self.packet_count = 0
@@ -203,52 +205,12 @@ class TelemetryModel(QObject):
     def parse_control_to_power_packet(self, data):
         """Parse packet from Control to Power board"""
         try:
-            # Check minimum packet size
-            if len(data) < 0x34:  # Minimum size without variable length
+            # One unpack_from straight into telemetry_data (utils/packet_structs.py)
+            if not decode_control_to_power(data, self.telemetry_data):
                 return False
             
-            # Parse fixed length fields
-            timestamp = struct.unpack("<I", data[0x00:0x04])[0]
-            pressure = struct.unpack("<I", data[0x04:0x08])[0]
-            altitude = struct.unpack("<I", data[0x08:0x0C])[0]
-            temperature = struct.unpack("<I", data[0x0C:0x10])[0]
-            linear_accel_x = struct.unpack("<f", data[0x10:0x14])[0]
-            linear_accel_y = struct.unpack("<f", data[0x14:0x18])[0]
-            linear_accel_z = struct.unpack("<f", data[0x18:0x1C])[0]
-            angular_vel_x = struct.unpack("<f", data[0x1C:0x20])[0]
-            angular_vel_y = struct.unpack("<f", data[0x20:0x24])[0]
-            angular_vel_z = struct.unpack("<f", data[0x24:0x28])[0]
-            orientation_yaw = struct.unpack("<f", data[0x28:0x2C])[0]
-            orientation_pitch = struct.unpack("<f", data[0x2C:0x30])[0]
-            orientation_roll = struct.unpack("<f", data[0x30:0x34])[0]
-            
-            # Update telemetry data
-            self.telemetry_data["timestamp"] = timestamp
-            self.telemetry_data["pressure"] = pressure
-            self.telemetry_data["altitude"] = altitude
-            self.telemetry_data["temperature"] = temperature
-            self.telemetry_data["linear_accel_x"] = linear_accel_x
-            self.telemetry_data["linear_accel_y"] = linear_accel_y
-            self.telemetry_data["linear_accel_z"] = linear_accel_z
-            self.telemetry_data["angular_vel_x"] = angular_vel_x
-            self.telemetry_data["angular_vel_y"] = angular_vel_y
-            self.telemetry_data["angular_vel_z"] = angular_vel_z
-            self.telemetry_data["orientation_yaw"] = orientation_yaw
-            self.telemetry_data["orientation_pitch"] = orientation_pitch
-            self.telemetry_data["orientation_roll"] = orientation_roll
-            
-            # Parse variable-length status message if present
-            if len(data) >= 0x36:  # Has at least the message length field
-                status_msg_length = struct.unpack("<H", data[0x34:0x36])[0]
-                
-                if len(data) >= 0x36 + status_msg_length:
-                    try:
-                        self.telemetry_data["status_msg"] = data[0x36:0x36+status_msg_length].decode('utf-8', errors='replace')
-                    except Exception as e:
-                        logging.error(f"Error decoding status message: {e}")
-            
             # Notify subscribers
-            self.data_updated.emit(self.telemetry_data)
+            self.data_updated.emit()
             return True
             
         except Exception as e:
@@ -258,33 +220,11 @@ class TelemetryModel(QObject):
     def parse_power_to_control_packet(self, data):
         """Parse packet from Power to Control board"""
         try:
-            # Check minimum packet size
-            if len(data) < 0x11:  # Minimum size without variable length
+            if not decode_power_to_control(data, self.telemetry_data):
                 return False
             
-            # Parse fixed length fields
-            transponder_timestamp = struct.unpack("<I", data[0x00:0x04])[0]
-            battery_voltage = struct.unpack("<f", data[0x04:0x08])[0]
-            latitude = struct.unpack("<f", data[0x08:0x0C])[0]
-            longitude = struct.unpack("<f", data[0x0C:0x10])[0]
-            abort_command = bool(data[0x10])
-            
-            # Update telemetry data
-            self.telemetry_data["transponder_timestamp"] = transponder_timestamp
-            self.telemetry_data["battery_voltage"] = battery_voltage
-            self.telemetry_data["latitude"] = latitude
-            self.telemetry_data["longitude"] = longitude
-            self.telemetry_data["abort_command"] = abort_command
-            
-            # Parse status message + heartbeat if present
-            if len(data) > 0x11:
-                try:
-                    self.telemetry_data["status_heartbeat"] = data[0x11:].decode('utf-8', errors='replace')
-                except Exception as e:
-                    logging.error(f"Error decoding status heartbeat: {e}")
-            
             # Notify subscribers
-            self.data_updated.emit(self.telemetry_data)
+            self.data_updated.emit()
             return True
             
         except Exception as e:
@@ -0,0 +1,126 @@
+"""
+Benchmark: Capstone packet framing on random noise mixed with valid frames.
+
+Compares the byte-at-a-time SerialController.process_buffer loop and the
+RadioController header/footer search it replaced with utils.framing.StreamFramer.
+The stream is fed in 256-byte reads, like RadioController._receive_loop does.
+
+Usage (from the GUI 2.1 Capstone directory):
+    python testing/bench_framing.py
+    python testing/bench_framing.py --frames 5000 --noise 0.5
+"""
+
+import os
+import random
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from utils.framing import StreamFramer
+
+C2P_HEADER = b'\xAA\xBB'
+P2C_HEADER = b'\xEE\xFF'
+FOOTER = b'\xCC\xDD'
+
+
+def legacy_process_buffer(buffer, callback):
+    """SerialController.process_buffer before the shared framer"""
+    while len(buffer) >= 4:
+        if buffer[0:2] == C2P_HEADER or buffer[0:2] == P2C_HEADER:
+            packet_type = "control_to_power" if buffer[0:2] == C2P_HEADER else "power_to_control"
+            for i in range(2, len(buffer) - 1):
+                if buffer[i:i+2] == FOOTER:
+                    callback(buffer[2:i], packet_type)
+                    del buffer[:i+2]
+                    break
+            else:
+                if len(buffer) > 1024:
+                    del buffer[0]
+                break
+        else:
+            del buffer[0]
+
+
+def legacy_radio_process_buffer(buffer, callback):
+    """RadioController._process_buffer before the shared framer (parsers always succeed)"""
+    for header, packet_type in ((C2P_HEADER, "control_to_power"), (P2C_HEADER, "power_to_control")):
+        header_pos = 0
+        while True:
+            header_pos = buffer.find(header, header_pos)
+            if header_pos == -1:
+                break
+            footer_pos = buffer.find(FOOTER, header_pos + len(header))
+            if footer_pos == -1:
+                break
+            callback(buffer[header_pos + len(header):footer_pos], packet_type)
+            del buffer[:footer_pos + len(FOOTER)]
+            header_pos = 0
+    if len(buffer) > 1024:
+        del buffer[:-512]
+
+
+def make_frame(rng):
+    """A control-to-power or power-to-control frame whose payload contains no marker bytes"""
+    while True:
+        if rng.random() < 0.5:
+            message = b'OK'
+            payload = struct.pack('<IIII9fH', rng.getrandbits(32), 101325, 1200, 25,
+                                  *[rng.uniform(-10, 10) for _ in range(9)], len(message)) + message
+            header = C2P_HEADER
+        else:
+            payload = struct.pack('<Ifff?', rng.getrandbits(32), rng.uniform(3, 4.2),
+                                  rng.uniform(45, 46), rng.uniform(-74, -73), True) + b'alive'
+            header = P2C_HEADER
+        if all(marker not in payload for marker in (C2P_HEADER, P2C_HEADER, FOOTER)):
+            return header + payload + FOOTER
+
+
+def make_stream(frames, noise, seed=1):
+    """Valid frames separated by random noise; noise is the fraction of noise bytes"""
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(frames):
+        frame = make_frame(rng)
+        if rng.random() < noise:
+            parts.append(bytes(rng.getrandbits(8) for _ in range(int(len(frame) * noise / (1 - noise) * 2))))
+        parts.append(frame)
+    return b''.join(parts)
+
+
+def run_legacy(process, stream, chunk=256):
+    found = []
+    buffer = bytearray()
+    start = time.perf_counter()
+    for offset in range(0, len(stream), chunk):
+        buffer.extend(stream[offset:offset + chunk])
+        process(buffer, lambda data, packet_type: found.append(packet_type))
+    return time.perf_counter() - start, len(found)
+
+
+def run_framer(stream, chunk=256):
+    framer = StreamFramer({C2P_HEADER: "control_to_power", P2C_HEADER: "power_to_control"}, FOOTER)
+    found = 0
+    start = time.perf_counter()
+    for offset in range(0, len(stream), chunk):
+        found += len(framer.feed(stream[offset:offset + chunk]))
+    return time.perf_counter() - start, found, framer.get_stats()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Capstone framing benchmark')
+    parser.add_argument('--frames', type=int, default=2000, help='Valid frames in the stream')
+    parser.add_argument('--noise', type=float, default=0.3, help='Approximate fraction of noise bytes (0-0.9)')
+    parser.add_argument('--chunk', type=int, default=256, help='Bytes per simulated read')
+    args = parser.parse_args()
+
+    stream = make_stream(args.frames, min(args.noise, 0.9))
+    print(f"{len(stream)} bytes, {args.frames} frames")
+    for name, process in (("legacy serial", legacy_process_buffer), ("legacy radio", legacy_radio_process_buffer)):
+        elapsed, found = run_legacy(process, stream, args.chunk)
+        print(f"{name:14s} {len(stream) / elapsed / 1e6:8.2f} MB/s  {found:6d} frames")
+    elapsed, found, stats = run_framer(stream, args.chunk)
+    print(f"{'StreamFramer':14s} {len(stream) / elapsed / 1e6:8.2f} MB/s  {found:6d} frames  "
+          f"dropped {stats['dropped_bytes']} bytes, {stats['framing_errors']} framing errors")
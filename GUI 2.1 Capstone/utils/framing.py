@@ -0,0 +1,96 @@
+"""
+Streaming framer for header/footer delimited binary packets.
+
+Shared by SerialController and RadioController, which use different markers
+for the same two packet types. Received bytes are appended to one buffer and
+scanned with a compiled header pattern and bytes.find(), resuming where the
+previous scan stopped, so resynchronizing on a noisy link takes amortized
+linear time instead of dropping one byte per pass.
+"""
+
+import re
+
+
+class StreamFramer:
+    """Split a byte stream into (packet_type, payload) frames"""
+
+    def __init__(self, headers, footer, max_payload=256):
+        """
+        Args:
+            headers: dict of header bytes -> packet type name
+            footer: footer bytes closing every frame
+            max_payload: a header with no footer within this many bytes is a framing error
+        """
+        self.headers = dict(headers)
+        self.footer = footer
+        self.max_payload = max_payload
+        self.header_pattern = re.compile(b'|'.join(re.escape(header) for header in self.headers))
+        self.buffer = bytearray()
+        self._keep = max(len(header) for header in self.headers) - 1 # Header split across reads
+        self._footer_from = 0 # Footer already searched up to here for the frame at the buffer start
+
+        # Statistics
+        self.bytes_in = 0
+        self.frames = 0
+        self.dropped_bytes = 0 # Bytes that were not part of any frame
+        self.framing_errors = 0 # Headers without a footer within max_payload
+
+    def feed(self, data):
+        """Add received bytes and return the completed frames"""
+        buffer = self.buffer
+        buffer += data
+        self.bytes_in += len(data)
+
+        frames = []
+        footer = self.footer
+        window = self.max_payload + len(footer)
+        end = len(buffer)
+        pos = 0
+        while True:
+            match = self.header_pattern.search(buffer, pos)
+            if match is None:
+                # Only noise left - keep what could be the start of a header
+                keep_from = max(pos, end - self._keep)
+                self.dropped_bytes += keep_from - pos
+                pos = keep_from
+                self._footer_from = 0
+                break
+
+            start = match.start()
+            self.dropped_bytes += start - pos
+            payload_start = match.end()
+            footer_pos = buffer.find(footer, max(payload_start, self._footer_from), min(end, payload_start + window))
+            if footer_pos >= 0:
+                frames.append((self.headers[match.group()], bytes(buffer[payload_start:footer_pos])))
+                self.frames += 1
+                pos = footer_pos + len(footer)
+                self._footer_from = 0
+            elif end - payload_start >= window:
+                # False header or lost footer - resync on the next header
+                self.framing_errors += 1
+                self.dropped_bytes += 1
+                pos = start + 1
+                self._footer_from = 0
+            else:
+                # Incomplete frame, wait for more data without rescanning what was searched
+                pos = start
+                self._footer_from = max(payload_start, end - len(footer) + 1)
+                break
+
+        if pos:
+            del buffer[:pos]
+            self._footer_from = max(0, self._footer_from - pos)
+        return frames
+
+    def reset(self):
+        self.buffer.clear()
+        self._footer_from = 0
+
+    def get_stats(self):
+        return {
+            'bytes_in': self.bytes_in,
+            'frames': self.frames,
+            'dropped_bytes': self.dropped_bytes,
+            'framing_errors': self.framing_errors,
+            'buffered_bytes': len(self.buffer),
+        }
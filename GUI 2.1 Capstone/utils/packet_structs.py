@@ -0,0 +1,97 @@
+"""
+Precompiled layouts of the Control <-> Power board packets.
+
+See "Communication Data Structure.csv". Each fixed section is one
+struct.Struct, decoded with a single unpack_from() on a memoryview of the
+frame payload (no slicing), plus a matching NumPy dtype for decoding many
+captured frames at once with np.frombuffer().
+"""
+
+import struct
+
+import numpy as np
+
+# Control to Power board: fixed section, then an optional uint16 message length and message
+CONTROL_TO_POWER_FIELDS = (
+    "timestamp", "pressure", "altitude", "temperature",
+    "linear_accel_x", "linear_accel_y", "linear_accel_z",
+    "angular_vel_x", "angular_vel_y", "angular_vel_z",
+    "orientation_yaw", "orientation_pitch", "orientation_roll",
+)
+CONTROL_TO_POWER = struct.Struct("<4I9f") # 0x00-0x33
+CONTROL_TO_POWER_MSG_LENGTH = struct.Struct("<H") # 0x34
+CONTROL_TO_POWER_DTYPE = np.dtype(
+    [(name, "<u4") for name in CONTROL_TO_POWER_FIELDS[:4]] +
+    [(name, "<f4") for name in CONTROL_TO_POWER_FIELDS[4:]])
+
+# Power to Control board: fixed section, then the status message + heartbeat
+POWER_TO_CONTROL_FIELDS = (
+    "transponder_timestamp", "battery_voltage", "latitude", "longitude", "abort_command",
+)
+POWER_TO_CONTROL = struct.Struct("<I3f?") # 0x00-0x10
+POWER_TO_CONTROL_DTYPE = np.dtype([
+    ("transponder_timestamp", "<u4"), ("battery_voltage", "<f4"),
+    ("latitude", "<f4"), ("longitude", "<f4"), ("abort_command", "?"),
+])
+
+
+def decode_control_to_power(data, record):
+    """Decode a Control to Power payload into `record` (a dict updated in place); False if too short"""
+    view = memoryview(data)
+    if len(view) < CONTROL_TO_POWER.size:
+        return False
+    record.update(zip(CONTROL_TO_POWER_FIELDS, CONTROL_TO_POWER.unpack_from(view)))
+
+    # Variable-length status message, if present
+    message_start = CONTROL_TO_POWER.size + CONTROL_TO_POWER_MSG_LENGTH.size
+    if len(view) >= message_start:
+        length, = CONTROL_TO_POWER_MSG_LENGTH.unpack_from(view, CONTROL_TO_POWER.size)
+        if len(view) >= message_start + length:
+            record["status_msg"] = str(view[message_start:message_start + length], 'utf-8', 'replace')
+    return True
+
+
+def decode_power_to_control(data, record):
+    """Decode a Power to Control payload into `record` (a dict updated in place); False if too short"""
+    view = memoryview(data)
+    if len(view) < POWER_TO_CONTROL.size:
+        return False
+    record.update(zip(POWER_TO_CONTROL_FIELDS, POWER_TO_CONTROL.unpack_from(view)))
+
+    # Status message + heartbeat, if present
+    if len(view) > POWER_TO_CONTROL.size:
+        record["status_heartbeat"] = str(view[POWER_TO_CONTROL.size:], 'utf-8', 'replace')
+    return True
+
+
+def decode_batch(payloads, layout, dtype):
+    """Decode the fixed section of many payloads into one structured array.
+
+    Payloads shorter than the layout are skipped; variable-length messages
+    are not included.
+    """
+    size = layout.size
+    fixed = b''.join(payload[:size] for payload in payloads if len(payload) >= size)
+    return np.frombuffer(fixed, dtype=dtype)
+
+
+def decode_control_to_power_batch(payloads):
+    return decode_batch(payloads, CONTROL_TO_POWER, CONTROL_TO_POWER_DTYPE)
+
+
+def decode_power_to_control_batch(payloads):
+    return decode_batch(payloads, POWER_TO_CONTROL, POWER_TO_CONTROL_DTYPE)
+
+
+def decode_recording(data, framer):
+    """Frame a raw byte recording with a StreamFramer and batch-decode every packet type.
+
+    Returns {"control_to_power": array, "power_to_control": array}.
+    """
+    payloads = {"control_to_power": [], "power_to_control": []}
+    for packet_type, payload in framer.feed(data):
+        payloads[packet_type].append(payload)
+    return {
+        "control_to_power": decode_control_to_power_batch(payloads["control_to_power"]),
+        "power_to_control": decode_power_to_control_batch(payloads["power_to_control"]),
+    }
@@ -7,6 +7,7 @@ Analyzes flight log data, creates Google Earth KML files, and generates analysis
 import os
 import sys
 import re
+import gzip
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
@@ -16,6 +17,19 @@ from xml.etree.ElementTree import Element, SubElement, tostring
 from xml.dom import minidom
 import argparse
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from utils.packet_batch import decode_fc_batch
+from utils.derived_metrics import WINDOW_S, windowed_slope
+from utils.flight_history import FlightHistory
+from utils.telemetry_query import TelemetryQuery
+from utils.flight_recorder import FlightRecording
+from utils.packet_schema import FC_FIELDS
+
+
+def open_log(path):
+    """Open a text log, gzip-compressed (.gz) or not"""
+    return gzip.open(path, 'rt') if path.endswith('.gz') else open(path, 'r')
+
 
 class FlightLogAnalyzer:
     """Main class for analyzing flight log data"""
@@ -36,59 +50,84 @@ class FlightLogAnalyzer:
         
     def parse_flight_log(self):
         """Parse the flight log file and extract FC packet data"""
+        if self.log_file_path.endswith('.gsrec'):
+            return self.load_flight_recording()
         print("Parsing flight log...")
         
-        fc_packets = []
-        gs_packets = []
+        log_date = self._extract_date_from_filename()  # Assuming log date is from the filename
+        line_pattern = re.compile(r'\[(\d{2}:\d{2}:\d{2}\.\d{3})\]\s+(.+)')
+        times = []
+        contents = []
         
-        with open(self.log_file_path, 'r') as file:
+        with open_log(self.log_file_path) as file:
             for line in file:
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                # Extract timestamp and packet type
-                timestamp_match = re.match(r'\[(\d{2}:\d{2}:\d{2}\.\d{3})\]\s+(.+)', line)
-                if not timestamp_match:
-                    continue
-                    
-                timestamp_str = timestamp_match.group(1)
-                packet_content = timestamp_match.group(2)
-                
-                # Convert timestamp to datetime
-                try:
-                    # Assuming log date is from the filename
-                    log_date = self._extract_date_from_filename()
-                    timestamp = datetime.strptime(f"{log_date} {timestamp_str}", "%Y-%m-%d %H:%M:%S.%f")
-                    
-                    if self.start_time is None:
-                        self.start_time = timestamp
-                        
-                except ValueError:
-                    continue
-                
-                # Parse FC packets
-                if packet_content.startswith('FC:'):
-                    fc_data = self._parse_fc_packet(packet_content[3:], timestamp)
-                    if fc_data:
-                        fc_packets.append(fc_data)
-                        
-                # Parse GS packets  
-                elif packet_content.startswith('GS:'):
-                    gs_data = self._parse_gs_packet(packet_content[3:], timestamp)
-                    if gs_data:
-                        gs_packets.append(gs_data)
-        
-        # Convert to DataFrames
-        self.flight_data = pd.DataFrame(fc_packets) if fc_packets else pd.DataFrame()
+                # Extract timestamp and packet content
+                timestamp_match = line_pattern.match(line.strip())
+                if timestamp_match:
+                    times.append(timestamp_match.group(1))
+                    contents.append(timestamp_match.group(2))
+        
+        # Convert all timestamps at once; lines with an invalid one are dropped
+        timestamps = pd.to_datetime([f"{log_date} {t}" for t in times],
+                                    format="%Y-%m-%d %H:%M:%S.%f", errors='coerce')
+        valid = ~timestamps.isna()
+        if valid.any():
+            self.start_time = timestamps[valid][0]
+        
+        fc_lines = [i for i, content in enumerate(contents) if valid[i] and content.startswith('FC:')]
+        gs_lines = [i for i, content in enumerate(contents) if valid[i] and content.startswith('GS:')]
+        
+        # Parse FC packets in one batch with the same layout as the live telemetry controller
+        fc_data = decode_fc_batch([contents[i] for i in fc_lines], prefix='FC:', min_fields=20, fill_defaults=True)
+        fc_rows = np.asarray(fc_lines, dtype=np.int64)[fc_data.pop('row')]
+        if len(fc_rows):
+            fc_timestamps = timestamps[fc_rows]
+            self.flight_data = pd.DataFrame(fc_data)
+            self.flight_data['timestamp'] = fc_timestamps
+            self.flight_data['time_elapsed'] = (fc_timestamps - self.start_time).total_seconds()
+            self.flight_data['led_status'] = (self.flight_data['photodiode_value1'] > 5) | (self.flight_data['photodiode_value2'] > 5)
+        else:
+            self.flight_data = pd.DataFrame()
+        
+        # Parse GS packets
+        gs_packets = []
+        for i in gs_lines:
+            gs_data = self._parse_gs_packet(contents[i][3:], timestamps[i])
+            if gs_data:
+                gs_packets.append(gs_data)
         self.gs_data = pd.DataFrame(gs_packets) if gs_packets else pd.DataFrame()
         
         # Calculate vertical speed if we have flight data
         if not self.flight_data.empty:
             self._calculate_vertical_speed()
         
-        print(f"Parsed {len(fc_packets)} FC packets and {len(gs_packets)} GS packets")
+        print(f"Parsed {len(self.flight_data)} FC packets and {len(gs_packets)} GS packets")
+        
+        return self.flight_data
+    
+    def load_flight_recording(self):
+        """Load FC packet data from a binary flight recording (.gsrec) instead of parsing text"""
+        print("Loading flight recording...")
+        recording = FlightRecording(self.log_file_path)
+        # The columns decode_fc_batch gives for the text log (vertical speed is recomputed below)
+        names = tuple(field.name for field in FC_FIELDS) + ('gps_valid', 'altitude', 'pressure', 'temperature')
+        data = recording.rows(names=names + ('arrival_time',))
+        
+        if len(recording):
+            # arrival_time counts from the GUI start, stored in the recording header
+            arrival = pd.to_timedelta(data.pop('arrival_time'), unit='s')
+            timestamps = pd.Timestamp.fromtimestamp(recording.meta.get('start_time', 0)) + arrival
+            self.start_time = timestamps[0]
+            self.flight_data = pd.DataFrame(data)
+            self.flight_data['timestamp'] = timestamps
+            self.flight_data['time_elapsed'] = (timestamps - self.start_time).total_seconds()
+            self.flight_data['led_status'] = (self.flight_data['photodiode_value1'] > 5) | (self.flight_data['photodiode_value2'] > 5)
+            self._calculate_vertical_speed()
+        else:
+            self.flight_data = pd.DataFrame()
+        self.gs_data = pd.DataFrame() # GS packets are only in the text log
         
+        print(f"Loaded {len(self.flight_data)} FC packets from {recording.summary()['blocks']} blocks")
         return self.flight_data
     
     def _extract_date_from_filename(self):
@@ -99,55 +138,6 @@ class FlightLogAnalyzer:
             return date_match.group(1)
         return "2025-07-03"  # Default fallback
     
-    def _parse_fc_packet(self, packet_str, timestamp):
-        """Parse Flight Computer packet according to telemetry_controller.py structure"""
-        values = packet_str.split(',')
-        
-        if len(values) < 20:
-            return None
-            
-        try:
-            # Parse according to the telemetry controller structure
-            data = {
-                'timestamp': timestamp,
-                'time_elapsed': (timestamp - self.start_time).total_seconds() if self.start_time else 0,
-                'ack': self._safe_int(values, 0),
-                'rssi': self._safe_int(values, 1),
-                'snr': self._safe_int(values, 2),
-                'fc_boot_time_ms': self._safe_int(values, 4),
-                'gps_lat': self._safe_float(values, 5),
-                'gps_lon': self._safe_float(values, 6),
-                'gps_alt': self._safe_float(values, 7),
-                'ground_speed': self._safe_float(values, 8),
-                'gps_time': self._safe_float(values, 9),
-                'pressure': self._safe_float(values, 13),
-                'temperature': self._safe_float(values, 14),
-                'diff_pressure2': self._safe_float(values, 15),
-                'sd_status': self._safe_bool(values, 16),
-                'actuator_status': self._safe_bool(values, 17),
-                'logging_active': self._safe_bool(values, 18),
-                'write_rate': self._safe_int(values, 19),
-                'space_left': self._safe_int(values, 20),
-                'pix_boot_time_ms': self._safe_int(values, 22),
-                'gps_bearing': self._safe_float(values, 29),
-                'gps_bearing_magnetic': self._safe_float(values, 30),
-                'photodiode_value1': self._safe_int(values, 35),
-                'photodiode_value2': self._safe_int(values, 36),
-                'fc_battery_voltage': self._safe_float(values, 37),
-                'led_battery_voltage': self._safe_float(values, 38),
-            }
-            
-            # Add derived fields
-            data['gps_valid'] = data['gps_lat'] != 0.0 and data['gps_lon'] != 0.0
-            data['altitude'] = data['gps_alt']
-            data['led_status'] = data['photodiode_value1'] > 5 or data['photodiode_value2'] > 5
-            
-            return data
-            
-        except Exception as e:
-            print(f"Error parsing FC packet: {e}")
-            return None
-    
     def _parse_gs_packet(self, packet_str, timestamp):
         """Parse Ground Station packet"""
         values = packet_str.split(',')
@@ -195,7 +185,7 @@ class FlightLogAnalyzer:
         print("Parsing event log...")
         events = []
         
-        with open(self.event_log_path, 'r') as file:
+        with open_log(self.event_log_path) as file:
             for line in file:
                 line = line.strip()
                 if not line or line.startswith('Event Log') or line.startswith('Started:') or line.startswith('---'):
@@ -314,18 +304,8 @@ class FlightLogAnalyzer:
         
         valid_data = self.flight_data[self.flight_data['gps_valid'] == True]
         
-        # Calculate vertical speed on the fly for valid data
+        # Vertical speed comes from _calculate_vertical_speed()
         valid_data = valid_data.copy()
-        valid_data['vertical_speed'] = 0.0
-        
-        for i in range(1, len(valid_data)):
-            current_row = valid_data.iloc[i]
-            previous_row = valid_data.iloc[i-1]
-            
-            time_diff = current_row['time_elapsed'] - previous_row['time_elapsed']
-            if time_diff > 0:
-                alt_diff = current_row['gps_alt'] - previous_row['gps_alt']
-                valid_data.iloc[i, valid_data.columns.get_loc('vertical_speed')] = alt_diff / time_diff
         
         # Calculate total speed (magnitude of ground speed and vertical speed vector)
         valid_data['total_speed'] = np.sqrt(valid_data['ground_speed']**2 + valid_data['vertical_speed']**2)
@@ -605,23 +585,10 @@ class FlightLogAnalyzer:
             # GPS statistics
             valid_gps = self.flight_data[self.flight_data['gps_valid'] == True]
             if len(valid_gps) > 0:
-                # Calculate vertical speed for statistics
-                valid_gps = valid_gps.copy()
-                vertical_speeds = []
-                total_speeds = []
-                
-                for i in range(1, len(valid_gps)):
-                    current_row = valid_gps.iloc[i]
-                    previous_row = valid_gps.iloc[i-1]
-                    time_diff = current_row['time_elapsed'] - previous_row['time_elapsed']
-                    if time_diff > 0:
-                        alt_diff = current_row['gps_alt'] - previous_row['gps_alt']
-                        vertical_speed = alt_diff / time_diff
-                        vertical_speeds.append(vertical_speed)
-                        
-                        # Calculate total speed (magnitude of ground and vertical speed vector)
-                        total_speed = np.sqrt(current_row['ground_speed']**2 + vertical_speed**2)
-                        total_speeds.append(total_speed)
+                # Vertical speed comes from _calculate_vertical_speed()
+                vertical_speeds = valid_gps['vertical_speed'].tolist()
+                # Total speed (magnitude of ground and vertical speed vector)
+                total_speeds = np.sqrt(valid_gps['ground_speed']**2 + valid_gps['vertical_speed']**2).tolist()
                 
                 f.write("GPS STATISTICS\n")
                 f.write("-" * 20 + "\n")
@@ -898,75 +865,34 @@ class FlightLogAnalyzer:
         print(f"Analysis complete! Results saved to: {output_dir}")
     
     def _calculate_vertical_speed(self):
-        """Calculate vertical speed from rate of change of altitude"""
+        """Calculate vertical speed as the windowed regression slope of GPS altitude (utils/derived_metrics.py)"""
         if self.flight_data.empty:
             return
         
-        # Filter valid GPS data for calculation
-        valid_gps = self.flight_data[self.flight_data['gps_valid'] == True].copy()
+        # Initialize all vertical speeds to 0
+        self.flight_data['vertical_speed'] = 0.0
         
+        # Filter valid GPS data for calculation
+        valid_gps = self.flight_data[self.flight_data['gps_valid'] == True]
         if len(valid_gps) < 2:
             # Not enough data points for calculation
-            self.flight_data['vertical_speed'] = 0.0
             return
         
-        # Sort by time to ensure proper order
-        valid_gps = valid_gps.sort_values('time_elapsed')
-        
-        # Calculate vertical speed using difference method
-        vertical_speeds = []
-        
-        for i in range(len(valid_gps)):
-            if i == 0:
-                # First point: use forward difference
-                if len(valid_gps) > 1:
-                    dt = valid_gps.iloc[1]['time_elapsed'] - valid_gps.iloc[0]['time_elapsed']
-                    dalt = valid_gps.iloc[1]['gps_alt'] - valid_gps.iloc[0]['gps_alt']
-                    if dt > 0:
-                        vertical_speed = dalt / dt
-                    else:
-                        vertical_speed = 0.0
-                else:
-                    vertical_speed = 0.0
-            elif i == len(valid_gps) - 1:
-                # Last point: use backward difference
-                dt = valid_gps.iloc[i]['time_elapsed'] - valid_gps.iloc[i-1]['time_elapsed']
-                dalt = valid_gps.iloc[i]['gps_alt'] - valid_gps.iloc[i-1]['gps_alt']
-                if dt > 0:
-                    vertical_speed = dalt / dt
-                else:
-                    vertical_speed = 0.0
-            else:
-                # Middle points: use central difference (more accurate)
-                dt = valid_gps.iloc[i+1]['time_elapsed'] - valid_gps.iloc[i-1]['time_elapsed']
-                dalt = valid_gps.iloc[i+1]['gps_alt'] - valid_gps.iloc[i-1]['gps_alt']
-                if dt > 0:
-                    vertical_speed = dalt / dt
-                else:
-                    vertical_speed = 0.0
-            
-            vertical_speeds.append(vertical_speed)
-        
-        # Create a mapping from index to vertical speed
-        valid_gps['vertical_speed'] = vertical_speeds
-        
-        # Apply smoothing to reduce noise (simple moving average)
-        window_size = 5
-        if len(valid_gps) >= window_size:
-            valid_gps['vertical_speed'] = valid_gps['vertical_speed'].rolling(
-                window=window_size, center=True, min_periods=1
-            ).mean()
-        
-        # Map vertical speeds back to the full dataset
-        # Initialize all vertical speeds to 0
-        self.flight_data['vertical_speed'] = 0.0
+        # Packet time: GPS time of the fix if every fix has one, else the log timestamp
+        if (valid_gps['gps_time'] > 0).all():
+            packet_time = valid_gps['gps_time'].astype(float)
+        else:
+            packet_time = valid_gps['time_elapsed']
+        packet_time = packet_time.sort_values(kind='stable')
         
-        # Update vertical speeds for valid GPS points
-        for idx, row in valid_gps.iterrows():
-            self.flight_data.at[idx, 'vertical_speed'] = row['vertical_speed']
+        # Same window and algorithm as the live DerivedMetrics stage
+        slopes = windowed_slope(packet_time.to_numpy(), valid_gps.loc[packet_time.index, 'gps_alt'].to_numpy(),
+                                WINDOW_S)
+        self.flight_data.loc[packet_time.index, 'vertical_speed'] = np.nan_to_num(slopes)
         
+        vertical_speed = self.flight_data.loc[packet_time.index, 'vertical_speed']
         print(f"Calculated vertical speed for {len(valid_gps)} valid GPS points")
-        print(f"Vertical speed range: {valid_gps['vertical_speed'].min():.2f} to {valid_gps['vertical_speed'].max():.2f} m/s")
+        print(f"Vertical speed range: {vertical_speed.min():.2f} to {vertical_speed.max():.2f} m/s")
     
     def convert_units(self):
         """Convert units for better display in plots and reports"""
@@ -996,22 +922,26 @@ class FlightLogAnalyzer:
             
         phases = {}
         
+        # Time-indexed view of the GPS fixes for the "sustained for N seconds" checks
+        history = FlightHistory((('vertical_speed', np.float64), ('abs_vertical_speed', np.float64)), max_ram_chunks=None)
+        vertical_speed = valid_gps['vertical_speed'].to_numpy(dtype=np.float64)
+        history.extend(valid_gps['time_elapsed'].to_numpy(), {
+            'vertical_speed': vertical_speed,
+            'abs_vertical_speed': np.abs(vertical_speed),
+        })
+        query = TelemetryQuery(history)
+        
         # Find balloon release (start of significant ascent)
         # Look for sustained positive vertical speed above a threshold
         ascent_threshold = 2.0  # m/s sustained ascent
         min_ascent_duration = 60  # seconds
         
         release_point = None
-        for i in range(len(valid_gps) - 10):  # Check 10 points ahead
-            current_row = valid_gps.iloc[i]
-            
-            # Check if we have sustained ascent for the next several points
-            future_points = valid_gps.iloc[i:i+10]
-            if len(future_points) >= 10:
-                avg_vertical_speed = future_points['vertical_speed'].mean()
-                if avg_vertical_speed > ascent_threshold:
-                    release_point = current_row
-                    break
+        # First fix whose mean vertical speed over the next min_ascent_duration seconds exceeds the threshold
+        ahead = query.forward_windows('vertical_speed', min_ascent_duration)
+        sustained = (ahead['mean'] > ascent_threshold) & (ahead['time'][-1] - ahead['time'] >= min_ascent_duration)
+        if sustained.any():
+            release_point = valid_gps.iloc[int(np.argmax(sustained))]
         
         if release_point is not None:
             phases['release'] = {
@@ -1046,17 +976,13 @@ class FlightLogAnalyzer:
         landing_point = None
         # Start looking from the last 1/4 of the flight
         start_idx = len(valid_gps) * 3 // 4
+        start_time = valid_gps['time_elapsed'].iloc[start_idx]
         
-        for i in range(start_idx, len(valid_gps) - 10):
-            current_row = valid_gps.iloc[i]
-            
-            # Check if we have stable low vertical speed for the next several points
-            future_points = valid_gps.iloc[i:i+10]
-            if len(future_points) >= 10:
-                max_abs_vertical_speed = future_points['vertical_speed'].abs().max()
-                if max_abs_vertical_speed < landing_threshold:
-                    landing_point = current_row
-                    break
+        # First fix whose |vertical speed| stays below the threshold for the next min_stable_duration seconds
+        ahead = query.forward_windows('abs_vertical_speed', min_stable_duration, start_time)
+        stable = (ahead['max'] < landing_threshold) & (ahead['time'][-1] - ahead['time'] >= min_stable_duration)
+        if stable.any():
+            landing_point = valid_gps.iloc[history.index_at(start_time) + int(np.argmax(stable))]
         
         # If no stable landing detected, use the last point
         if landing_point is None:
@@ -1089,7 +1015,7 @@ class FlightLogAnalyzer:
 def main():
     """Main function for command-line usage"""
     parser = argparse.ArgumentParser(description='Analyze flight log data')
-    parser.add_argument('log_file', help='Path to the flight log file')
+    parser.add_argument('log_file', help='Path to the flight log file (.txt, .txt.gz or .gsrec recording)')
     parser.add_argument('--event-log', help='Path to the event log file')
     parser.add_argument('--output-dir', default='analysis_output', help='Output directory')
     
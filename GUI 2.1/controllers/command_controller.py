@@ -1,52 +1,264 @@
-from PyQt5.QtCore import QObject, pyqtSignal
+import time
+from collections import deque
+from PyQt5.QtCore import QObject, pyqtSignal, QTimer
 from datetime import datetime
 
+class PendingCommand:
+    """A command waiting to be written or acknowledged"""
+    __slots__ = ('command_id', 'command', 'priority', 'attempts', 'queued_at', 'sent_at', 'radio_cycles')
+
+    def __init__(self, command_id, command, priority):
+        self.command_id = command_id
+        self.command = command
+        self.priority = priority
+        self.attempts = 0
+        self.queued_at = time.monotonic()
+        self.sent_at = None # Set when the TX worker has written it to the port
+        self.radio_cycles = 0 # GS packets received since it was written
+
 class CommandController(QObject):
     """Controller for handling command execution"""
-    
+
     # Define signals
     command_sent = pyqtSignal(str, bool)  # command, success
     command_log = pyqtSignal(str)  # log message
-    
-    def __init__(self, serial_controller, settings_model):
+    command_acked = pyqtSignal(str, float)  # command, round-trip latency (ms)
+    command_failed = pyqtSignal(str, str)  # command, reason
+    command_stats_updated = pyqtSignal(dict)  # see get_latency_stats()
+
+    def __init__(self, serial_controller, settings_model, telemetry_model=None):
         super().__init__()
         self.serial_controller = serial_controller
         self.settings_model = settings_model
-    
-    def send_command(self, command):
-        """Send a generic command to the flight computer"""
-        success = self.serial_controller.send_command(command)
+        self.telemetry_model = telemetry_model
+
+        # ACK tracking settings
+        self.max_retries = self.settings_model.get('commands.max_retries', 2)
+        self.ack_timeout = self.settings_model.get('commands.ack_timeout_s', 10.0)  # Wall-clock limit
+        self.ack_timeout_cycles = self.settings_model.get('commands.ack_timeout_cycles', 4)  # Radio cycles
+        self.max_pending = self.settings_model.get('commands.max_pending', 32)
+
+        # Commands are acknowledged one at a time: the next one is only released
+        # once the previous one is acked or given up, so an ack transition can
+        # always be attributed to exactly one command.
+        self.outbox = []  # PendingCommand, ordered by (priority, command_id)
+        self.in_flight = None
+        self._next_id = 1
+        self.last_ack = None  # Last 'ack' value seen in FC packets
+        self.radio_period_ms = 0.0  # Smoothed GS time_since_last_packet
+
+        # Round-trip statistics per command name
+        self.latencies = {}  # name -> deque of latencies (ms)
+        self.counters = {}  # name -> {'sent', 'acked', 'failed', 'retries'}
+
+        self.serial_controller.command_written.connect(self.handle_command_written)
+        self.serial_controller.connection_changed.connect(self.handle_connection_changed)
+        if self.telemetry_model is not None:
+            self.telemetry_model.packet_received.connect(self.handle_packet)
+            self.telemetry_model.packets_received.connect(self.handle_packets)
+            self.telemetry_model.ground_station_packet.connect(
+                lambda gs_data: self.handle_radio_cycle(gs_data['time_since_last_packet']))
+
+        self.timeout_timer = QTimer(self)
+        self.timeout_timer.timeout.connect(self.check_timeouts)
+        self.timeout_timer.start(250)
+
+    def send_command(self, command, priority=None):
+        """Queue a command for the flight computer; returns True if it was accepted"""
+        if priority is None:
+            priority = self.serial_controller.PRIORITY_NORMAL
+        timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
+
+        if not self.serial_controller.is_connected():
+            self.command_sent.emit(command, False)
+            self.command_log.emit(f"[{timestamp}] Failed to send: {command} (not connected)")
+            return False
+        if len(self.outbox) >= self.max_pending:
+            self.command_sent.emit(command, False)
+            self.command_log.emit(f"[{timestamp}] Failed to send: {command} (command queue full)")
+            return False
+
+        pending = PendingCommand(self._next_id, command, priority)
+        self._next_id += 1
+        self.outbox.append(pending)
+        self.outbox.sort(key=lambda p: (p.priority, p.command_id))
+        self._dispatch()
+        return True
+
+    def _dispatch(self):
+        """Hand the next queued command to the serial TX worker if nothing is in flight"""
+        while self.in_flight is None and self.outbox:
+            pending = self.outbox.pop(0)
+            pending.attempts += 1
+            pending.sent_at = None
+            pending.radio_cycles = 0
+            if self.serial_controller.queue_command(pending.command, pending.priority, pending.command_id):
+                self.in_flight = pending
+            else:
+                self._fail(pending, "TX queue rejected command")
+
+    def handle_command_written(self, command_id, command, success):
+        """TX worker finished writing a command"""
+        pending = self.in_flight
+        if pending is None or pending.command_id != command_id:
+            return
+
+        timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
         self.command_sent.emit(command, success)
-        
-        # Log the command
+        if not success:
+            self.in_flight = None
+            self._retry_or_fail(pending, "write failed")
+            return
+
+        pending.sent_at = time.monotonic()
+        self._counter(command)['sent'] += 1
+        retry = f" (retry {pending.attempts - 1})" if pending.attempts > 1 else ""
+        self.command_log.emit(f"[{timestamp}] Sent: {command}{retry}")
+        self.command_stats_updated.emit(self.get_latency_stats())
+
+    def handle_packets(self, packets):
+        """Batched variant of handle_packet"""
+        for packet in packets:
+            self.handle_packet(packet)
+
+    def handle_packet(self, packet):
+        """Watch FC ack transitions for the in-flight command"""
+        if 'ack' not in packet:
+            return
+
+        ack = packet['ack']
+        previous, self.last_ack = self.last_ack, ack
+        pending = self.in_flight
+        # An ack is a change of the FC 'ack' field to a non-zero value after the command went out
+        if pending is None or pending.sent_at is None or previous is None:
+            return
+        if ack != previous and ack:
+            self._complete(pending)
+
+    def handle_radio_cycle(self, time_since_last_packet):
+        """One GS packet = one radio exchange, the only moment the GS can forward a command"""
+        if time_since_last_packet > 0:
+            if self.radio_period_ms:
+                self.radio_period_ms += 0.2 * (time_since_last_packet - self.radio_period_ms)
+            else:
+                self.radio_period_ms = float(time_since_last_packet)
+        if self.in_flight is not None and self.in_flight.sent_at is not None:
+            self.in_flight.radio_cycles += 1
+
+    def check_timeouts(self):
+        """Retry or give up on the in-flight command"""
+        pending = self.in_flight
+        if pending is None or pending.sent_at is None:
+            return
+
+        # Normally time out after a few radio exchanges without an ack; fall back
+        # to the wall-clock limit when the link is silent
+        if pending.radio_cycles >= self.ack_timeout_cycles:
+            reason = f"no ack after {pending.radio_cycles} radio cycles"
+        elif time.monotonic() - pending.sent_at >= self.ack_timeout:
+            reason = f"no ack after {self.ack_timeout:.0f} s"
+        else:
+            return
+        self.in_flight = None
+        self._retry_or_fail(pending, reason)
+
+    def handle_connection_changed(self, connected, port_name):
+        """Drop pending commands when the link goes away"""
+        if connected:
+            self.last_ack = None
+            return
+        pending = self.in_flight
+        self.in_flight = None
+        if pending is not None:
+            self._fail(pending, "disconnected", dispatch=False)
+        for pending in self.outbox:
+            self._fail(pending, "disconnected", dispatch=False)
+        self.outbox = []
+
+    def _complete(self, pending):
+        latency_ms = (time.monotonic() - pending.sent_at) * 1000.0
+        self.in_flight = None
+
+        name = self._command_name(pending.command)
+        self.latencies.setdefault(name, deque(maxlen=100)).append(latency_ms)
+        self._counter(pending.command)['acked'] += 1
+
         timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-        if success:
-            self.command_log.emit(f"[{timestamp}] Sent: {command}")
+        self.command_log.emit(f"[{timestamp}] Acked: {pending.command} ({latency_ms:.0f} ms)")
+        self.command_acked.emit(pending.command, latency_ms)
+        self.command_stats_updated.emit(self.get_latency_stats())
+        self._dispatch()
+
+    def _retry_or_fail(self, pending, reason):
+        if pending.attempts <= self.max_retries:
+            self._counter(pending.command)['retries'] += 1
+            timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
+            self.command_log.emit(f"[{timestamp}] Retrying: {pending.command} ({reason})")
+            self.outbox.insert(0, pending)  # Retries go ahead of newer commands
+            self._dispatch()
         else:
-            self.command_log.emit(f"[{timestamp}] Failed to send: {command}")
-        
-        return success
-    
+            self._fail(pending, reason)
+
+    def _fail(self, pending, reason, dispatch=True):
+        self._counter(pending.command)['failed'] += 1
+        timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
+        self.command_log.emit(f"[{timestamp}] Failed: {pending.command} ({reason})")
+        self.command_failed.emit(pending.command, reason)
+        self.command_stats_updated.emit(self.get_latency_stats())
+        if dispatch:
+            self._dispatch()
+
+    @staticmethod
+    def _command_name(command):
+        parts = command.split()
+        return parts[0] if parts else command
+
+    def _counter(self, command):
+        name = self._command_name(command)
+        if name not in self.counters:
+            self.counters[name] = {'sent': 0, 'acked': 0, 'failed': 0, 'retries': 0}
+        return self.counters[name]
+
+    def get_latency_stats(self):
+        """Return per-command round-trip statistics plus overall link state"""
+        commands = {}
+        for name, counter in self.counters.items():
+            samples = self.latencies.get(name, ())
+            commands[name] = dict(counter)
+            if samples:
+                commands[name].update({
+                    'last_ms': samples[-1],
+                    'min_ms': min(samples),
+                    'avg_ms': sum(samples) / len(samples),
+                    'max_ms': max(samples),
+                })
+        return {
+            'commands': commands,
+            'pending': len(self.outbox) + (1 if self.in_flight else 0),
+            'in_flight': self.in_flight.command if self.in_flight else None,
+            'radio_period_ms': self.radio_period_ms,
+        }
+
     def send_led_command(self, intensity):
         """Send LED intensity command"""
         return self.send_command(f"LED_SET {intensity}")
-    
+
     def send_blink_command(self, delay_ms):
         """Send LED blink command"""
         return self.send_command(f"LED_BLINK {delay_ms}")
-    
+
     def send_source_command(self, intensity):
         """Send source LED intensity command"""
         return self.send_command(f"SOURCE_LED_SET {intensity}")
-    
+
     def send_source_blink_command(self, delay_ms):
         """Send source LED blink command"""
         return self.send_command(f"SOURCE_LED_BLINK {delay_ms}")
-    
+
     def activate_sd(self):
         """Activate SD card logging"""
         return self.send_command("SD_ACTIVATE")
-    
+
     def send_ping(self):
         """Send ping command"""
-        return self.send_command("ping")
\ No newline at end of file
+        return self.send_command("ping", self.serial_controller.PRIORITY_HIGH)
@@ -1,4 +1,3 @@
-import math
 import requests # For IP geolocation
 from PyQt5.QtCore import QObject, pyqtSignal
 
@@ -22,6 +21,8 @@ class MapController(QObject):
 
         self.last_vehicle_lat = None
         self.last_vehicle_lon = None
+        # Look angles and ground track are computed by the model's derived-metrics stage
+        self.telemetry_model.set_ground_station(self.user_lat, self.user_lon, self.user_alt)
 
         # Connect to model signals
         self.telemetry_model.position_updated.connect(self.handle_vehicle_position_update)
@@ -67,6 +68,7 @@ class MapController(QObject):
                         self.user_lat = lat
                         self.user_lon = lon
                         self.user_alt = alt
+                        self.telemetry_model.set_ground_station(lat, lon, alt)
                         self.user_location_changed.emit(self.user_lat, self.user_lon, self.user_alt)
                         print(f"MapController: User location detected via {service_url}: {self.user_lat}, {self.user_lon}, {self.user_alt}")
                     return True
@@ -94,6 +96,7 @@ class MapController(QObject):
             self.user_lat = lat
             self.user_lon = lon
             self.user_alt = alt
+            self.telemetry_model.set_ground_station(lat, lon, alt)
             self.user_location_changed.emit(lat, lon, alt)
             print(f"MapController: User location set manually: {lat}, {lon}, {alt}")
             # Recalculate bearings if vehicle position is known
@@ -105,19 +108,11 @@ class MapController(QObject):
         if vehicle_lat == 0 and vehicle_lon == 0: # Invalid GPS data
             return
 
-        # Calculate vehicle heading if previous position exists
-        if self.last_vehicle_lat is not None and self.last_vehicle_lon is not None:
-            # Ensure there's a significant enough change to calculate bearing
-            # This avoids erratic bearings from tiny GPS fluctuations when stationary
-            min_dist_sq = 0.00001 * 0.00001 # Approx 1 meter change squared
-            if (vehicle_lat - self.last_vehicle_lat)**2 + (vehicle_lon - self.last_vehicle_lon)**2 > min_dist_sq:
-                heading = self._calculate_bearing_static(
-                    self.last_vehicle_lat, self.last_vehicle_lon,
-                    vehicle_lat, vehicle_lon
-                )
-                self.bearing_calculated.emit(heading, "vehicle_heading")
+        # Vehicle heading: ground track over the derived-metrics window (only once the vehicle moved)
+        if self.telemetry_model.derived.track_valid:
+            self.bearing_calculated.emit(self.telemetry_model.ground_track, "vehicle_heading")
         
-        # Calculate bearing from ground station (user) to vehicle
+        # Bearing from ground station (user) to vehicle
         self.calculate_target_bearing_to_vehicle(vehicle_lat, vehicle_lon)
         
         # Store current position for next calculation
@@ -134,6 +129,7 @@ class MapController(QObject):
                 self.user_lat = gs_lat
                 self.user_lon = gs_lon
                 self.user_alt = gs_alt
+                self.telemetry_model.set_ground_station(gs_lat, gs_lon, gs_alt)
 
                 # Use QTimer to delay the emission slightly to ensure map is ready
                 from PyQt5.QtCore import QTimer
@@ -145,37 +141,6 @@ class MapController(QObject):
                     self.calculate_target_bearing_to_vehicle(self.last_vehicle_lat, self.last_vehicle_lon)
 
     def calculate_target_bearing_to_vehicle(self, vehicle_lat, vehicle_lon):
-        """Calculates bearing from user to vehicle."""
-        if self.user_lat is not None and self.user_lon is not None:
-            target_bearing = self._calculate_bearing_static(
-                self.user_lat, self.user_lon,
-                vehicle_lat, vehicle_lon
-            )
-            self.bearing_calculated.emit(target_bearing, "target_bearing")
-
-    @staticmethod
-    def _calculate_bearing_static(lat1, lon1, lat2, lon2):
-        """
-        Calculate great circle bearing between two points (static method from gui.py).
-        Returns bearing in degrees (0-360).
-        """
-        try:
-            lat1_rad = math.radians(float(lat1))
-            lon1_rad = math.radians(float(lon1))
-            lat2_rad = math.radians(float(lat2))
-            lon2_rad = math.radians(float(lon2))
-            
-            delta_lon = lon2_rad - lon1_rad
-            
-            x = math.sin(delta_lon) * math.cos(lat2_rad)
-            y = math.cos(lat1_rad) * math.sin(lat2_rad) - \
-                math.sin(lat1_rad) * math.cos(lat2_rad) * math.cos(delta_lon)
-            
-            initial_bearing_rad = math.atan2(x, y)
-            bearing_deg = (math.degrees(initial_bearing_rad) + 360) % 360 # Normalize to 0-360
-            
-            return bearing_deg
-            
-        except (ValueError, TypeError) as e:
-            print(f"MapController: Error calculating bearing: {e}")
-            return 0.0
\ No newline at end of file
+        """Emit the bearing from user to vehicle computed by the derived-metrics stage."""
+        if self.telemetry_model.derived.target_valid:
+            self.bearing_calculated.emit(self.telemetry_model.target_bearing, "target_bearing")
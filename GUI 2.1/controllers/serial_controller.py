@@ -3,6 +3,9 @@ import threading
 import queue
 import time
 from PyQt5.QtCore import QObject, pyqtSignal
+from utils.serial_buffer import SerialLineBuffer, IngestStats
+from utils.serial_capture import CaptureWriter, ReplaySerial
+from utils.binary_telemetry import FRAME_OVERHEAD, frame_to_text
 
 class SerialController(QObject):
     """Controller for serial port communications"""
@@ -11,14 +14,46 @@ class SerialController(QObject):
     raw_data_received = pyqtSignal(str) # For raw lines to console
     connection_changed = pyqtSignal(bool, str) # connected (bool), port_name (str)
     connection_error = pyqtSignal(str)
+    ingest_stats_updated = pyqtSignal(dict) # Throughput stats from the bulk reader, once per second
+    packets_batch_received = pyqtSignal(list) # Batched packet_received, when batch_interval_ms > 0
+    raw_data_batch_received = pyqtSignal(list) # Batched raw_data_received, when batch_interval_ms > 0
+    command_written = pyqtSignal(int, str, bool) # TX worker result: command id, command, success
+    frame_received = pyqtSignal(int, bytes) # Binary telemetry frame: type, payload (bulk mode only)
     
-    def __init__(self, connection_model):
+    READ_MODES = ('line', 'bulk')
+    
+    # TX queue priorities - lower value is written first
+    PRIORITY_HIGH = 0
+    PRIORITY_NORMAL = 1
+    PRIORITY_LOW = 2
+    
+    def __init__(self, connection_model, read_mode='line', buffer_size=65536, batch_interval_ms=0,
+                 tx_queue_size=32):
         super().__init__()
         self.connection_model = connection_model
         self.serial_port = None
         # self.serial_queue = queue.Queue() # Not directly used if emitting signals
         self.read_thread = None
         self.stop_thread_flag = threading.Event() # Use threading.Event for safer stop
+        
+        # 'line' = readline() polling, 'bulk' = large blocking reads into a reusable buffer
+        self.read_mode = read_mode if read_mode in self.READ_MODES else 'line'
+        self.line_buffer = SerialLineBuffer(buffer_size)
+        self.ingest_stats = IngestStats()
+        
+        # Batched delivery - 0 keeps the per-line signals
+        self.batch_interval = batch_interval_ms / 1000.0
+        self._raw_batch = []
+        self._packet_batch = []
+        self._batch_started = 0.0
+        
+        # Raw capture of every received chunk (see utils/serial_capture.py)
+        self.capture_writer = None
+        
+        # Asynchronous transmit - writes happen on a worker thread, never on the GUI thread
+        self.tx_queue = queue.PriorityQueue(maxsize=tx_queue_size)
+        self.tx_thread = None
+        self._tx_seq = 0 # Tie-breaker keeps FIFO order within a priority
     
     def get_available_ports(self):
         import serial.tools.list_ports
@@ -34,14 +69,7 @@ class SerialController(QObject):
             self.disconnect() # Disconnect if connected to a different port
 
         try:
-            self.serial_port = serial.Serial(port, baud_rate, timeout=1)
-            self.connection_model.set_connected(True, port) # Update model
-            self.connection_changed.emit(True, port) # Emit signal
-            
-            self.stop_thread_flag.clear() # Reset stop flag
-            self.read_thread = threading.Thread(target=self.read_serial_data, daemon=True)
-            self.read_thread.start()
-            
+            self._start_reader(serial.Serial(port, baud_rate, timeout=1), port, baud_rate)
             return True
         except serial.SerialException as e:
             self.connection_error.emit(f"Connection error on {port}: {str(e)}")
@@ -50,12 +78,61 @@ class SerialController(QObject):
             self.connection_changed.emit(False, "") # Emit signal
             return False
     
+    def connect_replay(self, capture_path, speed=1.0):
+        """Feed a capture file through the normal reader path instead of a real port"""
+        if self.serial_port and self.serial_port.is_open:
+            self.disconnect()
+        try:
+            replay_port = ReplaySerial(capture_path, speed)
+        except (OSError, ValueError) as e:
+            self.connection_error.emit(f"Replay error: {str(e)}")
+            return False
+        self._start_reader(replay_port, replay_port.port, replay_port.baudrate)
+        return True
+
+    def _start_reader(self, port_obj, port_name, baud_rate):
+        """Adopt an open port object and start the configured reader thread"""
+        self.serial_port = port_obj
+        self.connection_model.set_connected(True, port_name) # Update model
+        self.connection_changed.emit(True, port_name) # Emit signal
+        
+        self.stop_thread_flag.clear() # Reset stop flag
+        if self.read_mode == 'bulk':
+            self.line_buffer.clear()
+            self.ingest_stats = IngestStats(baud_rate)
+            reader = self.read_serial_data_bulk
+        else:
+            reader = self.read_serial_data
+        self.read_thread = threading.Thread(target=reader, daemon=True)
+        self.read_thread.start()
+        
+        self.tx_thread = threading.Thread(target=self._tx_loop, daemon=True)
+        self.tx_thread.start()
+
+    def start_capture(self, capture_path):
+        """Record every received byte chunk to a capture file (works before or after connecting)"""
+        self.stop_capture()
+        try:
+            self.capture_writer = CaptureWriter(capture_path)
+        except OSError as e:
+            self.connection_error.emit(f"Capture error: {str(e)}")
+            return False
+        return True
+
+    def stop_capture(self):
+        writer = self.capture_writer
+        self.capture_writer = None
+        if writer:
+            writer.close()
+
     def disconnect(self):
         if self.serial_port and self.serial_port.is_open:
             self.stop_thread_flag.set() # Signal thread to stop
             
             if self.read_thread and self.read_thread.is_alive():
                 self.read_thread.join(timeout=2.0) # Wait for thread with timeout
+            if self.tx_thread and self.tx_thread.is_alive():
+                self.tx_thread.join(timeout=2.0)
             
             try:
                 self.serial_port.close()
@@ -66,6 +143,8 @@ class SerialController(QObject):
             self.serial_port = None
             self.connection_model.set_connected(False) # Update model
             self.connection_changed.emit(False, port_name) # Emit signal
+            # Only once disconnected: a failed write must not be retried into the queue being drained
+            self._drain_tx_queue()
             return True
         return False
     
@@ -80,39 +159,12 @@ class SerialController(QObject):
             try:
                 if self.serial_port.in_waiting > 0:
                     line_bytes = self.serial_port.readline()
-                    try:
-                        # Decode and strip whitespace
-                        decoded_line = line_bytes.decode('utf-8', errors='ignore').strip()
-                        
-                        if not decoded_line: # Skip empty lines
-                            continue
-
-                        # Emit raw data for console
-                        self.raw_data_received.emit(decoded_line)
-                        
-                        # Skip processing certain lines that are not telemetry
-                        if decoded_line.startswith('Sending packet:'):
-                            continue  # Skip command acknowledgments
-                        
-                        # Basic check for printable characters and comma (from gui.py)
-                        # This is a heuristic; more robust parsing should be in TelemetryController
-                        is_potentially_valid_packet = True
-                        # if any(ord(c) < 32 or ord(c) > 126 for c in decoded_line if c not in ['\r', '\n']):
-                        #    is_potentially_valid_packet = False # Contains non-printable
-                        
-                        # Check for known packet formats or legacy comma-separated format
-                        if not (decoded_line.startswith(('GPS:', 'GS:', 'FC:')) or ',' in decoded_line):
-                            is_potentially_valid_packet = False # Not known format
-
-                        if is_potentially_valid_packet:
-                            # Update statistics in model
-                            self.connection_model.record_packet(len(line_bytes))
-                            # Emit packet for telemetry processing
-                            self.packet_received.emit(decoded_line)
-                            
-                    except UnicodeDecodeError:
-                        # self.raw_data_received.emit(f"[Decode Error] {line_bytes}")
-                        continue # Skip lines that can't be decoded
+                    capture_writer = self.capture_writer
+                    if capture_writer:
+                        capture_writer.write(line_bytes)
+                    self._handle_line(line_bytes)
+                if self.batch_interval:
+                    self._flush_batch(self.serial_port.in_waiting == 0)
             except serial.SerialException as e: # Catch specific serial exceptions
                 if not self.stop_thread_flag.is_set():
                     self.connection_error.emit(f"Serial read error: {str(e)}")
@@ -124,13 +176,153 @@ class SerialController(QObject):
             
             time.sleep(0.005) # Small sleep to yield CPU, reduce if high data rate
 
+        self._flush_batch(True)
+
         # Cleanup after loop exits
         if not self.stop_thread_flag.is_set() and self.connection_model.is_connected():
             # If loop exited unexpectedly and still thought it was connected
             self.disconnect()
 
+    def read_serial_data_bulk(self):
+        """Thread function that drains the port in large blocking reads and splits lines in bulk."""
+        port = self.serial_port
+        line_buffer = self.line_buffer
+        stats = self.ingest_stats
+        while not self.stop_thread_flag.is_set():
+            if not port or not port.is_open:
+                if not self.stop_thread_flag.is_set():
+                     self.connection_error.emit("Serial port disconnected or unavailable.")
+                break
+            try:
+                # Block for at least one byte (bounded by the port timeout), then take
+                # everything already waiting in a single call - no per-line sleeps
+                target = line_buffer.writable(port.in_waiting or 1)
+                count = port.readinto(target)
+                if count:
+                    capture_writer = self.capture_writer
+                    if capture_writer:
+                        capture_writer.write(target[:count])
+                    line_buffer.commit(count)
+                    # Text lines and binary frames (utils/binary_telemetry.py) can share the stream
+                    records = line_buffer.pop_records()
+                    for record in records:
+                        if record.__class__ is tuple:
+                            self._handle_frame(*record)
+                        else:
+                            self._handle_line(record)
+                    stats.record(count, len(records))
+                if self.batch_interval:
+                    # Deliver as soon as the port is drained; under a burst, at most every batch_interval
+                    self._flush_batch(port.in_waiting == 0)
+
+                snapshot = stats.poll(line_buffer)
+                if snapshot is not None:
+                    self.ingest_stats_updated.emit(snapshot)
+            except serial.SerialException as e:
+                if not self.stop_thread_flag.is_set():
+                    self.connection_error.emit(f"Serial read error: {str(e)}")
+                break
+            except Exception as e:
+                if not self.stop_thread_flag.is_set():
+                    self.connection_error.emit(f"Unexpected serial read error: {str(e)}")
+                break
+
+        self._flush_batch(True)
+
+        # Cleanup after loop exits
+        if not self.stop_thread_flag.is_set() and self.connection_model.is_connected():
+            self.disconnect()
+
+    def _handle_line(self, line_bytes):
+        """Decode one raw line and emit it to the console and telemetry listeners"""
+        # Decode and strip whitespace
+        decoded_line = line_bytes.decode('utf-8', errors='ignore').strip()
+        
+        if not decoded_line: # Skip empty lines
+            return
+
+        # Emit raw data for console
+        if self.batch_interval:
+            if not self._raw_batch and not self._packet_batch:
+                self._batch_started = time.monotonic()
+            self._raw_batch.append(decoded_line)
+        else:
+            self.raw_data_received.emit(decoded_line)
+        
+        # Skip processing certain lines that are not telemetry
+        if decoded_line.startswith('Sending packet:'):
+            return  # Skip command acknowledgments
+        
+        # Check for known packet formats or legacy comma-separated format
+        # This is a heuristic; more robust parsing should be in TelemetryController
+        if decoded_line.startswith(('GPS:', 'GS:', 'FC:')) or ',' in decoded_line:
+            # Update statistics in model
+            self.connection_model.record_packet(len(line_bytes))
+            # Emit packet for telemetry processing
+            if self.batch_interval:
+                self._packet_batch.append(decoded_line)
+            else:
+                self.packet_received.emit(decoded_line)
+
+    def _handle_frame(self, frame_type, payload):
+        """Emit a binary frame to telemetry listeners and its text rendering to the console"""
+        if self.batch_interval:
+            if not self._raw_batch and not self._packet_batch:
+                self._batch_started = time.monotonic()
+            self._raw_batch.append(frame_to_text(frame_type, payload))
+            self._packet_batch.append((frame_type, payload)) # TelemetryController.process_packets handles both
+        else:
+            self.raw_data_received.emit(frame_to_text(frame_type, payload))
+            self.frame_received.emit(frame_type, payload)
+        self.connection_model.record_packet(len(payload) + FRAME_OVERHEAD)
+
+    def _flush_batch(self, force=False):
+        """Emit the collected lines as one list per signal"""
+        if not self._raw_batch and not self._packet_batch:
+            return
+        if not force and time.monotonic() - self._batch_started < self.batch_interval:
+            return
+        raw_batch, self._raw_batch = self._raw_batch, []
+        packet_batch, self._packet_batch = self._packet_batch, []
+        if raw_batch:
+            self.raw_data_batch_received.emit(raw_batch)
+        if packet_batch:
+            self.packets_batch_received.emit(packet_batch)
+
+    def queue_command(self, command, priority=PRIORITY_NORMAL, command_id=0):
+        """Queue a command for the TX worker; returns False if not connected or the queue is full"""
+        if not self.serial_port or not self.serial_port.is_open:
+            self.connection_error.emit("Not connected: Cannot send command.")
+            return False
+        self._tx_seq += 1
+        try:
+            self.tx_queue.put_nowait((priority, self._tx_seq, command_id, command))
+        except queue.Full:
+            self.connection_error.emit(f"TX queue full, dropped: {command.strip()}")
+            return False
+        return True
+
+    def _tx_loop(self):
+        """Thread function that writes queued commands to the port"""
+        while not self.stop_thread_flag.is_set():
+            try:
+                priority, seq, command_id, command = self.tx_queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            success = self.send_command(command)
+            self.command_written.emit(command_id, command, success)
+
+    def _drain_tx_queue(self):
+        """Report commands still queued at disconnect as failed"""
+        while True:
+            try:
+                priority, seq, command_id, command = self.tx_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.command_written.emit(command_id, command, False)
 
     def send_command(self, command):
+        """Write a command synchronously (called by the TX worker; prefer queue_command)"""
         if not self.serial_port or not self.serial_port.is_open:
             self.connection_error.emit("Not connected: Cannot send command.")
             return False
@@ -2,6 +2,8 @@ import time
 import random
 import math
 from PyQt5.QtCore import QObject, pyqtSignal, QTimer
+from utils.packet_schema import decode_fc_values, derive_fc_fields
+from utils.binary_telemetry import FRAME_FC, FRAME_GS, decode_fc_frame, decode_gs_frame
 
 class TelemetryController(QObject):
     """Controller for processing telemetry data"""
@@ -24,6 +26,31 @@ class TelemetryController(QObject):
         self.sim_angle = 0
         self.sim_vertical_speed = 0
     
+    def process_packets(self, packets):
+        """Process a batch of telemetry packets, coalescing model signals into one emit each"""
+        self.telemetry_model.begin_batch()
+        try:
+            for packet in packets:
+                if packet.__class__ is tuple:
+                    self.process_frame(*packet)
+                else:
+                    self.process_packet(packet)
+        finally:
+            self.telemetry_model.end_batch()
+    
+    def process_frame(self, frame_type, payload):
+        """Process a binary telemetry frame (see utils/binary_telemetry.py)"""
+        try:
+            if frame_type == FRAME_FC:
+                return self._apply_flight_computer_data(decode_fc_frame(payload), "binary frame")
+            elif frame_type == FRAME_GS:
+                return self._apply_ground_station_data(decode_gs_frame(payload))
+            self.packet_parsed.emit(False, f"Unknown binary frame type 0x{frame_type:02X}")
+            return False
+        except Exception as e: # struct.error on a payload of the wrong size
+            self.packet_parsed.emit(False, f"Binary frame parse error: {str(e)}")
+            return False
+
     def process_packet(self, packet):
         """Process incoming telemetry packet"""
         try:
@@ -63,62 +90,11 @@ class TelemetryController(QObject):
                 try:
                     print(f"Processing extended packet with {len(values)} fields")
                     
-                    # Helper function to safely parse values
-                    def safe_int(idx, default=0):
-                        try:
-                            return int(values[idx]) if idx < len(values) and values[idx].strip() else default
-                        except (ValueError, IndexError):
-                            return default
-                    
-                    def safe_float(idx, default=0.0):
-                        try:
-                            return float(values[idx]) if idx < len(values) and values[idx].strip() else default
-                        except (ValueError, IndexError):
-                            return default
-                    
-                    def safe_bool(idx, default=False):
-                        try:
-                            return bool(int(values[idx])) if idx < len(values) and values[idx].strip() else default
-                        except (ValueError, IndexError):
-                            return default
-                    
-                    # Parse extended telemetry data with safer indexing
-                    telemetry = {
-                        'ack': safe_int(0),
-                        'rssi': safe_int(1),
-                        'snr': safe_int(2),
-                        'fc_boot_time_ms': safe_int(4),  # Field 3 is empty, field 4 has boot time
-                        'gps_lat': safe_float(5),        # Field 5
-                        'gps_lon': safe_float(6),        # Field 6
-                        'gps_alt': safe_float(7),        # Field 7
-                        'ground_speed': safe_float(8),   # Field 8
-                        'gps_time': safe_float(9),       # Field 9
-                        # Fields 10-12 are empty (FC IMU data)
-                        'pressure': safe_float(13),      # absPressure2
-                        'temperature': safe_float(14),   # temperature2
-                        'diff_pressure2': safe_float(15), # diffPressure2
-                        'sd_status': safe_bool(16),
-                        'actuator_status': safe_bool(17),
-                        'logging_active': safe_bool(18),
-                        'write_rate': safe_int(19),
-                        'space_left': safe_int(20),
-                        # Field 21 is empty (pix_unix_time_usec)
-                        'pix_boot_time_ms': safe_int(22), # Field 22
-                        # Fields 23-28 are empty (vibration data)
-                        'gps_bearing': safe_float(29),
-                        'gps_bearing_magnetic': safe_float(30),
-                        # Fields 31-34 are empty (other bearing data)
-                        'photodiode_value1': safe_int(35),
-                        'photodiode_value2': safe_int(36),
-                        'fc_battery_voltage': safe_float(37),
-                        'led_battery_voltage': safe_float(38),
-                        # Derived fields for compatibility
-                        'gps_valid': safe_float(5) != 0.0 and safe_float(6) != 0.0,
-                        'altitude': safe_float(7),  # Use GPS altitude as primary altitude
-                        # LED status derived from photodiode values (placeholder logic)
-                        'led_status': safe_int(35) > 5 or safe_int(36) > 5,  # Adjusted threshold
-                        'source_status': True  # Placeholder - adjust based on actual requirements
-                    }
+                    # Parse extended telemetry data with the shared FC layout
+                    telemetry = derive_fc_fields(decode_fc_values(values))
+                    # LED status derived from photodiode values (placeholder logic)
+                    telemetry['led_status'] = telemetry['photodiode_value1'] > 5 or telemetry['photodiode_value2'] > 5
+                    telemetry['source_status'] = True  # Placeholder - adjust based on actual requirements
                     
                     print(f"Parsed key values: RSSI={telemetry['rssi']}, GPS=({telemetry['gps_lat']:.6f},{telemetry['gps_lon']:.6f}), Alt={telemetry['altitude']:.2f}")
                     
@@ -308,17 +284,18 @@ class TelemetryController(QObject):
                 'snr': int(values[1]),
                 'time_since_last_packet': int(values[2])
             }
-            
-            # Update telemetry model with ground station telemetry
-            self.telemetry_model.update_ground_station_telemetry(gs_data)
-            
-            self.packet_parsed.emit(True, "Ground station telemetry received")
-            return True
+            return self._apply_ground_station_data(gs_data)
             
         except (ValueError, IndexError) as e:
             self.packet_parsed.emit(False, f"GS packet parse error: {str(e)}")
             return False
     
+    def _apply_ground_station_data(self, gs_data):
+        """Push decoded ground station telemetry (text or binary) to the model"""
+        self.telemetry_model.update_ground_station_telemetry(gs_data)
+        self.packet_parsed.emit(True, "Ground station telemetry received")
+        return True
+    
     def _process_flight_computer_packet(self, data):
         """Process flight computer packet according to the new format"""
         try:
@@ -329,107 +306,31 @@ class TelemetryController(QObject):
                 print(f"Warning: FC packet has only {len(values)} fields, expected at least 30")
                 # Still try to process it with available fields
             
-            # Helper function to safely parse values
-            def safe_int(val, default=0):
-                try:
-                    return int(val) if val and val.strip() else default
-                except (ValueError, TypeError):
-                    return default
-            
-            def safe_float(val, default=0.0):
-                try:
-                    return float(val) if val and val.strip() else default
-                except (ValueError, TypeError):
-                    return default
-            
-            def safe_bool(val, default=False):
-                try:
-                    return bool(int(val)) if val and val.strip() else default
-                except (ValueError, TypeError):
-                    return default
-            
-            # Parse according to the exact packet structure from your C code
-            fc_data = {
-                # Basic fields (0-2)
-                'ack': safe_int(values[0]) if len(values) > 0 else 0,
-                'rssi': safe_int(values[1]) if len(values) > 1 else 0,
-                'snr': safe_int(values[2]) if len(values) > 2 else 0,
-                
-                # FC time (3-4) - note field 3 is empty in your format
-                'fc_unix_time_usec': safe_int(values[3]) if len(values) > 3 else 0,  # Empty in format
-                'fc_boot_time_ms': safe_int(values[4]) if len(values) > 4 else 0,
-                
-                # Pixhawk GPS (5-9)
-                'gps_lat': safe_float(values[5]) if len(values) > 5 else 0.0,
-                'gps_lon': safe_float(values[6]) if len(values) > 6 else 0.0,
-                'gps_alt': safe_float(values[7]) if len(values) > 7 else 0.0,
-                'ground_speed': safe_float(values[8]) if len(values) > 8 else 0.0,
-                'gps_time': safe_float(values[9]) if len(values) > 9 else 0.0,
-                
-                # FC IMU (10-12) - empty in your format
-                # 'abs_pressure1': safe_float(values[10]) if len(values) > 10 else 0.0,
-                # 'temperature1': safe_float(values[11]) if len(values) > 11 else 0.0,
-                # 'altitude1': safe_float(values[12]) if len(values) > 12 else 0.0,
-                
-                # Pixhawk IMU (13-15)
-                'abs_pressure2': safe_float(values[10]) if len(values) > 10 else 0.0,
-                'temperature2': safe_float(values[11]) if len(values) > 11 else 0.0,
-                'diff_pressure2': safe_float(values[12]) if len(values) > 12 else 0.0,
-                
-                'acc_x': safe_float(values[13]) if len(values) > 13 else 0.0,
-                'acc_y': safe_float(values[14]) if len(values) > 14 else 0.0,
-                'acc_z': safe_float(values[15]) if len(values) > 15 else 0.0,
-                # FC Status (16-17)
-                'sd_status': safe_bool(values[16]) if len(values) > 16 else False,
-                'actuator_status': safe_bool(values[17]) if len(values) > 17 else False,
-                
-                # Pixhawk Status (18-20)
-                'logging_active': safe_bool(values[18]) if len(values) > 18 else False,
-                'write_rate': safe_int(values[19]) if len(values) > 19 else 0,
-                'space_left': safe_int(values[20]) if len(values) > 20 else 0,
-                
-                # Pixhawk Time (21-22) - note field 21 is empty
-                'pix_unix_time_usec': safe_int(values[21]) if len(values) > 21 else 0,  # Empty in format
-                'pix_boot_time_ms': safe_int(values[22]) if len(values) > 22 else 0,
-                
-                # Navigation (29-30) - skipping vibration fields 23-28
-                'gps_bearing': safe_float(values[29]) if len(values) > 29 else 0.0,
-                'gps_bearing_magnetic': safe_float(values[30]) if len(values) > 30 else 0.0,
-                
-                # Photodiodes (35-36) - skipping unused fields 31-34
-                'photodiode_value1': safe_int(values[35]) if len(values) > 35 else 0,
-                'photodiode_value2': safe_int(values[36]) if len(values) > 36 else 0,
-                
-                # Battery voltages (37-38)
-                'fc_battery_voltage': safe_float(values[37]) if len(values) > 37 else 0.0,
-                'led_battery_voltage': safe_float(values[38]) if len(values) > 38 else 0.0,
-                
-                # Derived fields for compatibility
-                'gps_valid': safe_float(values[5]) != 0.0 and safe_float(values[6]) != 0.0 if len(values) > 6 else False,
-                'altitude': safe_float(values[7]) if len(values) > 7 else 0.0,  # Use GPS altitude
-                'pressure': safe_float(values[13]) if len(values) > 13 else 0.0,  # Use Pixhawk pressure
-                'temperature': safe_float(values[14]) if len(values) > 14 else 0.0,  # Use Pixhawk temperature
-            }
-            
-            print(f"FC parsed: RSSI={fc_data['rssi']}, GPS=({fc_data['gps_lat']:.6f},{fc_data['gps_lon']:.6f}), Alt={fc_data['altitude']:.2f}")
-            
-            # Update telemetry model - use the generic update method
-            self.telemetry_model.update_telemetry(fc_data)
-            
-            # Emit GPS update signal if valid
-            if fc_data['gps_valid']:
-                self.gps_updated.emit(
-                    fc_data['gps_lat'],
-                    fc_data['gps_lon'],
-                    fc_data['gps_alt']
-                )
-            
-            self.packet_parsed.emit(True, f"Flight computer telemetry received ({len(values)} fields)")
-            return True
+            # Decode with the shared FC layout (utils/packet_schema.py)
+            fc_data = derive_fc_fields(decode_fc_values(values))
+            return self._apply_flight_computer_data(fc_data, f"{len(values)} fields")
             
         except Exception as e:
             print(f"FC packet parse error: {str(e)}")
             import traceback
             traceback.print_exc()
             self.packet_parsed.emit(False, f"FC packet parse error: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+    
+    def _apply_flight_computer_data(self, fc_data, source):
+        """Push a decoded FC packet (text or binary) to the model"""
+        print(f"FC parsed: RSSI={fc_data['rssi']}, GPS=({fc_data['gps_lat']:.6f},{fc_data['gps_lon']:.6f}), Alt={fc_data['altitude']:.2f}")
+        
+        # Update telemetry model - use the generic update method
+        self.telemetry_model.update_telemetry(fc_data)
+        
+        # Emit GPS update signal if valid
+        if fc_data['gps_valid']:
+            self.gps_updated.emit(
+                fc_data['gps_lat'],
+                fc_data['gps_lon'],
+                fc_data['gps_alt']
+            )
+        
+        self.packet_parsed.emit(True, f"Flight computer telemetry received ({source})")
+        return True
\ No newline at end of file
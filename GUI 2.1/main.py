@@ -3,6 +3,7 @@ import os
 import subprocess
 import threading
 import re
+import time
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QIcon, QPalette, QColor
 from PyQt5.QtCore import Qt
@@ -17,6 +18,7 @@ from controllers.telemetry_controller import TelemetryController
 from controllers.map_controller import MapController
 from controllers.command_controller import CommandController
 from utils.config import load_config
+from utils.packet_schema import SDR_FIELDS, FLOAT, decode_sdr_values
 
 class SDRController:
     def __init__(self, telemetry_model):
@@ -86,37 +88,13 @@ class SDRController:
             
             # Split the comma-separated values
             values = clean_data.split(',')
-            if len(values) < 19:
+            if len(values) < len(SDR_FIELDS):
                 print(f"Invalid packet format (not enough values): {clean_data}")
                 return
                 
-            # Parse values according to the radioPacket structure
+            # Parse values according to the radioPacket structure (utils/packet_schema.py)
             try:
-                packet = {
-                    # Communication data
-                    'ack': int(values[0]) if values[0].strip() else 0,
-                    'RSSI': int(values[1]) if values[1].strip() else 0,
-                    'SNR': int(values[2]) if values[2].strip() else 0,
-                    # IMU data
-                    'fRoll': float(values[3]) if values[3].strip() else 0.0,
-                    'fPitch': float(values[4]) if values[4].strip() else 0.0,
-                    'fYaw': float(values[5]) if values[5].strip() else 0.0,
-                    'Pressure': float(values[6]) if values[6].strip() else 0.0,
-                    'Temperature': float(values[7]) if values[7].strip() else 0.0,
-                    'Altitude': float(values[8]) if values[8].strip() else 0.0,
-                    # System status
-                    'SDStatus': bool(int(values[9])) if values[9].strip() else False,
-                    'actuatorStatus': bool(int(values[10])) if values[10].strip() else False,
-                    'photodiodeValue1': int(values[11]) if values[11].strip() else 0,
-                    'photodiodeValue2': int(values[12]) if values[12].strip() else 0,
-                    # GPS data
-                    'gpsLat': float(values[13]) if values[13].strip() else 0.0,
-                    'gpsLon': float(values[14]) if values[14].strip() else 0.0,
-                    'gpsAlt': float(values[15]) if values[15].strip() else 0.0,
-                    'gpsSpeed': float(values[16]) if values[16].strip() else 0.0,
-                    'gpsTime': float(values[17]) if values[17].strip() else 0.0,
-                    'gpsValid': bool(int(values[18])) if values[18].strip() else False
-                }
+                packet = decode_sdr_values(values)
                 
                 print("Successfully parsed packet")
                 # Update telemetry model with the received data
@@ -125,14 +103,14 @@ class SDRController:
             except (ValueError, IndexError) as e:
                 print(f"Error converting values: {e}")
                 # Try to show which value caused the problem
-                for i, val in enumerate(values):
+                for field, val in zip(SDR_FIELDS, values):
                     try:
-                        if i < 3 or (9 <= i <= 12) or i == 18:
-                            int(val)
-                        else:
+                        if field.kind == FLOAT:
                             float(val)
+                        else:
+                            int(val)
                     except ValueError:
-                        print(f"Value at index {i} is invalid: '{val}'")
+                        print(f"Value for {field.name} is invalid: '{val}'")
                 
         except Exception as e:
             print(f"Error parsing packet: {e} in data: {packet_data}")
@@ -172,16 +150,21 @@ def main():
     telemetry_model = TelemetryModel()
     connection_model = ConnectionModel()
     settings_model = SettingsModel(settings)
+    telemetry_model.set_max_data_points(settings_model.get('ui.max_data_points', 1000))
     
     # Controllers
-    serial_controller = SerialController(connection_model)
+    serial_controller = SerialController(connection_model,
+                                         read_mode=settings_model.get('serial.read_mode', 'bulk'),
+                                         batch_interval_ms=settings_model.get('serial.batch_interval_ms', 20))
     telemetry_controller = TelemetryController(telemetry_model)
     map_controller = MapController(telemetry_model, settings_model)
-    command_controller = CommandController(serial_controller, settings_model)
+    command_controller = CommandController(serial_controller, settings_model, telemetry_model)
     sdr_controller = SDRController(telemetry_model)
     
     # Connect signals between components
     serial_controller.packet_received.connect(telemetry_controller.process_packet)
+    serial_controller.packets_batch_received.connect(telemetry_controller.process_packets)
+    serial_controller.frame_received.connect(telemetry_controller.process_frame)
     
     # Main view
     main_window = MainWindow(
@@ -198,9 +181,21 @@ def main():
         if arg.upper().startswith('COM'):
             # Auto-connect to specified port
             main_window.auto_connect(arg.upper())
+        elif arg.startswith('/dev/'):
+            # Auto-connect to a device path, e.g. a pty from testing/packet_generator.py
+            main_window.auto_connect(arg)
         elif arg.lower() == 'testgps':
             # Enable GPS simulation
             telemetry_controller.enable_gps_simulation()
+        elif arg.lower().startswith('replay='):
+            # Replay a raw serial capture: replay=<file>[@speed], speed 0 = as fast as possible
+            capture_path, _, speed = arg[len('replay='):].partition('@')
+            serial_controller.connect_replay(capture_path, float(speed) if speed else 1.0)
+        elif arg.lower() == 'capture':
+            # Record raw serial bytes for later replay
+            capture_path = os.path.join('logs', f"serial_capture_{time.strftime('%Y-%m-%d_%H-%M-%S')}.gscap")
+            serial_controller.start_capture(capture_path)
+            print(f"Capturing raw serial data to {capture_path}")
         elif arg.lower() == 'sdr':
             # Start SDR mode
             print("Starting SDR mode...")
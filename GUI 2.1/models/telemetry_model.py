@@ -1,5 +1,11 @@
 from PyQt5.QtCore import QObject, pyqtSignal
 import time
+from utils.ring_series import RingSeries
+from utils.flight_history import FlightHistory, FC_HISTORY_COLUMNS, SIGNAL_HISTORY_COLUMNS
+from utils.flight_recorder import FlightRecorder, RecorderThread
+from utils.derived_metrics import DerivedMetrics, packet_time
+from utils.telemetry_query import TelemetryQuery
+from models.telemetry_snapshot import TelemetrySnapshot, RADIO, ENVIRONMENT
 
 class TelemetryModel(QObject):
     """
@@ -15,6 +21,9 @@ class TelemetryModel(QObject):
     ground_station_gps_updated = pyqtSignal(float, float, float)  # lat, lon, alt
     status_indicator_changed = pyqtSignal(str, object)  # indicator_name, new_value
     packet_received = pyqtSignal(dict)
+    packets_received = pyqtSignal(list)  # All packets of a batch, emitted once at end_batch()
+    ground_station_packet = pyqtSignal(dict)  # Every GS: line (one per radio exchange), never coalesced
+    fields_changed = pyqtSignal(int)  # Bitmask of field groups that changed (models.telemetry_snapshot)
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -22,20 +31,39 @@ class TelemetryModel(QObject):
         # Initialize time reference
         self.start_time = time.time()
         
-        # Initialize data arrays for plotting
-        self.altitude_data = []
-        self.temperature_data = []
-        self.pressure_data = []
-        self.ground_speed_data = []
-        self.vertical_speed_data = []
+        # Maximum number of data points to keep
+        self.max_data_points = 1000
+        
+        # Data series for plotting - preallocated ring buffers, use .view() for plotting
+        self.altitude_data = RingSeries(self.max_data_points)
+        self.temperature_data = RingSeries(self.max_data_points)
+        self.pressure_data = RingSeries(self.max_data_points)
+        self.ground_speed_data = RingSeries(self.max_data_points)
+        self.vertical_speed_data = RingSeries(self.max_data_points)
         
         # Signal strength data
-        self.rssi_data = []
-        self.snr_data = []
+        self.rssi_data = RingSeries(self.max_data_points)
+        self.snr_data = RingSeries(self.max_data_points)
         
         # Time data for x-axis
-        self.telemetry_time_data = []
-        self.signal_time_data = []
+        self.telemetry_time_data = RingSeries(self.max_data_points)
+        self.signal_time_data = RingSeries(self.max_data_points)
+        
+        # Whole-flight history of every decoded field, keyed on flight-computer time (see _advance_fc_time)
+        self.history = FlightHistory(FC_HISTORY_COLUMNS)
+        self.signal_history = FlightHistory(SIGNAL_HISTORY_COLUMNS)
+        self.query = TelemetryQuery(self.history)
+        self.signal_query = TelemetryQuery(self.signal_history)
+        # Binary recording of the history rows while the flight log runs (start_recording)
+        self.recorder = None
+        self._recorded_rows = 0
+        
+        # Continuous flight-computer time in seconds
+        self.fc_time = 0.0
+        self._fc_time_arrival = None  # Arrival time of the last FC time update
+        self._fc_clock = None  # (clock name, seconds) of the last packet with a clock, see packet_time()
+        self._fc_time_offset = 0.0  # fc_time - packet clock of the current run
+        self._signal_time = 0.0
         
         # Current values
         self.altitude = 0
@@ -67,13 +95,14 @@ class TelemetryModel(QObject):
         self.actuator_status = False
         self.source_status = False
         self.ack_status = False
-        
-        # Last altitude data for vertical speed calculation
-        self.last_altitude = 0
-        self.last_altitude_time = 0
-        
-        # Maximum number of data points to keep
-        self.max_data_points = 1000
+        self.ack = 0
+        
+        # Derived metrics (vertical speed, ground track, look angles from the ground station)
+        self.derived = DerivedMetrics()
+        self.ground_track = 0.0
+        self.target_bearing = 0.0
+        self.target_distance = 0.0  # m
+        self.target_elevation = 0.0
 
         # Additional sensor data
         self.photodiode1 = 0
@@ -133,12 +162,177 @@ class TelemetryModel(QObject):
         self.flight_mode = 0
         self.error_flags = 0
         
-        # Initialize arrays that might be missing
-        if not hasattr(self, 'vertical_speed_data'):
-            self.vertical_speed_data = []
-        
         # Status indicators storage
         self._status_indicators = {}
+        
+        # Batch state - while a batch is open, per-update signals are coalesced
+        self._batch_depth = 0
+        self._pending_signals = {}  # signal name -> latest args
+        self._batch_packets = []
+        self._batch_mask = 0  # Field groups changed during the current batch
+        
+        # Change tracking
+        self._last_snapshot = None
+        self._last_position = None
+    
+    def begin_batch(self):
+        """Start coalescing update signals until the matching end_batch()"""
+        self._batch_depth += 1
+    
+    def end_batch(self):
+        """Close a batch and emit each coalesced signal once with its latest values"""
+        if self._batch_depth == 0:
+            return
+        self._batch_depth -= 1
+        if self._batch_depth:
+            return
+        
+        pending = self._pending_signals
+        packets = self._batch_packets
+        self._pending_signals = {}
+        self._batch_packets = []
+        self._batch_mask = 0
+        
+        self._record()
+        for name, args in pending.items():
+            getattr(self, name).emit(*args)
+        if packets:
+            self.packets_received.emit(packets)
+    
+    def _emit(self, name, *args):
+        """Emit a signal now, or defer it to the end of the current batch"""
+        if self._batch_depth:
+            self._pending_signals[name] = args
+        else:
+            getattr(self, name).emit(*args)
+    
+    def _mark_changed(self):
+        """Emit fields_changed with the groups that differ from the previous update, and return the mask"""
+        snapshot = TelemetrySnapshot.from_model(self)
+        mask = snapshot.changed_groups(self._last_snapshot)
+        self._last_snapshot = snapshot
+        if mask:
+            if self._batch_depth:
+                # Accumulate over the batch, emitted once by end_batch()
+                self._batch_mask |= mask
+                self._pending_signals['fields_changed'] = (self._batch_mask,)
+            else:
+                self.fields_changed.emit(mask)
+        return mask
+    
+    def _position_changed(self):
+        """True if the vehicle position differs from the last emitted position_updated"""
+        position = (self.gps_lat, self.gps_lon, self.gps_alt)
+        if position == self._last_position:
+            return False
+        self._last_position = position
+        return True
+    
+    def connect_fields(self, groups, slot):
+        """Call slot(changed_mask) whenever a field in one of `groups` changed"""
+        def on_fields_changed(mask):
+            if mask & groups:
+                slot(mask)
+        self.fields_changed.connect(on_fields_changed)
+        return on_fields_changed
+    
+    def _emit_packet(self, packet):
+        """Emit packet_received now, or collect it for packets_received at end of batch"""
+        if self._batch_depth:
+            self._batch_packets.append(packet)
+        else:
+            self.packet_received.emit(packet)
+    
+    def set_max_data_points(self, max_data_points):
+        """Resize every series, keeping the most recent points"""
+        self.max_data_points = max_data_points
+        for series in (self.telemetry_time_data, self.altitude_data, self.temperature_data,
+                       self.pressure_data, self.ground_speed_data, self.vertical_speed_data,
+                       self.signal_time_data, self.rssi_data, self.snr_data):
+            series.resize(max_data_points)
+    
+    def get_history(self, start_time=None, end_time=None, fields=None):
+        """Whole-flight FC columns between two flight-computer times, see FlightHistory.slice"""
+        return self.history.slice(start_time, end_time, fields)
+    
+    def nearest_at_wall_time(self, wall_time, fields=None):
+        """FC history row received closest to a time.time() value, or None"""
+        return self.query.nearest(wall_time - self.start_time, fields, by='arrival_time')
+    
+    def _advance_fc_time(self, data, arrival_time):
+        """Continuous flight-computer time of a packet.
+        
+        The packet's own clock while it runs - the FC boot clock (fc_boot_time_ms),
+        else GPS time for packets without it (SDR, legacy FC lines). Across a reboot
+        or a change of clock, or for packets with neither, time continues from the
+        previous value by the arrival gap.
+        """
+        clock, clock_s = packet_time(data, arrival_time)
+        if clock == 'arrival':
+            clock_s = None
+        if self._fc_time_arrival is None:
+            # GPS time only gives the steps, the axis starts at the boot clock or the arrival time
+            fc_time = clock_s if clock == 'boot' else arrival_time
+        elif (clock_s is not None and self._fc_clock is not None
+              and clock == self._fc_clock[0] and clock_s >= self._fc_clock[1]):
+            fc_time = clock_s + self._fc_time_offset
+        else:
+            fc_time = self.fc_time + max(arrival_time - self._fc_time_arrival, 0.0)
+        if clock_s is not None:
+            self._fc_time_offset = fc_time - clock_s
+        self._fc_clock = None if clock_s is None else (clock, clock_s)
+        self.fc_time = max(fc_time, self.fc_time)
+        self._fc_time_arrival = arrival_time
+        return self.fc_time
+    
+    def _estimate_fc_time(self, arrival_time):
+        """Flight-computer time for a packet without FC clock (GS lines), monotonic"""
+        if self._fc_time_arrival is None:
+            estimate = arrival_time
+        else:
+            estimate = self.fc_time + max(arrival_time - self._fc_time_arrival, 0.0)
+        self._signal_time = max(estimate, self._signal_time)
+        return self._signal_time
+    
+    def start_recording(self, path):
+        """Record the FC history rows from now on to a .gsrec file (see utils.flight_recorder)"""
+        self.stop_recording()
+        # The file is written by the recorder's thread, not the GUI thread
+        self.recorder = RecorderThread(FlightRecorder(path, self.history.columns, meta={'start_time': self.start_time}))
+        self._recorded_rows = len(self.history)
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self._record()
+            self.recorder.close()
+            self.recorder = None
+
+    def _record(self):
+        """Pass the history rows appended since the last call to the recorder"""
+        if self.recorder is None:
+            return
+        count = len(self.history)
+        if count > self._recorded_rows:
+            self.recorder.write_rows(self.history.rows(self._recorded_rows, count))
+            self._recorded_rows = count
+
+    def close_history(self):
+        """Stop the recording and release the history spill files"""
+        self.stop_recording()
+        self.history.close()
+        self.signal_history.close()
+    
+    def _append_telemetry_point(self, current_time, values):
+        """Append the current values to the telemetry series and the packet to the history"""
+        self.history.append(self.fc_time, values, vertical_speed=self.vertical_speed, arrival_time=current_time)
+        if not self._batch_depth: # Batches are recorded once by end_batch()
+            self._record()
+        self.telemetry_time_data.append(current_time)
+        self.altitude_data.append(self.altitude)
+        self.temperature_data.append(self.temperature)
+        self.pressure_data.append(self.pressure)
+        self.ground_speed_data.append(self.ground_speed)
+        self.vertical_speed_data.append(self.vertical_speed)
     
     def update_signal(self, rssi, snr):
         """Update signal strength data"""
@@ -153,14 +347,9 @@ class TelemetryModel(QObject):
         self.rssi_data.append(rssi)
         self.snr_data.append(snr)
         
-        # Limit array size
-        if len(self.signal_time_data) > self.max_data_points:
-            self.signal_time_data = self.signal_time_data[-self.max_data_points:]
-            self.rssi_data = self.rssi_data[-self.max_data_points:]
-            self.snr_data = self.snr_data[-self.max_data_points:]
-        
         # Emit signal
-        self.signal_updated.emit(rssi, snr)
+        self._mark_changed()
+        self._emit('signal_updated', rssi, snr)
     
     def update_telemetry(self, telemetry_data):
         """Update telemetry data with a dictionary of values"""
@@ -183,63 +372,52 @@ class TelemetryModel(QObject):
         if 'gps_speed' in telemetry_data:
             self.ground_speed = telemetry_data['gps_speed']
 
-        # Calculate vertical speed if altitude changed
-        if 'altitude' in telemetry_data:
-            self.calculate_vertical_speed(telemetry_data['altitude'])
+        # Derived metrics from the packet time
+        self._update_derived(telemetry_data, current_time)
         
-        # Add to arrays
-        self.telemetry_time_data.append(current_time)
-        self.altitude_data.append(self.altitude)
-        self.temperature_data.append(self.temperature)
-        self.pressure_data.append(self.pressure)
-        self.ground_speed_data.append(self.ground_speed)
-        if hasattr(self, 'vertical_speed'):
-            self.vertical_speed_data.append(self.vertical_speed)
-        
-        # Limit array size
-        if len(self.telemetry_time_data) > self.max_data_points:
-            self.telemetry_time_data = self.telemetry_time_data[-self.max_data_points:]
-            self.altitude_data = self.altitude_data[-self.max_data_points:]
-            self.temperature_data = self.temperature_data[-self.max_data_points:]
-            self.pressure_data = self.pressure_data[-self.max_data_points:]
-            self.ground_speed_data = self.ground_speed_data[-self.max_data_points:]
-            if len(self.vertical_speed_data) > self.max_data_points:
-                self.vertical_speed_data = self.vertical_speed_data[-self.max_data_points:]
+        # Add to series
+        self._append_telemetry_point(current_time, telemetry_data)
         
         # Emit signals
-        self.data_updated.emit()
-        self.altitude_updated.emit(self.altitude)
+        self._mark_changed()
+        self._emit('data_updated')
+        self._emit('altitude_updated', self.altitude)
         
-        if 'gps_lat' in telemetry_data and 'gps_lon' in telemetry_data:
-            self.position_updated.emit(self.gps_lat, self.gps_lon, self.gps_alt)
+        if 'gps_lat' in telemetry_data and 'gps_lon' in telemetry_data and self._position_changed():
+            self._emit('position_updated', self.gps_lat, self.gps_lon, self.gps_alt)
         
         if 'acc_x' in telemetry_data and 'acc_y' in telemetry_data and 'acc_z' in telemetry_data:
-            self.acc_updated.emit(self.acc_x, self.acc_y, self.acc_z)
+            self._emit('acc_updated', self.acc_x, self.acc_y, self.acc_z)
         # Emit packet received signal for table panel display
-        self.packet_received.emit(telemetry_data)
+        self._emit_packet(telemetry_data)
     
-    def calculate_vertical_speed(self, current_altitude):
-        """Calculate vertical speed based on altitude changes"""
-        now = time.time()
-        
-        if self.last_altitude_time == 0:
-            # First measurement
-            self.last_altitude = current_altitude
-            self.last_altitude_time = now
-            self.vertical_speed = 0
-            return
-        
-        # Calculate time difference and altitude change
-        time_diff = now - self.last_altitude_time
-        if time_diff < 0.1:  # Avoid division by very small numbers
-            return
-            
-        altitude_diff = current_altitude - self.last_altitude
-        self.vertical_speed = altitude_diff / time_diff
-        
-        # Update last values for next calculation
-        self.last_altitude = current_altitude
-        self.last_altitude_time = now
+    def _update_derived(self, data, arrival_time):
+        """Advance the FC time and run the derived-metrics stage for the packet just applied"""
+        t = self._advance_fc_time(data, arrival_time)
+        # Barometric altitude, or GPS altitude when the barometer reads 0 (not fitted or failed)
+        if self.altitude == 0 and self.gps_valid:
+            altitude, alt_source = self.gps_alt, 'gps'
+        else:
+            altitude, alt_source = self.altitude, 'baro'
+        derived = self.derived
+        derived.update('fc', t, altitude, alt_source, self.gps_valid, self.gps_lat, self.gps_lon, self.gps_alt)
+        self._copy_derived()
+    
+    def _copy_derived(self):
+        derived = self.derived
+        self.vertical_speed = derived.vertical_speed
+        if derived.track_valid:
+            self.ground_track = derived.ground_track
+        if derived.target_valid:
+            self.target_bearing = derived.target_bearing
+            self.target_distance = derived.target_distance
+            self.target_elevation = derived.target_elevation
+    
+    def set_ground_station(self, lat, lon, alt):
+        """Set the observer position used for target bearing, distance and elevation"""
+        self.derived.set_ground_station(lat, lon, alt)
+        self._copy_derived()
+        self._mark_changed()
 
     def update_from_sdr(self, packet):
         """Update telemetry data from SDR packet"""
@@ -275,84 +453,15 @@ class TelemetryModel(QObject):
         
         # Debug output
         print(f"Updated telemetry from SDR: alt={self.altitude}m, temp={self.temperature}°C")
-        self.packet_received.emit(packet)
+        self._emit_packet(packet)
+    
+    def get_snapshot(self):
+        """Return a TelemetrySnapshot of the current telemetry values"""
+        return TelemetrySnapshot.from_model(self)
     
     def get_latest_telemetry(self):
         """Return a dictionary with the current telemetry values"""
-        return {
-            'altitude': self.altitude,
-            'temperature': self.temperature,
-            'pressure': self.pressure,
-            'vertical_speed': self.vertical_speed,
-            'ground_speed': self.ground_speed,
-            'roll': self.roll,
-            'pitch': self.pitch,
-            'yaw': self.yaw,
-            'rssi': self.rssi,
-            'snr': self.snr,
-            # GPS data
-            'gps_lat': self.gps_lat,
-            'gps_lon': self.gps_lon,
-            'gps_altitude': self.gps_alt,
-            'gps_alt': self.gps_alt,  # Both naming conventions
-            'gps_speed': self.gps_speed,
-            'gps_time': self.gps_time,
-            'gps_valid': self.gps_valid,
-            # Status data
-            'sd_status': self.sd_status,
-            'actuator_status': self.actuator_status,
-            'led_status': self.led_status,
-            'source_status': self.source_status,
-            'ack_status': self.ack_status,
-            'ack': getattr(self, 'ack', 0),
-            # Sensor data
-            'photodiode1': self.photodiode1 if hasattr(self, 'photodiode1') else 0,
-            'photodiode2': self.photodiode2 if hasattr(self, 'photodiode2') else 0,
-            # Time fields from new FC packet format
-            'fc_unix_time_usec': getattr(self, 'fc_unix_time_usec', 0),
-            'fc_boot_time_ms': getattr(self, 'fc_boot_time_ms', 0),
-            'pix_unix_time_usec': getattr(self, 'pix_unix_time_usec', 0),
-            'pix_boot_time_ms': getattr(self, 'pix_boot_time_ms', 0),
-            # IMU data
-            'abs_pressure1': getattr(self, 'abs_pressure1', 0.0),
-            'temperature1': getattr(self, 'temperature1', 0.0),
-            'altitude1': getattr(self, 'altitude1', 0.0),
-            'abs_pressure2': getattr(self, 'abs_pressure2', 0.0),
-            'temperature2': getattr(self, 'temperature2', 0.0),
-            'diff_pressure2': getattr(self, 'diff_pressure2', 0.0),
-            # Pixhawk status
-            'logging_active': getattr(self, 'logging_active', False),
-            'write_rate': getattr(self, 'write_rate', 0),
-            'space_left': getattr(self, 'space_left', 0),
-            # Vibration data
-            'vibe_x': getattr(self, 'vibe_x', 0.0),
-            'vibe_y': getattr(self, 'vibe_y', 0.0),
-            'vibe_z': getattr(self, 'vibe_z', 0.0),
-            'clip_x': getattr(self, 'clip_x', 0),
-            'clip_y': getattr(self, 'clip_y', 0),
-            'clip_z': getattr(self, 'clip_z', 0),
-            # Navigation/GPS bearing data
-            'gps_bearing': getattr(self, 'gps_bearing', 0.0),
-            'gps_bearing_magnetic': getattr(self, 'gps_bearing_magnetic', 0.0),
-            'gps_bearing_true': getattr(self, 'gps_bearing_true', 0.0),
-            'gps_bearing_ground_speed': getattr(self, 'gps_bearing_ground_speed', 0.0),
-            'gps_bearing_ground_speed_magnetic': getattr(self, 'gps_bearing_ground_speed_magnetic', 0.0),
-            'gps_bearing_ground_speed_true': getattr(self, 'gps_bearing_ground_speed_true', 0.0),
-            # Battery voltages
-            'fc_battery_voltage': getattr(self, 'fc_battery_voltage', 0.0),
-            'led_battery_voltage': getattr(self, 'led_battery_voltage', 0.0),
-            # Legacy fields for backward compatibility
-            'battery_voltage': getattr(self, 'battery_voltage', 0.0),
-            'current_draw': getattr(self, 'current_draw', 0.0),
-            'humidity': getattr(self, 'humidity', 0.0),
-            'packet_count': getattr(self, 'packet_count', 0),
-            'flight_mode': getattr(self, 'flight_mode', 0),
-            'error_flags': getattr(self, 'error_flags', 0),
-            # Alternative naming for backward compatibility
-            'fRoll': self.roll,
-            'fPitch': self.pitch,
-            'fYaw': self.yaw
-        }
+        return TelemetrySnapshot.from_model(self).as_dict()
     
     def get_latest_data(self):
         """Alias for get_latest_telemetry for backward compatibility"""
@@ -374,17 +483,21 @@ class TelemetryModel(QObject):
         print(f"Ground station GPS updated: {gps_data['lat']:.6f}, {gps_data['lon']:.6f}, alt={gps_data['alt']:.1f}m")
         
         # Emit signal for ground station position update (separate from vehicle position)
-        self.ground_station_gps_updated.emit(gps_data['lat'], gps_data['lon'], gps_data['alt'])
-        self.data_updated.emit()
+        self._emit('ground_station_gps_updated', gps_data['lat'], gps_data['lon'], gps_data['alt'])
+        self._emit('data_updated')
     
     def update_ground_station_telemetry(self, gs_data):
         """Update ground station telemetry data"""
         self.gs_rssi = gs_data['rssi']
         self.gs_snr = gs_data['snr']
         self.gs_time_since_last_packet = gs_data['time_since_last_packet']
+        arrival_time = time.time() - self.start_time
+        self.signal_history.append(self._estimate_fc_time(arrival_time), gs_data, arrival_time=arrival_time)
         
         # print(f"Ground station telemetry updated: RSSI={gs_data['rssi']}, SNR={gs_data['snr']}, time_since_last={gs_data['time_since_last_packet']}")
         
+        self.ground_station_packet.emit(gs_data)
+        
         # Update signal strength data with ground station values
         self.update_signal(gs_data['rssi'], gs_data['snr'])
     def update_status_indicator(self, indicator_name, new_value):
@@ -476,33 +589,22 @@ class TelemetryModel(QObject):
         if 'yaw' in fc_data:
             self.yaw = fc_data['yaw']
         
-        # Calculate vertical speed
-        self.calculate_vertical_speed(self.altitude)
+        # Derived metrics from the packet time
+        self._update_derived(fc_data, current_time)
         
-        # Add to arrays
-        self.telemetry_time_data.append(current_time)
-        self.altitude_data.append(self.altitude)
-        self.temperature_data.append(self.temperature)
-        self.pressure_data.append(self.pressure)
-        self.ground_speed_data.append(self.ground_speed)
-        self.vertical_speed_data.append(self.vertical_speed)
-        
-        # Limit array size
-        if len(self.telemetry_time_data) > self.max_data_points:
-            self.telemetry_time_data = self.telemetry_time_data[-self.max_data_points:]
-            self.altitude_data = self.altitude_data[-self.max_data_points:]
-            self.temperature_data = self.temperature_data[-self.max_data_points:]
-            self.pressure_data = self.pressure_data[-self.max_data_points:]
-            self.ground_speed_data = self.ground_speed_data[-self.max_data_points:]
-            self.vertical_speed_data = self.vertical_speed_data[-self.max_data_points:]
+        # Add to series
+        self._append_telemetry_point(current_time, fc_data)
         
-        # Emit signals
-        self.data_updated.emit()
-        self.altitude_updated.emit(self.altitude)
-        self.signal_updated.emit(self.rssi, self.snr)
+        # Emit signals - the targeted ones only for the groups that changed
+        changed = self._mark_changed()
+        self._emit('data_updated')
+        if changed & ENVIRONMENT:
+            self._emit('altitude_updated', self.altitude)
+        if changed & RADIO:
+            self._emit('signal_updated', self.rssi, self.snr)
         
-        if self.gps_valid and self.gps_lat != 0 and self.gps_lon != 0:
-            self.position_updated.emit(self.gps_lat, self.gps_lon, self.gps_alt)
+        if self.gps_valid and self.gps_lat != 0 and self.gps_lon != 0 and self._position_changed():
+            self._emit('position_updated', self.gps_lat, self.gps_lon, self.gps_alt)
         
         print(f"Flight computer telemetry updated: alt={self.altitude}m, temp={self.temperature}°C, GPS valid={self.gps_valid}, battery={self.fc_battery_voltage}V")
-        self.packet_received.emit(fc_data)
\ No newline at end of file
+        self._emit_packet(fc_data)
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+Immutable record of the latest telemetry values, handed from the model to the views.
+
+A TelemetrySnapshot is a tuple subclass with no per-instance dict: each
+field is a precomputed index, read as an attribute (snapshot.altitude).
+TelemetryModel builds one with a single attrgetter call. The dictionary
+returned by get_latest_telemetry() is only built when asked for, via
+as_dict().
+
+Fields are also split into groups, one bit each, so the model can report
+which groups changed between two snapshots as a bitmask.
+"""
+
+from collections import namedtuple
+from operator import attrgetter, itemgetter
+
+# (snapshot field, TelemetryModel attribute) - order defines the field indices
+SNAPSHOT_FIELDS = (
+    ('altitude', 'altitude'),
+    ('temperature', 'temperature'),
+    ('pressure', 'pressure'),
+    ('vertical_speed', 'vertical_speed'),
+    ('ground_speed', 'ground_speed'),
+    ('roll', 'roll'),
+    ('pitch', 'pitch'),
+    ('yaw', 'yaw'),
+    ('rssi', 'rssi'),
+    ('snr', 'snr'),
+    # GPS data
+    ('gps_lat', 'gps_lat'),
+    ('gps_lon', 'gps_lon'),
+    ('gps_altitude', 'gps_alt'),
+    ('gps_alt', 'gps_alt'),  # Both naming conventions
+    ('gps_speed', 'gps_speed'),
+    ('gps_time', 'gps_time'),
+    ('gps_valid', 'gps_valid'),
+    # Status data
+    ('sd_status', 'sd_status'),
+    ('actuator_status', 'actuator_status'),
+    ('led_status', 'led_status'),
+    ('source_status', 'source_status'),
+    ('ack_status', 'ack_status'),
+    ('ack', 'ack'),
+    # Sensor data
+    ('photodiode1', 'photodiode1'),
+    ('photodiode2', 'photodiode2'),
+    # Time fields from new FC packet format
+    ('fc_unix_time_usec', 'fc_unix_time_usec'),
+    ('fc_boot_time_ms', 'fc_boot_time_ms'),
+    ('pix_unix_time_usec', 'pix_unix_time_usec'),
+    ('pix_boot_time_ms', 'pix_boot_time_ms'),
+    # IMU data
+    ('abs_pressure1', 'abs_pressure1'),
+    ('temperature1', 'temperature1'),
+    ('altitude1', 'altitude1'),
+    ('abs_pressure2', 'abs_pressure2'),
+    ('temperature2', 'temperature2'),
+    ('diff_pressure2', 'diff_pressure2'),
+    # Pixhawk status
+    ('logging_active', 'logging_active'),
+    ('write_rate', 'write_rate'),
+    ('space_left', 'space_left'),
+    # Vibration data
+    ('vibe_x', 'vibe_x'),
+    ('vibe_y', 'vibe_y'),
+    ('vibe_z', 'vibe_z'),
+    ('clip_x', 'clip_x'),
+    ('clip_y', 'clip_y'),
+    ('clip_z', 'clip_z'),
+    # Navigation/GPS bearing data
+    ('gps_bearing', 'gps_bearing'),
+    ('gps_bearing_magnetic', 'gps_bearing_magnetic'),
+    ('gps_bearing_true', 'gps_bearing_true'),
+    ('gps_bearing_ground_speed', 'gps_bearing_ground_speed'),
+    ('gps_bearing_ground_speed_magnetic', 'gps_bearing_ground_speed_magnetic'),
+    ('gps_bearing_ground_speed_true', 'gps_bearing_ground_speed_true'),
+    # Derived metrics (utils/derived_metrics.py)
+    ('ground_track', 'ground_track'),
+    ('target_bearing', 'target_bearing'),
+    ('target_distance', 'target_distance'),
+    ('target_elevation', 'target_elevation'),
+    # Battery voltages
+    ('fc_battery_voltage', 'fc_battery_voltage'),
+    ('led_battery_voltage', 'led_battery_voltage'),
+    # Legacy fields for backward compatibility
+    ('battery_voltage', 'battery_voltage'),
+    ('current_draw', 'current_draw'),
+    ('humidity', 'humidity'),
+    ('packet_count', 'packet_count'),
+    ('flight_mode', 'flight_mode'),
+    ('error_flags', 'error_flags'),
+    # Alternative naming for backward compatibility
+    ('fRoll', 'roll'),
+    ('fPitch', 'pitch'),
+    ('fYaw', 'yaw'),
+)
+
+SNAPSHOT_KEYS = tuple(key for key, attr in SNAPSHOT_FIELDS)
+FIELD_INDEX = {key: index for index, key in enumerate(SNAPSHOT_KEYS)}
+
+# Field groups (bits of a change mask)
+NAVIGATION = 1 << 0
+RADIO = 1 << 1
+POWER = 1 << 2
+STATUS = 1 << 3
+ENVIRONMENT = 1 << 4
+TIMING = 1 << 5 # FC/Pixhawk clocks - change with every packet
+ALL_GROUPS = NAVIGATION | RADIO | POWER | STATUS | ENVIRONMENT | TIMING
+
+FIELD_GROUPS = {
+    NAVIGATION: ('gps_lat', 'gps_lon', 'gps_altitude', 'gps_alt', 'gps_speed', 'gps_time', 'gps_valid',
+                 'ground_speed', 'roll', 'pitch', 'yaw', 'fRoll', 'fPitch', 'fYaw',
+                 'gps_bearing', 'gps_bearing_magnetic', 'gps_bearing_true', 'gps_bearing_ground_speed',
+                 'gps_bearing_ground_speed_magnetic', 'gps_bearing_ground_speed_true',
+                 'ground_track', 'target_bearing', 'target_distance', 'target_elevation'),
+    RADIO: ('rssi', 'snr', 'ack'),
+    POWER: ('fc_battery_voltage', 'led_battery_voltage', 'battery_voltage', 'current_draw'),
+    STATUS: ('sd_status', 'actuator_status', 'led_status', 'source_status', 'ack_status',
+             'logging_active', 'write_rate', 'space_left', 'packet_count', 'flight_mode', 'error_flags'),
+    ENVIRONMENT: ('altitude', 'temperature', 'pressure', 'vertical_speed', 'humidity',
+                  'abs_pressure1', 'temperature1', 'altitude1', 'abs_pressure2', 'temperature2', 'diff_pressure2',
+                  'photodiode1', 'photodiode2', 'vibe_x', 'vibe_y', 'vibe_z', 'clip_x', 'clip_y', 'clip_z'),
+    TIMING: ('fc_unix_time_usec', 'fc_boot_time_ms', 'pix_unix_time_usec', 'pix_boot_time_ms'),
+}
+
+# Reads every source attribute of the model in one call, in field order
+read_model = attrgetter(*(attr for key, attr in SNAPSHOT_FIELDS))
+
+# (group bit, getter of the group's fields from a snapshot)
+_GROUP_GETTERS = tuple((group, itemgetter(*(FIELD_INDEX[key] for key in keys)))
+                       for group, keys in FIELD_GROUPS.items())
+
+
+class TelemetrySnapshot(namedtuple('TelemetrySnapshot', SNAPSHOT_KEYS)):
+    """Latest telemetry values; fields are attributes, dict access is kept for compatibility"""
+    __slots__ = ()
+
+    @classmethod
+    def from_model(cls, model):
+        return tuple.__new__(cls, read_model(model))
+
+    def get(self, key, default=None):
+        """dict.get() equivalent for code still using the dictionary API"""
+        index = FIELD_INDEX.get(key)
+        return default if index is None else self[index]
+
+    def changed_groups(self, previous):
+        """Bitmask of the groups with a field that differs from `previous` (all groups if None)"""
+        if previous is None:
+            return ALL_GROUPS
+        mask = 0
+        for group, getter in _GROUP_GETTERS:
+            if getter(self) != getter(previous):
+                mask |= group
+        return mask
+
+    def as_dict(self):
+        """Compatibility view as returned by get_latest_telemetry()"""
+        return dict(zip(SNAPSHOT_KEYS, self))
@@ -0,0 +1,125 @@
+"""
+Microbenchmark: FC packet decoding before/after the compiled schema decoder.
+
+"before" is the closure-based parser TelemetryController used to build for
+every packet; "after" is utils.packet_schema.decode_fc; "binary" decodes the
+same packets as utils/binary_telemetry.py frames. Lines come from a flight
+log if one is given, otherwise from testing/packet_generator.py.
+
+Usage (from the GUI 2.1 directory):
+    python testing/bench_packet_decoder.py
+    python testing/bench_packet_decoder.py logs/flight_log_2025-07-23_21-41-08.txt
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from utils.packet_schema import decode_fc
+from utils.binary_telemetry import FRAME_OVERHEAD, encode_fc_fields, decode_fc_frame
+
+
+def legacy_decode(data):
+    """The per-packet parser previously inlined in _process_flight_computer_packet"""
+    values = data.split(',')
+
+    def safe_int(val, default=0):
+        try:
+            return int(val) if val and val.strip() else default
+        except (ValueError, TypeError):
+            return default
+
+    def safe_float(val, default=0.0):
+        try:
+            return float(val) if val and val.strip() else default
+        except (ValueError, TypeError):
+            return default
+
+    def safe_bool(val, default=False):
+        try:
+            return bool(int(val)) if val and val.strip() else default
+        except (ValueError, TypeError):
+            return default
+
+    return {
+        'ack': safe_int(values[0]) if len(values) > 0 else 0,
+        'rssi': safe_int(values[1]) if len(values) > 1 else 0,
+        'snr': safe_int(values[2]) if len(values) > 2 else 0,
+        'fc_unix_time_usec': safe_int(values[3]) if len(values) > 3 else 0,
+        'fc_boot_time_ms': safe_int(values[4]) if len(values) > 4 else 0,
+        'gps_lat': safe_float(values[5]) if len(values) > 5 else 0.0,
+        'gps_lon': safe_float(values[6]) if len(values) > 6 else 0.0,
+        'gps_alt': safe_float(values[7]) if len(values) > 7 else 0.0,
+        'ground_speed': safe_float(values[8]) if len(values) > 8 else 0.0,
+        'gps_time': safe_float(values[9]) if len(values) > 9 else 0.0,
+        'abs_pressure2': safe_float(values[10]) if len(values) > 10 else 0.0,
+        'temperature2': safe_float(values[11]) if len(values) > 11 else 0.0,
+        'diff_pressure2': safe_float(values[12]) if len(values) > 12 else 0.0,
+        'acc_x': safe_float(values[13]) if len(values) > 13 else 0.0,
+        'acc_y': safe_float(values[14]) if len(values) > 14 else 0.0,
+        'acc_z': safe_float(values[15]) if len(values) > 15 else 0.0,
+        'sd_status': safe_bool(values[16]) if len(values) > 16 else False,
+        'actuator_status': safe_bool(values[17]) if len(values) > 17 else False,
+        'logging_active': safe_bool(values[18]) if len(values) > 18 else False,
+        'write_rate': safe_int(values[19]) if len(values) > 19 else 0,
+        'space_left': safe_int(values[20]) if len(values) > 20 else 0,
+        'pix_unix_time_usec': safe_int(values[21]) if len(values) > 21 else 0,
+        'pix_boot_time_ms': safe_int(values[22]) if len(values) > 22 else 0,
+        'gps_bearing': safe_float(values[29]) if len(values) > 29 else 0.0,
+        'gps_bearing_magnetic': safe_float(values[30]) if len(values) > 30 else 0.0,
+        'photodiode_value1': safe_int(values[35]) if len(values) > 35 else 0,
+        'photodiode_value2': safe_int(values[36]) if len(values) > 36 else 0,
+        'fc_battery_voltage': safe_float(values[37]) if len(values) > 37 else 0.0,
+        'led_battery_voltage': safe_float(values[38]) if len(values) > 38 else 0.0,
+        'gps_valid': safe_float(values[5]) != 0.0 and safe_float(values[6]) != 0.0 if len(values) > 6 else False,
+        'altitude': safe_float(values[7]) if len(values) > 7 else 0.0,
+        'pressure': safe_float(values[13]) if len(values) > 13 else 0.0,
+        'temperature': safe_float(values[14]) if len(values) > 14 else 0.0,
+    }
+
+
+def load_lines(log_path=None, count=20000):
+    """FC payloads (without the 'FC:' prefix) from a log or the synthetic generator"""
+    if log_path:
+        with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
+            lines = [line.split('FC:', 1)[1].strip() for line in f if 'FC:' in line]
+    else:
+        from packet_generator import iter_lines
+        lines = []
+        for t, line in iter_lines(rate=100, gps_rate=0, seed=1):
+            if line.startswith('FC:'):
+                lines.append(line[3:])
+                if len(lines) >= count:
+                    break
+    return lines
+
+
+def bench(decoder, lines, repeat=5):
+    """Best-of-N packets/s"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            decoder(line)
+        best = min(best, time.perf_counter() - start)
+    return len(lines) / best
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    lines = load_lines(sys.argv[1] if len(sys.argv) > 1 else None)
+    if not lines:
+        print(f"No FC: lines in {sys.argv[1]}")
+        sys.exit(1)
+    before = bench(legacy_decode, lines)
+    after = bench(decode_fc, lines)
+    payloads = [encode_fc_fields(line.split(','))[4:-2] for line in lines]
+    binary = bench(decode_fc_frame, payloads)
+    text_bytes = sum(len(line) + 5 for line in lines) / len(lines) # 'FC:' + CRLF
+    frame_bytes = len(payloads[0]) + FRAME_OVERHEAD
+    print(f"{len(lines)} FC packets")
+    print(f"before (closures):         {before:10.0f} packets/s")
+    print(f"after  (compiled schema):  {after:10.0f} packets/s  ({after / before:.1f}x)")
+    print(f"binary frames:             {binary:10.0f} packets/s  ({binary / before:.1f}x)")
+    print(f"bytes per packet: text {text_bytes:.0f}, binary {frame_bytes} ({text_bytes / frame_bytes:.1f}x smaller)")
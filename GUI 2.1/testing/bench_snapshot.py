@@ -0,0 +1,117 @@
+"""
+Microbenchmark: per-packet model-to-view handoff.
+
+"dict" is the ~70 key dictionary TelemetryModel.get_latest_telemetry() used
+to build (with its getattr defaults) for every data_updated, read through
+.get() the way PlotPanel and DashboardPanel did; "snapshot" is
+TelemetryModel.get_snapshot() read through attributes. Both panels fetch
+their own copy, so each handoff is timed twice per packet.
+
+Usage (from the GUI 2.1 directory):
+    python testing/bench_snapshot.py
+    python testing/bench_snapshot.py --packets 200000
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from models.telemetry_model import TelemetryModel
+
+
+def legacy_latest_telemetry(self):
+    """TelemetryModel.get_latest_telemetry before the snapshot record"""
+    return {
+        'altitude': self.altitude, 'temperature': self.temperature, 'pressure': self.pressure,
+        'vertical_speed': self.vertical_speed, 'ground_speed': self.ground_speed,
+        'roll': self.roll, 'pitch': self.pitch, 'yaw': self.yaw, 'rssi': self.rssi, 'snr': self.snr,
+        'gps_lat': self.gps_lat, 'gps_lon': self.gps_lon, 'gps_altitude': self.gps_alt,
+        'gps_alt': self.gps_alt, 'gps_speed': self.gps_speed, 'gps_time': self.gps_time,
+        'gps_valid': self.gps_valid, 'sd_status': self.sd_status, 'actuator_status': self.actuator_status,
+        'led_status': self.led_status, 'source_status': self.source_status, 'ack_status': self.ack_status,
+        'ack': getattr(self, 'ack', 0),
+        'photodiode1': self.photodiode1 if hasattr(self, 'photodiode1') else 0,
+        'photodiode2': self.photodiode2 if hasattr(self, 'photodiode2') else 0,
+        'fc_unix_time_usec': getattr(self, 'fc_unix_time_usec', 0),
+        'fc_boot_time_ms': getattr(self, 'fc_boot_time_ms', 0),
+        'pix_unix_time_usec': getattr(self, 'pix_unix_time_usec', 0),
+        'pix_boot_time_ms': getattr(self, 'pix_boot_time_ms', 0),
+        'abs_pressure1': getattr(self, 'abs_pressure1', 0.0),
+        'temperature1': getattr(self, 'temperature1', 0.0),
+        'altitude1': getattr(self, 'altitude1', 0.0),
+        'abs_pressure2': getattr(self, 'abs_pressure2', 0.0),
+        'temperature2': getattr(self, 'temperature2', 0.0),
+        'diff_pressure2': getattr(self, 'diff_pressure2', 0.0),
+        'logging_active': getattr(self, 'logging_active', False),
+        'write_rate': getattr(self, 'write_rate', 0),
+        'space_left': getattr(self, 'space_left', 0),
+        'vibe_x': getattr(self, 'vibe_x', 0.0), 'vibe_y': getattr(self, 'vibe_y', 0.0),
+        'vibe_z': getattr(self, 'vibe_z', 0.0), 'clip_x': getattr(self, 'clip_x', 0),
+        'clip_y': getattr(self, 'clip_y', 0), 'clip_z': getattr(self, 'clip_z', 0),
+        'gps_bearing': getattr(self, 'gps_bearing', 0.0),
+        'gps_bearing_magnetic': getattr(self, 'gps_bearing_magnetic', 0.0),
+        'gps_bearing_true': getattr(self, 'gps_bearing_true', 0.0),
+        'gps_bearing_ground_speed': getattr(self, 'gps_bearing_ground_speed', 0.0),
+        'gps_bearing_ground_speed_magnetic': getattr(self, 'gps_bearing_ground_speed_magnetic', 0.0),
+        'gps_bearing_ground_speed_true': getattr(self, 'gps_bearing_ground_speed_true', 0.0),
+        'fc_battery_voltage': getattr(self, 'fc_battery_voltage', 0.0),
+        'led_battery_voltage': getattr(self, 'led_battery_voltage', 0.0),
+        'battery_voltage': getattr(self, 'battery_voltage', 0.0),
+        'current_draw': getattr(self, 'current_draw', 0.0),
+        'humidity': getattr(self, 'humidity', 0.0),
+        'packet_count': getattr(self, 'packet_count', 0),
+        'flight_mode': getattr(self, 'flight_mode', 0),
+        'error_flags': getattr(self, 'error_flags', 0),
+        'fRoll': self.roll, 'fPitch': self.pitch, 'fYaw': self.yaw,
+    }
+
+
+def read_dict(data):
+    """The fields PlotPanel and DashboardPanel read, through the dict API"""
+    return (data.get('gps_alt', 0.0), data.get('altitude', 0.0), data.get('gps_speed', 0.0),
+            data.get('temperature', 0.0), data.get('pressure', 0.0), data.get('rssi', 0),
+            data.get('snr', 0), data.get('gps_valid', False), data.get('gps_lat', 0.0),
+            data.get('gps_lon', 0.0), data.get('fYaw', 0.0), data.get('gps_time', 0),
+            data.get('temperature2', 0.0), data.get('abs_pressure2', 0.0), data.get('ack', 0),
+            data.get('sd_status', False), data.get('actuator_status', False),
+            data.get('fc_battery_voltage', 0.0), data.get('led_battery_voltage', 0.0))
+
+
+def read_snapshot(data):
+    """The same fields, read as snapshot attributes"""
+    return (data.gps_alt, data.altitude, data.gps_speed, data.temperature, data.pressure,
+            data.rssi, data.snr, data.gps_valid, data.gps_lat, data.gps_lon, data.yaw,
+            data.gps_time, data.temperature2, data.abs_pressure2, data.ack, data.sd_status,
+            data.actuator_status, data.fc_battery_voltage, data.led_battery_voltage)
+
+
+def run(packets, fetch, read):
+    start = time.perf_counter()
+    for _ in range(packets):
+        read(fetch()) # PlotPanel
+        read(fetch()) # DashboardPanel
+    return (time.perf_counter() - start) / packets
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Model-to-view handoff benchmark')
+    parser.add_argument('--packets', type=int, default=100000, help='Packets to simulate')
+    args = parser.parse_args()
+
+    model = TelemetryModel()
+    # The snapshot has gained fields since (derived metrics); the legacy ones must still match
+    legacy = legacy_latest_telemetry(model)
+    latest = model.get_latest_telemetry()
+    assert legacy == {key: latest[key] for key in legacy}
+
+    results = (
+        ("dict", run(args.packets, lambda: legacy_latest_telemetry(model), read_dict)),
+        ("snapshot", run(args.packets, model.get_snapshot, read_snapshot)),
+        ("snapshot as_dict", run(args.packets, model.get_latest_telemetry, read_dict)),
+    )
+    baseline = results[0][1]
+    for name, per_packet in results:
+        print(f"{name:16s} {per_packet * 1e6:7.2f} us/packet  {baseline / per_packet:5.1f}x")
@@ -0,0 +1,304 @@
+"""
+Synthetic ground-station serial traffic generator.
+
+Emits the same lines GSmain PIO prints over USB serial: for every radio
+packet an `FC:` line (39 comma-separated fields), a `GS:rssi,snr,deltaT`
+line and a `Sending packet:` echo, plus periodic `GPS:` lines from the
+ground station receiver. The flight follows a simple ascent/burst/descent
+profile so plots and maps show something sensible.
+
+Usage (from the GUI 2.1 directory):
+    python testing/packet_generator.py --rate 50                  # pty, prints the device path
+    python testing/packet_generator.py --rate 2000 --malformed 0.01 --burst-every 5 --burst-size 500
+    python testing/packet_generator.py --rate 100 --duration 60 --capture logs/synthetic.gscap
+    python testing/packet_generator.py --rate 2000 --binary          # FC/GS as binary frames
+
+Then start the GUI on the printed device (python main.py /dev/pts/N) or type
+the path into the port selector.
+"""
+
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from utils.binary_telemetry import encode_fc_fields, encode_gs_frame
+
+FC_FIELD_COUNT = 39
+
+
+class FlightSimulator:
+    """Simple balloon flight profile producing values for the FC packet fields"""
+
+    def __init__(self, lat=45.862862, lon=-73.592636, ground_alt=54.5,
+                 ascent_rate=5.0, descent_rate=8.0, burst_alt=30000.0, seed=None):
+        self.rng = random.Random(seed)
+        self.start_lat = lat
+        self.start_lon = lon
+        self.ground_alt = ground_alt
+        self.ascent_rate = ascent_rate
+        self.descent_rate = descent_rate
+        self.burst_alt = burst_alt
+        self.burst_time = (burst_alt - ground_alt) / ascent_rate
+        self.boot_offset_ms = self.rng.randint(10000, 900000)
+        self.gps_epoch = int(time.time())
+
+    def altitude(self, t):
+        if t <= self.burst_time:
+            return self.ground_alt + self.ascent_rate * t
+        return max(self.ground_alt, self.burst_alt - self.descent_rate * (t - self.burst_time))
+
+    def position(self, t):
+        # Drift east-north-east, faster at altitude (jet stream)
+        alt = self.altitude(t)
+        speed = 2.0 + alt / 500.0 # m/s
+        bearing = math.radians(70.0 + 10.0 * math.sin(t / 300.0))
+        distance = speed * t
+        lat = self.start_lat + distance * math.cos(bearing) / 111320.0
+        lon = self.start_lon + distance * math.sin(bearing) / (111320.0 * math.cos(math.radians(self.start_lat)))
+        return lat, lon, speed, math.degrees(bearing) % 360.0
+
+    @staticmethod
+    def pressure(alt):
+        """Standard atmosphere pressure in Pa"""
+        return 101325.0 * (1.0 - 2.25577e-5 * min(alt, 11000.0)) ** 5.25588 * (
+            math.exp(-(alt - 11000.0) / 6341.6) if alt > 11000.0 else 1.0)
+
+    def fc_fields(self, t):
+        """Return the 39 FC fields as strings, formatted like the flight computer sends them"""
+        rng = self.rng
+        alt = self.altitude(t)
+        lat, lon, speed, course = self.position(t)
+        rssi = int(-30 - min(alt / 300.0, 90) + rng.randint(-3, 3))
+        snr = int(11 - min(alt / 2000.0, 14) + rng.randint(-1, 1))
+        temperature = 50.0 - min(alt, 11000.0) * 0.0018 + rng.uniform(-0.2, 0.2)
+
+        fields = [''] * FC_FIELD_COUNT
+        fields[0] = '0'                                                   # ack
+        fields[1] = str(rssi)                                             # rssi at the flight computer
+        fields[2] = str(snr)                                              # snr
+        fields[4] = str(self.boot_offset_ms + int(t * 1000))              # fc_boot_time_ms
+        fields[5] = f"{lat:.6f}"
+        fields[6] = f"{lon:.6f}"
+        fields[7] = f"{alt + rng.uniform(-0.5, 0.5):.2f}"                 # GPS altitude
+        fields[8] = f"{speed:.2f}"                                        # ground speed
+        fields[9] = str(self.gps_epoch + int(t))                          # gps_time
+        fields[13] = f"{self.pressure(alt):.2f}"                          # pressure (Pa)
+        fields[14] = f"{temperature:.2f}"                                 # temperature
+        fields[15] = f"{alt - self.ground_alt + rng.uniform(-1, 1):.2f}"  # baro altitude
+        fields[16] = '1'                                                  # sd_status
+        fields[17] = '1' if t > self.burst_time else '0'                  # actuator_status
+        fields[18] = '0'                                                  # logging_active
+        fields[19] = '0'                                                  # write_rate
+        fields[20] = '0'                                                  # space_left
+        fields[22] = str(12280 + int(t / 60))                             # pix_boot_time_ms
+        fields[29] = '0.00'                                               # gps_bearing
+        fields[30] = f"{course:.2f}"                                      # gps_bearing_magnetic
+        fields[35] = str(rng.randint(0, 1023))                            # photodiode 1
+        fields[36] = str(rng.randint(0, 1023))                            # photodiode 2
+        fields[37] = f"{max(6.5, 7.92 - t / 20000.0):.2f}"                # FC battery
+        fields[38] = '12.60'                                              # LED battery
+        return fields, rssi, snr
+
+    def gps_line(self, t):
+        """Ground station GPS line (stationary receiver near the launch site)"""
+        rng = self.rng
+        return "GPS:%.6f,%.6f,%.2f,%.2f,%.2f,%lu,%d,%.2f,%.2f" % (
+            self.start_lat + rng.uniform(-2e-6, 2e-6), self.start_lon + rng.uniform(-2e-6, 2e-6),
+            self.ground_alt + rng.uniform(-1, 1), 0.9, 1.4, self.gps_epoch + int(t),
+            rng.randint(7, 12), rng.uniform(0, 0.5), rng.uniform(0, 360))
+
+
+def malformed_line(rng, good_line):
+    """Corrupt a good line the way a noisy link or a firmware change would"""
+    kind = rng.randrange(7)
+    fields = good_line.split(',')
+    if len(fields) < 3 and kind in (1, 2):
+        kind = 0
+    if kind == 0:
+        return good_line[:rng.randrange(1, len(good_line))]       # Truncated mid-line
+    if kind == 1:
+        return ','.join(fields[:rng.randrange(2, len(fields))])   # Missing trailing fields
+    if kind == 2:
+        fields[rng.randrange(1, len(fields))] = 'nan?x'           # Non-numeric field
+        return ','.join(fields)
+    if kind == 3:
+        return ''.join(chr(rng.randrange(33, 127)) for _ in range(rng.randrange(5, 80)))  # Line noise
+    if kind == 4:
+        return 'FC' + good_line[3:]                               # Broken prefix
+    if kind == 5:
+        return good_line + ',' + good_line[3:]                    # Two packets run together
+    return ''                                                     # Empty line
+
+
+def corrupt_frame(rng, frame):
+    """Flip one byte of a binary frame; the CRC check should reject it"""
+    data = bytearray(frame)
+    data[rng.randrange(len(data))] ^= 1 << rng.randrange(8)
+    return bytes(data)
+
+
+def iter_lines(rate=10.0, gps_rate=1.0, duration=None, malformed=0.0,
+               burst_every=0.0, burst_size=0, seed=None, start_time=0.0, binary=False):
+    """Yield (t, line) pairs in time order; t is seconds since the start of the stream.
+
+    rate: FC packets per second (each also produces a GS and a 'Sending packet' line)
+    gps_rate: ground station GPS lines per second (0 disables them)
+    malformed: probability that any emitted line is corrupted
+    burst_every/burst_size: every burst_every seconds, add burst_size back-to-back FC packets
+    binary: FC and GS packets as binary frames (bytes) instead of text lines
+    """
+    sim = FlightSimulator(seed=seed)
+    rng = random.Random(None if seed is None else seed + 1)
+    fc_period = 1.0 / rate if rate > 0 else None
+    gps_period = 1.0 / gps_rate if gps_rate > 0 else None
+    next_fc = start_time if fc_period else float('inf')
+    next_gps = start_time if gps_period else float('inf')
+    next_burst = start_time + burst_every if burst_every > 0 and burst_size > 0 else float('inf')
+    last_packet_t = start_time
+
+    def radio_packet(t):
+        nonlocal last_packet_t
+        fields, rssi, snr = sim.fc_fields(t)
+        delta_ms = int((t - last_packet_t) * 1000)
+        last_packet_t = t
+        if binary:
+            yield encode_fc_fields(fields)
+            yield encode_gs_frame(rssi - 20, snr - 2, delta_ms)
+        else:
+            yield "FC:" + ",".join(fields)
+            yield f"GS:{rssi - 20},{snr - 2},{delta_ms}"
+        yield "Sending packet: 0,0.000"
+
+    def maybe_corrupt(line):
+        if malformed > 0 and rng.random() < malformed:
+            if isinstance(line, bytes):
+                return corrupt_frame(rng, line)
+            return malformed_line(rng, line)
+        return line
+
+    while True:
+        t = min(next_fc, next_gps, next_burst)
+        if duration is not None and t - start_time > duration:
+            return
+        if t == next_burst:
+            for _ in range(burst_size):
+                for line in radio_packet(t):
+                    yield t, maybe_corrupt(line)
+            next_burst += burst_every
+        elif t == next_fc:
+            for line in radio_packet(t):
+                yield t, maybe_corrupt(line)
+            next_fc += fc_period
+        else:
+            line = sim.gps_line(t) if rng.random() > 0.05 else "GPS: No valid data"
+            yield t, maybe_corrupt(line)
+            next_gps += gps_period
+
+
+def run(write, lines, realtime=True, report_every=5.0):
+    """Write lines with CRLF endings (frames as-is), grouping everything due at the same time into one write"""
+    start = time.monotonic()
+    pending = []
+    pending_t = 0.0
+    sent_lines = 0
+    sent_bytes = 0
+    last_report = start
+
+    def flush():
+        nonlocal sent_bytes
+        data = b''.join(pending)
+        write(data, pending_t)
+        sent_bytes += len(data)
+        pending.clear()
+
+    for t, line in lines:
+        if pending and t != pending_t:
+            flush()
+        if realtime:
+            delay = t - (time.monotonic() - start)
+            if delay > 0:
+                time.sleep(delay)
+        pending_t = t
+        pending.append(line if isinstance(line, bytes) else (line + "\r\n").encode('utf-8'))
+        sent_lines += 1
+
+        now = time.monotonic()
+        if now - last_report >= report_every:
+            elapsed = now - start
+            print(f"{elapsed:7.1f} s  {sent_lines / elapsed:8.0f} lines/s  {sent_bytes / elapsed / 1024:8.1f} kB/s")
+            last_report = now
+    if pending:
+        flush()
+    return sent_lines, sent_bytes
+
+
+def write_all(fd, data):
+    """os.write may accept only part of a large chunk on a pty"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Synthetic FC/GS/GPS serial traffic generator')
+    parser.add_argument('--rate', type=float, default=10.0, help='FC packets per second (default 10)')
+    parser.add_argument('--gps-rate', type=float, default=1.0, help='GPS lines per second (default 1)')
+    parser.add_argument('--duration', type=float, default=None, help='Stop after this many seconds')
+    parser.add_argument('--malformed', type=float, default=0.0, help='Probability of corrupting each line (0-1)')
+    parser.add_argument('--burst-every', type=float, default=0.0, help='Seconds between bursts (0 = no bursts)')
+    parser.add_argument('--burst-size', type=int, default=0, help='FC packets per burst')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible streams')
+    parser.add_argument('--capture', default=None,
+                        help='Write a serial capture file (utils/serial_capture.py format) instead of a pty')
+    parser.add_argument('--stdout', action='store_true', help='Print lines to stdout instead of a pty')
+    parser.add_argument('--binary', action='store_true', help='Send FC/GS packets as binary frames')
+    args = parser.parse_args()
+
+    lines = iter_lines(args.rate, args.gps_rate, args.duration, args.malformed,
+                       args.burst_every, args.burst_size, args.seed, binary=args.binary)
+
+    if args.stdout:
+        def write_stdout(data, t):
+            sys.stdout.buffer.write(data)
+            sys.stdout.flush()
+        try:
+            run(write_stdout, lines, report_every=float('inf'))
+        except (KeyboardInterrupt, BrokenPipeError):
+            pass
+        return
+
+    if args.capture:
+        if args.duration is None:
+            parser.error('--capture needs --duration')
+        from utils.serial_capture import CaptureWriter
+        with CaptureWriter(args.capture) as writer:
+            sent, total = run(lambda data, t: writer.write(data, int(t * 1e9)), lines, realtime=False,
+                              report_every=float('inf'))
+        print(f"Wrote {sent} lines ({total} bytes) to {args.capture}")
+        return
+
+    import pty
+    import tty
+    master, slave = pty.openpty()
+    tty.setraw(slave) # No echo or newline translation
+    print(f"Generating on {os.ttyname(slave)} - FC {args.rate:g} Hz, GPS {args.gps_rate:g} Hz"
+          f"{', binary frames' if args.binary else ''}"
+          f"{f', malformed {args.malformed:.1%}' if args.malformed else ''}"
+          f"{f', bursts of {args.burst_size} every {args.burst_every:g} s' if args.burst_size else ''}")
+    try:
+        sent, total = run(lambda data, t: write_all(master, data), lines)
+        print(f"Done: {sent} lines, {total} bytes")
+    except KeyboardInterrupt:
+        print("Stopped")
+    finally:
+        os.close(master)
+        os.close(slave)
+
+
+if __name__ == '__main__':
+    main()
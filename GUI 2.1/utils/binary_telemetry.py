@@ -0,0 +1,152 @@
+"""
+Compact binary telemetry frames, accepted alongside the CSV text lines.
+
+Frame layout (little-endian):
+
+    A5 5A | type (u8) | length (u8) | payload (length bytes) | CRC16 (u16)
+
+The CRC is CRC-16/CCITT-FALSE (binascii.crc_hqx, initial value 0xFFFF) over
+type, length and payload. The sync bytes never occur in the ASCII text
+protocol, so frames and lines can share one stream (see scan_records()).
+
+Payloads are fixed struct layouts:
+    FRAME_FC  the FC_FIELDS the flight computer actually fills (87 bytes, ~200 as CSV)
+    FRAME_GS  rssi, snr, time since last packet - the 'GS:' line
+
+The encode_* functions are the reference encoder (used by
+testing/packet_generator.py --binary); firmware must produce identical bytes.
+"""
+
+import struct
+from binascii import crc_hqx
+
+from utils.packet_schema import FC_FIELDS, FC_FIELD_INDEX, DEFAULTS, decode_fc_values, derive_fc_fields
+
+SYNC = b'\xa5\x5a'
+FRAME_CRC = struct.Struct('<H')
+FRAME_OVERHEAD = len(SYNC) + 2 + FRAME_CRC.size # sync, type, length, CRC
+MAX_PAYLOAD = 255
+
+FRAME_FC = 0x01
+FRAME_GS = 0x02
+
+# (FC field name, struct code, text format) - fields the firmware sends empty are left out
+FC_FRAME_FIELDS = (
+    ('ack', 'B', 'd'),
+    ('rssi', 'h', 'd'),
+    ('snr', 'b', 'd'),
+    ('fc_boot_time_ms', 'I', 'd'),
+    ('gps_lat', 'd', '.6f'),
+    ('gps_lon', 'd', '.6f'),
+    ('gps_alt', 'f', '.2f'),
+    ('ground_speed', 'f', '.2f'),
+    ('gps_time', 'd', '.2f'),
+    ('abs_pressure2', 'f', '.2f'),
+    ('temperature2', 'f', '.2f'),
+    ('diff_pressure2', 'f', '.2f'),
+    ('sd_status', '?', 'd'),
+    ('actuator_status', '?', 'd'),
+    ('logging_active', '?', 'd'),
+    ('write_rate', 'I', 'd'),
+    ('space_left', 'I', 'd'),
+    ('pix_boot_time_ms', 'I', 'd'),
+    ('gps_bearing', 'f', '.2f'),
+    ('gps_bearing_magnetic', 'f', '.2f'),
+    ('photodiode_value1', 'H', 'd'),
+    ('photodiode_value2', 'H', 'd'),
+    ('fc_battery_voltage', 'f', '.2f'),
+    ('led_battery_voltage', 'f', '.2f'),
+)
+FC_FRAME = struct.Struct('<' + ''.join(code for name, code, fmt in FC_FRAME_FIELDS))
+FC_FRAME_NAMES = tuple(name for name, code, fmt in FC_FRAME_FIELDS)
+
+GS_FRAME = struct.Struct('<hhI')
+GS_FRAME_NAMES = ('rssi', 'snr', 'time_since_last_packet')
+
+_FC_TEMPLATE = {field.name: DEFAULTS[field.kind] for field in FC_FIELDS}
+_FC_SLOTS = tuple(FC_FIELD_INDEX[name] for name in FC_FRAME_NAMES)
+_FC_FORMATS = tuple(fmt for name, code, fmt in FC_FRAME_FIELDS)
+
+
+def decode_fc_frame(payload):
+    """FC frame payload -> the same dict packet_schema.decode_fc() returns for a text packet"""
+    packet = _FC_TEMPLATE.copy()
+    packet.update(zip(FC_FRAME_NAMES, FC_FRAME.unpack(payload)))
+    return derive_fc_fields(packet)
+
+
+def decode_gs_frame(payload):
+    """GS frame payload -> the dict TelemetryController builds from a 'GS:' line"""
+    return dict(zip(GS_FRAME_NAMES, GS_FRAME.unpack(payload)))
+
+
+def frame_to_text(frame_type, payload):
+    """Render a frame as the equivalent text line, so the console and flight logs stay readable"""
+    if frame_type == FRAME_FC and len(payload) == FC_FRAME.size:
+        fields = [''] * len(FC_FIELDS)
+        for slot, fmt, value in zip(_FC_SLOTS, _FC_FORMATS, FC_FRAME.unpack(payload)):
+            fields[slot] = format(value, fmt)
+        return 'FC:' + ','.join(fields)
+    if frame_type == FRAME_GS and len(payload) == GS_FRAME.size:
+        return 'GS:%d,%d,%d' % GS_FRAME.unpack(payload)
+    return f"BIN:{frame_type:02X}:{payload.hex()}"
+
+
+def encode_frame(frame_type, payload):
+    """Wrap a payload in sync bytes, type, length and CRC"""
+    if len(payload) > MAX_PAYLOAD:
+        raise ValueError(f"Frame payload too long: {len(payload)} bytes")
+    body = bytes((frame_type, len(payload))) + payload
+    return SYNC + body + FRAME_CRC.pack(crc_hqx(body, 0xFFFF))
+
+
+def encode_fc_frame(packet):
+    """Encode an FC packet dict (missing fields get their defaults)"""
+    return encode_frame(FRAME_FC, FC_FRAME.pack(*[packet.get(name, _FC_TEMPLATE[name]) for name in FC_FRAME_NAMES]))
+
+
+def encode_fc_fields(fields):
+    """Encode the CSV fields of a text FC packet"""
+    return encode_fc_frame(decode_fc_values(fields))
+
+
+def encode_gs_frame(rssi, snr, time_since_last_packet):
+    return encode_frame(FRAME_GS, GS_FRAME.pack(rssi, snr, time_since_last_packet))
+
+
+def scan_records(data, start, end):
+    """Split data[start:end] into text lines and binary frames, in stream order.
+
+    Lines are returned as bytes (without the newline), frames as
+    (frame_type, payload) tuples. Scanning stops at the first incomplete
+    line or frame; the returned offset is where it starts. A sync whose
+    CRC does not match is treated as noise and skipped.
+    """
+    records = []
+    pos = start
+    while pos < end:
+        sync = data.find(SYNC, pos, end)
+        if sync < 0:
+            newline = data.rfind(b'\n', pos, end)
+            if newline >= 0:
+                records.extend(bytes(data[pos:newline]).split(b'\n'))
+                pos = newline + 1
+            break
+        if sync > pos:
+            # Text before the frame; a line cut off by the frame is ended by it
+            records.extend(bytes(data[pos:sync]).split(b'\n'))
+            pos = sync
+
+        if end - sync < FRAME_OVERHEAD:
+            break
+        length = data[sync + 3]
+        frame_end = sync + FRAME_OVERHEAD + length
+        if frame_end > end:
+            break
+        body = bytes(data[sync + 2:frame_end - 2])
+        if crc_hqx(body, 0xFFFF) != data[frame_end - 2] | (data[frame_end - 1] << 8):
+            pos = sync + 1 # Resync after the false or corrupted sync
+            continue
+        records.append((body[0], body[2:]))
+        pos = frame_end
+    return records, pos
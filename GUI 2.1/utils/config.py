@@ -14,11 +14,25 @@ def load_config(file_path=None):
         'serial': {
             'baud_rate': 115200,
             'timeout': 1,
+            'read_mode': 'bulk',  # 'bulk' or 'line'
+            'batch_interval_ms': 20,  # 0 = emit every line separately
         },
         'ui': {
             'max_data_points': 1000,
             'update_interval': 100,  # ms
         },
+        'logging': {
+            'commit_interval_ms': 500,  # Group commit: write at least this often...
+            'commit_bytes': 65536,  # ...or once this much is pending
+            'fsync': 'close',  # 'never', 'close' (and rotation) or 'commit'
+            'max_bytes': 0,  # Rotate log files after this size (0 = never)
+            'max_age_s': 0,  # Rotate log files after this long (0 = never)
+            'compress': False,  # gzip logs as they are written
+            'queue_size': 10000,
+        },
+        'plot': {
+            'time_window_s': 0,  # > 0: plot this many seconds of FC time from the flight history
+        },
         'map': {
             'default_location': {
                 'lat': 45.5017,  # Montreal
@@ -0,0 +1,190 @@
+"""
+Derived flight metrics, computed once per packet after decoding.
+
+Vertical speed is the least-squares slope of altitude over the last
+`window_s` seconds of packet time (TelemetryModel.fc_time, which follows
+the FC boot clock, else GPS time, see packet_time()), not a finite difference of arrival times. Ground track is the bearing across the
+same window of GPS fixes. Distance, bearing and elevation are the look
+angles from the ground station. TelemetryModel runs one DerivedMetrics and
+every view reads its results; the analysis scripts use windowed_slope() on
+whole columns.
+"""
+
+import math
+
+import numpy as np
+
+from utils.ring_series import RingSeries
+
+EARTH_RADIUS_M = 6371000.0
+WINDOW_S = 10.0 # Regression window, seconds of packet time
+
+
+def bearing_deg(lat1, lon1, lat2, lon2):
+    """Initial great circle bearing from point 1 to point 2, 0-360 degrees"""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    dlon_rad = math.radians(lon2 - lon1)
+    y = math.sin(dlon_rad) * math.cos(lat2_rad)
+    x = (math.cos(lat1_rad) * math.sin(lat2_rad) -
+         math.sin(lat1_rad) * math.cos(lat2_rad) * math.cos(dlon_rad))
+    return (math.degrees(math.atan2(y, x)) + 360) % 360
+
+
+def distance_m(lat1, lon1, lat2, lon2):
+    """Haversine ground distance in meters"""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    dlat_rad = math.radians(lat2 - lat1)
+    dlon_rad = math.radians(lon2 - lon1)
+    a = (math.sin(dlat_rad / 2) ** 2 +
+         math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon_rad / 2) ** 2)
+    return EARTH_RADIUS_M * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def look_angles(ground_lat, ground_lon, ground_alt, lat, lon, alt):
+    """(bearing deg, ground distance m, elevation deg) of a target seen from the ground station"""
+    distance = distance_m(ground_lat, ground_lon, lat, lon)
+    elevation = math.degrees(math.atan2(alt - ground_alt, distance)) if distance > 0 else 0.0
+    return bearing_deg(ground_lat, ground_lon, lat, lon), distance, elevation
+
+
+def windowed_slope(t, y, window_s):
+    """Least-squares slope dy/dt at every sample over the trailing window_s seconds.
+
+    t must be non-decreasing. Samples whose window holds fewer than two
+    distinct times get NaN.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if not len(t):
+        return np.empty(0)
+    t = t - t[0] # Keep the sums well conditioned
+    start = np.searchsorted(t, t - window_s, side='left')
+    zero = np.zeros(1)
+    sums = [np.concatenate((zero, np.cumsum(values))) for values in (np.ones_like(t), t, y, t * t, t * y)]
+    end = np.arange(1, len(t) + 1)
+    n, st, sy, stt, sty = (cumulative[end] - cumulative[start] for cumulative in sums)
+    denominator = n * stt - st * st
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (n * sty - st * sy) / denominator
+    slope[(n < 2) | (denominator <= 1e-12 * np.maximum(n * stt, 1.0))] = np.nan
+    return slope
+
+
+def packet_time(data, arrival_time):
+    """(clock name, seconds) of a packet: FC boot clock, else GPS time, else arrival time"""
+    boot_ms = data.get('fc_boot_time_ms', 0)
+    if boot_ms:
+        return 'boot', boot_ms / 1000.0
+    gps_time = data.get('gps_time', 0)
+    if gps_time:
+        return 'gps', float(gps_time)
+    return 'arrival', arrival_time
+
+
+class DerivedMetrics:
+    """Per-packet vertical speed, ground track and look angles from shared windows"""
+
+    def __init__(self, window_s=WINDOW_S, max_samples=128, min_track_m=5.0):
+        """
+        Args:
+            window_s: regression window in seconds of packet time
+            max_samples: samples kept per window (bounds the cost at high packet rates)
+            min_track_m: minimum movement across the window before the ground track is updated
+        """
+        self.window_s = window_s
+        self.min_track_m = min_track_m
+        self._alt_time = RingSeries(max_samples)
+        self._alt = RingSeries(max_samples)
+        self._pos_time = RingSeries(max_samples)
+        self._lat = RingSeries(max_samples)
+        self._lon = RingSeries(max_samples)
+        self._clock = None
+        self._alt_source = None
+
+        self.ground_station = None # (lat, lon, alt)
+
+        # Results
+        self.vertical_speed = 0.0
+        self.ground_track = 0.0
+        self.track_valid = False
+        self.target_bearing = 0.0
+        self.target_distance = 0.0 # meters
+        self.target_elevation = 0.0
+        self.target_valid = False
+        self._position = None
+
+    def reset(self):
+        for series in (self._alt_time, self._alt, self._pos_time, self._lat, self._lon):
+            series.clear()
+        self._clock = None
+        self._alt_source = None
+        self.vertical_speed = 0.0
+        self.track_valid = False
+
+    def set_ground_station(self, lat, lon, alt):
+        """Set the observer for the look angles and recompute them for the last position"""
+        self.ground_station = (lat, lon, alt)
+        if self._position is not None:
+            self._update_target(*self._position)
+
+    def update(self, clock, t, altitude, alt_source='baro', gps_valid=False, lat=0.0, lon=0.0, gps_alt=0.0):
+        """Add one sample and recompute every metric.
+
+        Args:
+            clock, t: packet clock name and time in seconds
+            altitude, alt_source: altitude for vertical speed and where it comes from
+            gps_valid, lat, lon, gps_alt: GPS fix of the sample
+        """
+        # A different clock or a clock going backwards (reboot) starts new windows
+        if clock != self._clock or (len(self._alt_time) and t < self._alt_time.last()):
+            self.reset()
+            self._clock = clock
+        if alt_source != self._alt_source:
+            self._alt_time.clear()
+            self._alt.clear()
+            self._alt_source = alt_source
+
+        self._alt_time.append(t)
+        self._alt.append(altitude)
+        self.vertical_speed = self._window_slope()
+
+        if gps_valid and (lat != 0 or lon != 0):
+            self._pos_time.append(t)
+            self._lat.append(lat)
+            self._lon.append(lon)
+            self._update_track()
+            self._position = (lat, lon, gps_alt)
+            self._update_target(lat, lon, gps_alt)
+
+    def _window_slope(self):
+        times = self._alt_time.view()
+        start = int(np.searchsorted(times, times[-1] - self.window_s, side='left'))
+        if len(times) - start < 2:
+            return self.vertical_speed if len(times) > 1 else 0.0
+        t = times[start:] - times[start]
+        y = self._alt.view()[start:]
+        t_mean = t.mean()
+        dt = t - t_mean
+        denominator = float(np.dot(dt, dt))
+        if denominator <= 0:
+            return self.vertical_speed
+        return float(np.dot(dt, y - y.mean())) / denominator
+
+    def _update_track(self):
+        times = self._pos_time.view()
+        start = int(np.searchsorted(times, times[-1] - self.window_s, side='left'))
+        lat0, lon0 = self._lat[start], self._lon[start]
+        lat1, lon1 = self._lat.last(), self._lon.last()
+        # Stationary or jittering fixes keep the previous track
+        if distance_m(lat0, lon0, lat1, lon1) >= self.min_track_m:
+            self.ground_track = bearing_deg(lat0, lon0, lat1, lon1)
+            self.track_valid = True
+
+    def _update_target(self, lat, lon, alt):
+        if self.ground_station is None:
+            return
+        self.target_bearing, self.target_distance, self.target_elevation = look_angles(
+            *self.ground_station, lat, lon, alt)
+        self.target_valid = True
@@ -0,0 +1,235 @@
+"""
+Append-only, chunked columnar store for a whole flight.
+
+Rows are appended into fixed-size NumPy blocks, one array per column. When
+more than `max_ram_chunks` full blocks are held in memory, the oldest is
+appended to one file per column and from then on read through np.memmap,
+so memory stays bounded however long the flight runs. The first column is
+always 'time' (monotonic seconds), which makes time ranges a binary search.
+"""
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from utils.packet_schema import FC_FIELDS, INT, FLOAT, BOOL
+
+_KIND_DTYPES = {INT: np.int64, FLOAT: np.float64, BOOL: np.bool_}
+
+# Every decoded FC field, the derived fields and the model's vertical speed
+FC_HISTORY_COLUMNS = tuple((field.name, _KIND_DTYPES[field.kind]) for field in FC_FIELDS) + (
+    ('arrival_time', np.float64),  # Receive time, seconds since the model started
+    ('gps_valid', np.bool_),
+    ('altitude', np.float64),
+    ('pressure', np.float64),
+    ('temperature', np.float64),
+    ('vertical_speed', np.float64),
+)
+
+# One row per GS packet (radio exchange)
+SIGNAL_HISTORY_COLUMNS = (
+    ('arrival_time', np.float64),
+    ('rssi', np.float64),
+    ('snr', np.float64),
+    ('time_since_last_packet', np.float64),
+)
+
+
+class FlightHistory:
+    """Whole-flight columnar history with memory-mapped spill of old chunks"""
+
+    def __init__(self, columns, chunk_size=4096, max_ram_chunks=8, spill_dir=None):
+        """
+        Args:
+            columns: sequence of (name, dtype); a float64 'time' column is added first
+            chunk_size: rows per block
+            max_ram_chunks: full blocks kept in memory before spilling (None = never spill)
+            spill_dir: directory for spill files (default: a temporary directory removed by close())
+        """
+        self.columns = (('time', np.dtype(np.float64)),) + tuple(
+            (name, np.dtype(dtype)) for name, dtype in columns if name != 'time')
+        self.names = tuple(name for name, dtype in self.columns)
+        # Missing values: NaN for floats, 0/False otherwise
+        self.fill = {name: (np.nan if dtype.kind == 'f' else 0) for name, dtype in self.columns}
+        self.chunk_size = chunk_size
+        self.max_ram_chunks = max_ram_chunks
+
+        self.spill_dir = spill_dir
+        self._owns_spill_dir = False
+        self._spill_files = {} # name -> file opened for appending
+        self._maps = {} # name -> memmap over the spilled rows
+        self._spilled_rows = 0
+
+        self._chunks = [] # Full blocks still in memory, oldest first
+        self._active = self._new_chunk()
+        self._active_rows = 0
+
+    def __len__(self):
+        return self._spilled_rows + len(self._chunks) * self.chunk_size + self._active_rows
+
+    def _new_chunk(self):
+        return {name: np.full(self.chunk_size, self.fill[name], dtype=dtype) for name, dtype in self.columns}
+
+    def append(self, time_s, values, **extra):
+        """Append one row; columns missing from `values`/`extra` get the fill value"""
+        active = self._active
+        row = self._active_rows
+        active['time'][row] = time_s
+        for source in (values, extra):
+            for name, value in source.items():
+                column = active.get(name)
+                if column is not None and name != 'time':
+                    column[row] = value
+        self._active_rows = row + 1
+        if self._active_rows == self.chunk_size:
+            self._seal_active()
+
+    def _seal_active(self):
+        self._chunks.append(self._active)
+        self._active = self._new_chunk()
+        self._active_rows = 0
+        if self.max_ram_chunks is not None and len(self._chunks) > self.max_ram_chunks:
+            self._spill(self._chunks.pop(0))
+
+    def _spill(self, chunk):
+        """Append a full block to the per-column spill files"""
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix='gs_history_')
+            self._owns_spill_dir = True
+        os.makedirs(self.spill_dir, exist_ok=True)
+        for name in self.names:
+            spill_file = self._spill_files.get(name)
+            if spill_file is None:
+                spill_file = open(os.path.join(self.spill_dir, f"{name}.bin"), 'wb')
+                self._spill_files[name] = spill_file
+            chunk[name].tofile(spill_file)
+            spill_file.flush()
+        self._spilled_rows += self.chunk_size
+        self._maps = {} # Remapped on next read
+
+    def _spilled(self, name):
+        """Memory-mapped view of the spilled rows of a column"""
+        spilled = self._maps.get(name)
+        if spilled is None:
+            dtype = dict(self.columns)[name]
+            spilled = np.memmap(os.path.join(self.spill_dir, f"{name}.bin"), dtype=dtype, mode='r',
+                                shape=(self._spilled_rows,))
+            self._maps[name] = spilled
+        return spilled
+
+    def _segments(self, name):
+        """(first row, array) pieces of a column in row order"""
+        row = 0
+        if self._spilled_rows:
+            yield 0, self._spilled(name)
+            row = self._spilled_rows
+        for chunk in self._chunks:
+            yield row, chunk[name]
+            row += self.chunk_size
+        if self._active_rows:
+            yield row, self._active[name][:self._active_rows]
+
+    def extend(self, times, columns):
+        """Append many rows at once; `columns` maps names to arrays as long as `times`"""
+        times = np.asarray(times, dtype=np.float64)
+        columns = {name: np.asarray(values) for name, values in columns.items()}
+        done = 0
+        while done < len(times):
+            row = self._active_rows
+            count = min(len(times) - done, self.chunk_size - row)
+            self._active['time'][row:row + count] = times[done:done + count]
+            for name, values in columns.items():
+                column = self._active.get(name)
+                if column is not None and name != 'time':
+                    column[row:row + count] = values[done:done + count]
+            done += count
+            self._active_rows = row + count
+            if self._active_rows == self.chunk_size:
+                self._seal_active()
+
+    def index_at(self, time_s, side='left', column='time'):
+        """Row index where time_s would be inserted to keep `column` (a sorted one, 'time' by default) sorted"""
+        for start, times in self._segments(column):
+            last = times[-1]
+            if time_s < last or (side == 'left' and time_s == last):
+                return start + int(np.searchsorted(times, time_s, side))
+        return len(self)
+
+    def rows(self, start=0, stop=None, names=None):
+        """Columns for rows [start, stop) as {name: array}; a single-block range is not copied"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        start = max(0, min(start, stop))
+        result = {}
+        for name in (names or self.names):
+            pieces = []
+            for first, array in self._segments(name):
+                last = first + len(array)
+                if last <= start or first >= stop:
+                    continue
+                pieces.append(array[max(start - first, 0):min(stop, last) - first])
+            if not pieces:
+                result[name] = np.empty(0, dtype=dict(self.columns)[name])
+            elif len(pieces) == 1:
+                result[name] = pieces[0]
+            else:
+                result[name] = np.concatenate(pieces)
+        return result
+
+    def take(self, indices, names=None):
+        """Columns for arbitrary rows (e.g. a sort permutation) as {name: array}"""
+        indices = np.asarray(indices, dtype=np.int64)
+        result = {}
+        for name in (names or self.names):
+            values = np.empty(len(indices), dtype=dict(self.columns)[name])
+            starts = []
+            arrays = []
+            for first, array in self._segments(name):
+                starts.append(first)
+                arrays.append(array)
+            segment = np.searchsorted(starts, indices, side='right') - 1
+            for i, (first, array) in enumerate(zip(starts, arrays)):
+                selected = segment == i
+                values[selected] = array[indices[selected] - first]
+            result[name] = values
+        return result
+
+    def slice(self, start_time=None, end_time=None, names=None):
+        """Columns for start_time <= time <= end_time (None = open end), 'time' included"""
+        start = 0 if start_time is None else self.index_at(start_time, 'left')
+        stop = len(self) if end_time is None else self.index_at(end_time, 'right')
+        if names is not None and 'time' not in names:
+            names = ('time',) + tuple(names)
+        return self.rows(start, stop, names)
+
+    def column(self, name, start_time=None, end_time=None):
+        return self.slice(start_time, end_time, (name,))[name]
+
+    def time_range(self):
+        """(first, last) time, or None when empty"""
+        if not len(self):
+            return None
+        times = self.rows(0, 1, ('time',))['time']
+        last = self.rows(len(self) - 1, len(self), ('time',))['time']
+        return float(times[0]), float(last[0])
+
+    def memory_bytes(self):
+        """Bytes held in RAM (spilled rows are only mapped)"""
+        per_chunk = sum(dtype.itemsize for name, dtype in self.columns) * self.chunk_size
+        return per_chunk * (len(self._chunks) + 1)
+
+    def close(self):
+        """Close and remove the spill files (if the spill directory is temporary)"""
+        self._maps = {}
+        for spill_file in self._spill_files.values():
+            spill_file.close()
+        self._spill_files = {}
+        if self._owns_spill_dir and self.spill_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spill_dir = None
+            self._owns_spill_dir = False
+        self._spilled_rows = 0
+        self._chunks = []
+        self._active = self._new_chunk()
+        self._active_rows = 0
@@ -0,0 +1,450 @@
+"""
+Indexed binary flight recording (.gsrec), written next to the text flight log.
+
+The file is a header followed by fixed-size block slots:
+
+    <8s magic> <I length> <length bytes of JSON schema>, zero padded to 64 bytes
+    slot 0, slot 1, ...
+    [footer: the block headers again] [<Q footer offset> <8s footer magic>]
+
+Every slot holds one block header - row count, CRC32 of the used rows,
+first/last time and the min/max of every column - then one array of
+`block_rows` values per column. Slots have a fixed size, so the whole data
+area memory-maps as one structured NumPy array: blocks['altitude'] is an
+(n_blocks, block_rows) view straight onto the file, and the block headers
+form the time index for a binary search.
+
+The recorder fills the last block in place (new rows, then its header)
+at most every `flush_interval_s`, so a reader can follow a flight that is
+still being written by calling refresh(). The footer is only written by
+close(); without it the reader walks back from the end to the last block
+whose CRC matches, so a file cut short by a crash or power loss still
+opens with everything up to the last good flush.
+
+RecorderThread runs a FlightRecorder on its own thread behind a bounded
+queue, so the block writes and flushes stay off the GUI thread (the same
+scheme as utils.logging_utils.LogService).
+
+Usage (from the GUI 2.1 directory):
+    python -m utils.flight_recorder info logs/flight_log_2025-07-23_21-41-08.gsrec
+    python -m utils.flight_recorder verify logs/flight_log_2025-07-23_21-41-08.gsrec
+"""
+
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+RECORDING_MAGIC = b'GSREC\x00\x01\n'
+BLOCK_MAGIC = b'BLK1'
+FOOTER_MAGIC = b'GSRIDX\x00\x01'
+SCHEMA_HEADER = struct.Struct('<I')
+FOOTER_TRAILER = struct.Struct('<Q8s')
+_ALIGN = 64
+
+
+def _header_dtype(count):
+    return np.dtype([('magic', 'S4'), ('rows', '<u4'), ('crc', '<u4'), ('seq', '<u4'),
+                     ('t_min', '<f8'), ('t_max', '<f8'),
+                     ('min', '<f8', (count,)), ('max', '<f8', (count,))])
+
+
+def _slot_dtype(columns, block_rows):
+    return np.dtype([('header', _header_dtype(len(columns)))] +
+                    [(name, dtype.newbyteorder('<'), (block_rows,)) for name, dtype in columns])
+
+
+def _block_crc(arrays, rows):
+    crc = 0
+    for values in arrays:
+        crc = zlib.crc32(np.ascontiguousarray(values[:rows]), crc)
+    return crc
+
+
+def _min_max(values):
+    """min, max as float (NaN ignored, NaN if there is nothing else)"""
+    values = values.astype(np.float64)
+    return float(np.fmin.reduce(values)), float(np.fmax.reduce(values))
+
+
+class FlightRecorder:
+    """Append rows of typed columns to a .gsrec file in fixed-size, indexed blocks"""
+
+    def __init__(self, path, columns, block_rows=1024, flush_interval_s=1.0, meta=None):
+        """
+        Args:
+            path: output file
+            columns: sequence of (name, dtype), e.g. FlightHistory.columns; a
+                float64 'time' column (sorted) is added first
+            block_rows: rows per block, a multiple of 8
+            flush_interval_s: longest time new rows wait before reaching the file
+            meta: JSON-serializable dict stored in the header
+        """
+        if block_rows <= 0 or block_rows % 8:
+            raise ValueError("block_rows must be a positive multiple of 8")
+        self.columns = (('time', np.dtype(np.float64)),) + tuple(
+            (name, np.dtype(dtype)) for name, dtype in columns if name != 'time')
+        self.names = tuple(name for name, dtype in self.columns)
+        self.fill = {name: (np.nan if dtype.kind == 'f' else 0) for name, dtype in self.columns}
+        self.block_rows = block_rows
+        self.flush_interval_s = flush_interval_s
+        self.slot_dtype = _slot_dtype(self.columns, block_rows)
+        self.header_dtype = self.slot_dtype['header']
+        self._column_offsets = {name: self.slot_dtype.fields[name][1] for name in self.names}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.file = open(path, 'wb')
+        schema = json.dumps({
+            'columns': [[name, dtype.newbyteorder('<').str] for name, dtype in self.columns],
+            'block_rows': block_rows,
+            'meta': meta or {},
+        }).encode('utf-8')
+        header = RECORDING_MAGIC + SCHEMA_HEADER.pack(len(schema)) + schema
+        self.data_start = -(-len(header) // _ALIGN) * _ALIGN
+        self.file.write(header.ljust(self.data_start, b'\0'))
+
+        self._block = self._new_block()
+        self._rows = 0 # Rows in the current block
+        self._flushed = 0 # Of which already in the file
+        self._index = 0 # Current block number
+        self._headers = [] # Headers of the full blocks, for the footer
+        self._last_flush = time.monotonic()
+        self.rows_written = 0
+
+    def _new_block(self):
+        return {name: np.full(self.block_rows, self.fill[name], dtype=dtype) for name, dtype in self.columns}
+
+    def __len__(self):
+        return self._index * self.block_rows + self._rows
+
+    def write_rows(self, data):
+        """Append rows given as {name: array}; 'time' is required, missing columns get the fill value"""
+        if self.file is None:
+            return
+        times = np.asarray(data['time'])
+        count = len(times)
+        done = 0
+        while done < count:
+            row = self._rows
+            take = min(count - done, self.block_rows - row)
+            for name in self.names:
+                values = data.get(name)
+                self._block[name][row:row + take] = self.fill[name] if values is None else values[done:done + take]
+            done += take
+            self._rows = row + take
+            if self._rows == self.block_rows:
+                self._headers.append(self._write_tail())
+                self._block = self._new_block()
+                self._rows = 0
+                self._flushed = 0
+                self._index += 1
+        self.rows_written += count
+        if time.monotonic() - self._last_flush >= self.flush_interval_s:
+            self.flush()
+
+    def flush(self):
+        """Write the rows still held in memory (the reader sees them after refresh())"""
+        if self.file is None:
+            return
+        if self._rows > self._flushed:
+            self._write_tail()
+        self.file.flush()
+        self._last_flush = time.monotonic()
+
+    def _write_tail(self):
+        """Write the unflushed rows of the current block, then its header; return the header"""
+        offset = self.data_start + self._index * self.slot_dtype.itemsize
+        if self._flushed == 0:
+            # Reserve the whole slot (zeros, no header yet) so the file is always whole slots
+            self.file.seek(0, os.SEEK_END)
+            if self.file.tell() < offset + self.slot_dtype.itemsize:
+                self.file.truncate(offset + self.slot_dtype.itemsize)
+        for name in self.names:
+            values = self._block[name]
+            self.file.seek(offset + self._column_offsets[name] + self._flushed * values.itemsize)
+            self.file.write(values[self._flushed:self._rows].tobytes())
+
+        rows = self._rows
+        header = np.zeros((), dtype=self.header_dtype)
+        header['magic'] = BLOCK_MAGIC
+        header['rows'] = rows
+        header['crc'] = _block_crc((self._block[name] for name in self.names), rows)
+        header['seq'] = self._index
+        header['t_min'] = self._block['time'][0]
+        header['t_max'] = self._block['time'][rows - 1]
+        for i, name in enumerate(self.names):
+            header['min'][i], header['max'][i] = _min_max(self._block[name][:rows])
+        # Data before header: a torn write leaves a CRC mismatch, never a header over missing rows
+        self.file.flush()
+        self.file.seek(offset)
+        self.file.write(header.tobytes())
+        self._flushed = rows
+        return header
+
+    def close(self):
+        """Flush, write the footer index and sync the file"""
+        if self.file is None:
+            return
+        headers = list(self._headers)
+        if self._rows:
+            headers.append(self._write_tail())
+        blocks = self._index + (1 if self._rows else 0)
+        footer_offset = self.data_start + blocks * self.slot_dtype.itemsize
+        self.file.seek(footer_offset)
+        self.file.truncate()
+        self.file.write(b''.join(header.tobytes() for header in headers))
+        self.file.write(FOOTER_TRAILER.pack(footer_offset, FOOTER_MAGIC))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecorderThread:
+    """Feeds a FlightRecorder from a writer thread; write_rows() only queues a copy of the rows"""
+
+    def __init__(self, recorder, queue_size=1024):
+        """
+        Args:
+            recorder: an open FlightRecorder, used only by the writer thread from now on
+            queue_size: row batches queued before new ones are dropped (counted)
+        """
+        self.recorder = recorder
+        self.path = recorder.path
+        self._queue = queue.Queue(maxsize=queue_size)
+        self.dropped_rows = 0
+        self.error = None # Last I/O error, the recording stops after one
+        self._thread = threading.Thread(target=self._run, name='flight-recorder', daemon=True)
+        self._thread.start()
+
+    def write_rows(self, data):
+        """Queue rows given as {name: array}; False if the queue was full and they were dropped"""
+        if self.error is not None:
+            return False
+        rows = {name: np.array(values) for name, values in data.items()} # The caller may reuse its arrays
+        try:
+            self._queue.put_nowait(rows)
+        except queue.Full:
+            self.dropped_rows += len(rows['time'])
+            return False
+        return True
+
+    def close(self, timeout=5.0):
+        """Write everything queued, close the recording and end the writer thread"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        recorder = self.recorder
+        while True:
+            try:
+                rows = self._queue.get(timeout=recorder.flush_interval_s)
+            except queue.Empty:
+                rows = ()
+            try:
+                if rows is None:
+                    recorder.close()
+                    return
+                if self.error is not None:
+                    continue
+                if rows:
+                    recorder.write_rows(rows)
+                else:
+                    recorder.flush() # Idle link: let a reader see the last rows
+            except OSError as e:
+                self.error = str(e)
+                print(f"Error writing flight recording {self.path}: {e}")
+                if rows is None:
+                    return
+
+
+class FlightRecording:
+    """Memory-mapped reader of a .gsrec file, also while it is being written.
+
+    Offers the FlightHistory read interface (len, index_at, rows, slice,
+    column, time_range), so a TelemetryQuery can run over a recording.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(RECORDING_MAGIC)) != RECORDING_MAGIC:
+                raise ValueError(f"{path} is not a flight recording")
+            try:
+                length, = SCHEMA_HEADER.unpack(f.read(SCHEMA_HEADER.size))
+                schema = json.loads(f.read(length).decode('utf-8'))
+            except (struct.error, ValueError):
+                raise ValueError(f"{path} has a truncated header") from None
+        self.columns = tuple((name, np.dtype(dtype)) for name, dtype in schema['columns'])
+        self.names = tuple(name for name, dtype in self.columns)
+        self.block_rows = schema['block_rows']
+        self.meta = schema.get('meta', {})
+        self.slot_dtype = _slot_dtype(self.columns, self.block_rows)
+        self.header_dtype = self.slot_dtype['header']
+        self.data_start = -(-(len(RECORDING_MAGIC) + SCHEMA_HEADER.size + length) // _ALIGN) * _ALIGN
+        self.blocks = np.zeros(0, dtype=self.slot_dtype)
+        self.headers = np.zeros(0, dtype=self.header_dtype)
+        self.complete = False # Footer found: the recorder closed the file
+        self.refresh()
+
+    def refresh(self):
+        """Map the blocks written since the last call; returns the row count"""
+        size = os.path.getsize(self.path)
+        slot_size = self.slot_dtype.itemsize
+        data_end = size
+        footer_offset = None
+        if size >= self.data_start + FOOTER_TRAILER.size:
+            with open(self.path, 'rb') as f:
+                f.seek(size - FOOTER_TRAILER.size)
+                offset, magic = FOOTER_TRAILER.unpack(f.read(FOOTER_TRAILER.size))
+            if magic == FOOTER_MAGIC and self.data_start <= offset <= size - FOOTER_TRAILER.size:
+                data_end = footer_offset = offset
+
+        count = max(data_end - self.data_start, 0) // slot_size # A partial slot at the end is ignored
+        if not count:
+            self.blocks = np.zeros(0, dtype=self.slot_dtype)
+            self.headers = np.zeros(0, dtype=self.header_dtype)
+            return 0
+        blocks = np.memmap(self.path, dtype=self.slot_dtype, mode='r', offset=self.data_start, shape=(count,))
+
+        if footer_offset is not None:
+            headers = np.fromfile(self.path, dtype=self.header_dtype, count=count, offset=footer_offset)
+            self.complete = True
+        else:
+            headers = np.array(blocks['header'])
+            # Blocks up to the first slot without a header (reserved, not yet written)
+            valid = (headers['magic'] == BLOCK_MAGIC) & (headers['seq'] == np.arange(count))
+            count = int(np.argmin(valid)) if not valid.all() else count
+            # Only the last blocks can be torn: drop them until a CRC matches
+            while count and not self._crc_ok(blocks[count - 1], headers[count - 1]):
+                count -= 1
+            headers = headers[:count]
+            self.complete = False
+        self.blocks = blocks[:count]
+        self.headers = headers
+        return len(self)
+
+    def _crc_ok(self, block, header):
+        return _block_crc((block[name] for name in self.names), int(header['rows'])) == int(header['crc'])
+
+    def verify(self):
+        """Indices of the blocks whose data does not match their CRC"""
+        return [i for i in range(len(self.blocks)) if not self._crc_ok(self.blocks[i], self.headers[i])]
+
+    def __len__(self):
+        if not len(self.headers):
+            return 0
+        return (len(self.headers) - 1) * self.block_rows + int(self.headers['rows'][-1])
+
+    def column_blocks(self, name):
+        """(blocks, block_rows) memory-mapped view of a column; rows past len() in the last block are padding"""
+        return self.blocks[name]
+
+    def block_stats(self, name):
+        """Per-block {'t_min', 't_max', 'min', 'max'} of a column, to skip blocks without reading them"""
+        i = self.names.index(name)
+        return {'t_min': self.headers['t_min'], 't_max': self.headers['t_max'],
+                'min': self.headers['min'][:, i], 'max': self.headers['max'][:, i]}
+
+    def index_at(self, time_s, side='left', column='time'):
+        """Row index where time_s would be inserted to keep `column` (a sorted one, 'time' by default) sorted"""
+        if not len(self.headers):
+            return 0
+        # Block maxima are sorted for a sorted column: binary search the blocks, then the rows
+        maxima = self.headers['t_max'] if column == 'time' else self.headers['max'][:, self.names.index(column)]
+        block = int(np.searchsorted(maxima, time_s, side))
+        if block == len(self.headers):
+            return len(self)
+        values = self.blocks[column][block][:int(self.headers['rows'][block])]
+        return block * self.block_rows + int(np.searchsorted(values, time_s, side))
+
+    def rows(self, start=0, stop=None, names=None):
+        """Columns for rows [start, stop) as {name: array}; a single-block range is not copied"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        start = max(0, min(start, stop))
+        first = start // self.block_rows
+        last = -(-stop // self.block_rows)
+        offset = first * self.block_rows
+        result = {}
+        for name in (names or self.names):
+            if start == stop:
+                result[name] = np.empty(0, dtype=dict(self.columns)[name])
+            elif last - first == 1:
+                result[name] = self.blocks[name][first][start - offset:stop - offset]
+            else:
+                result[name] = self.blocks[name][first:last].reshape(-1)[start - offset:stop - offset]
+        return result
+
+    def take(self, indices, names=None):
+        """Columns for arbitrary rows (e.g. a sort permutation) as {name: array}"""
+        indices = np.asarray(indices, dtype=np.int64)
+        blocks, rows = np.divmod(indices, self.block_rows)
+        return {name: self.blocks[name][blocks, rows] for name in (names or self.names)}
+
+    def slice(self, start_time=None, end_time=None, names=None):
+        """Columns for start_time <= time <= end_time (None = open end), 'time' included"""
+        start = 0 if start_time is None else self.index_at(start_time, 'left')
+        stop = len(self) if end_time is None else self.index_at(end_time, 'right')
+        if names is not None and 'time' not in names:
+            names = ('time',) + tuple(names)
+        return self.rows(start, stop, names)
+
+    def column(self, name, start_time=None, end_time=None):
+        return self.slice(start_time, end_time, (name,))[name]
+
+    def time_range(self):
+        """(first, last) time, or None when empty"""
+        if not len(self.headers):
+            return None
+        return float(self.headers['t_min'][0]), float(self.headers['t_max'][-1])
+
+    def summary(self):
+        time_range = self.time_range()
+        return {
+            'rows': len(self),
+            'blocks': len(self.headers),
+            'block_rows': self.block_rows,
+            'columns': len(self.columns),
+            'time_range': time_range,
+            'duration_s': (time_range[1] - time_range[0]) if time_range else 0.0,
+            'complete': self.complete,
+            'file_bytes': os.path.getsize(self.path),
+            'meta': self.meta,
+        }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Flight recording tools')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    info_parser = sub.add_parser('info', help='Show recording statistics')
+    info_parser.add_argument('recording')
+
+    verify_parser = sub.add_parser('verify', help='Check the CRC of every block')
+    verify_parser.add_argument('recording')
+
+    args = parser.parse_args()
+    recording = FlightRecording(args.recording)
+    if args.command == 'info':
+        for key, value in recording.summary().items():
+            print(f"{key}: {value}")
+    elif args.command == 'verify':
+        bad = recording.verify()
+        print(f"{len(recording.headers) - len(bad)}/{len(recording.headers)} blocks OK" +
+              (f", bad: {bad}" if bad else ""))
@@ -0,0 +1,162 @@
+"""
+Row filters over a FlightHistory (or FlightRecording), evaluated with NumPy.
+
+A filter is a small expression over column names:
+
+    rssi < -110
+    altitude > 1000 and gps_valid
+    actuator_status changes or (snr <= 0 and not gps_valid)
+
+Comparisons are <, <=, >, >=, ==, != against a number (or true/false), a
+bare column is true where it is non-zero, and `changes` (or `changed`) is
+true on rows whose value differs from the previous row. `and`, `or`, `not`
+and parentheses combine them. The text is parsed here, never eval()'d.
+
+evaluate() reads only the columns the filter uses, `chunk_rows` rows at a
+time, so memory stays bounded however long the history is, and returns
+the matching row indices.
+"""
+
+import operator
+import re
+
+import numpy as np
+
+_TOKEN = re.compile(r'\s*(?:(<=|>=|==|!=|<|>|\(|\))|([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|([A-Za-z_]\w*))')
+_COMPARISONS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+                '==': operator.eq, '!=': operator.ne}
+_CONSTANTS = {'true': 1.0, 'false': 0.0, 'yes': 1.0, 'no': 0.0}
+
+
+class HistoryFilter:
+    """A parsed filter expression; see the module docstring for the syntax"""
+
+    def __init__(self, text, names):
+        """
+        Args:
+            text: filter expression
+            names: columns that may be used
+
+        Raises:
+            ValueError: on a syntax error or an unknown column
+        """
+        self.text = text.strip()
+        self.names = tuple(names)
+        self.columns = set()
+        self._tokens = self._tokenize(self.text)
+        self._pos = 0
+        self.tree = self._parse_or()
+        if self._pos < len(self._tokens):
+            raise ValueError(f"Unexpected '{self._tokens[self._pos]}'")
+
+    def _tokenize(self, text):
+        tokens = []
+        pos = 0
+        while pos < len(text):
+            match = _TOKEN.match(text, pos)
+            if match is None or match.end() == pos:
+                if text[pos:].strip():
+                    raise ValueError(f"Cannot read '{text[pos:].strip()}'")
+                break
+            symbol, number, word = match.groups()
+            if number is not None:
+                tokens.append(float(number))
+            else:
+                tokens.append(symbol or word)
+            pos = match.end()
+        if not tokens:
+            raise ValueError("Empty filter")
+        return tokens
+
+    def _peek(self):
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else None
+
+    def _next(self):
+        token = self._peek()
+        if token is None:
+            raise ValueError("Filter ends too early")
+        self._pos += 1
+        return token
+
+    def _parse_or(self):
+        node = self._parse_and()
+        while isinstance(self._peek(), str) and self._peek().lower() == 'or':
+            self._next()
+            node = ('or', node, self._parse_and())
+        return node
+
+    def _parse_and(self):
+        node = self._parse_not()
+        while isinstance(self._peek(), str) and self._peek().lower() == 'and':
+            self._next()
+            node = ('and', node, self._parse_not())
+        return node
+
+    def _parse_not(self):
+        if isinstance(self._peek(), str) and self._peek().lower() == 'not':
+            self._next()
+            return ('not', self._parse_not())
+        return self._parse_condition()
+
+    def _parse_condition(self):
+        token = self._next()
+        if token == '(':
+            node = self._parse_or()
+            if self._next() != ')':
+                raise ValueError("Missing ')'")
+            return node
+        if not isinstance(token, str) or token in _COMPARISONS or token == ')':
+            raise ValueError(f"Expected a column name, got '{token}'")
+        if token not in self.names:
+            raise ValueError(f"Unknown column '{token}'")
+        self.columns.add(token)
+
+        following = self._peek()
+        if following in _COMPARISONS:
+            self._next()
+            value = self._next()
+            if isinstance(value, str):
+                if value.lower() not in _CONSTANTS:
+                    raise ValueError(f"Expected a number after '{token} {following}', got '{value}'")
+                value = _CONSTANTS[value.lower()]
+            return ('compare', token, following, value)
+        if isinstance(following, str) and following.lower() in ('changes', 'changed'):
+            self._next()
+            return ('changes', token)
+        return ('truthy', token)
+
+    def _mask(self, node, data):
+        kind = node[0]
+        if kind == 'or':
+            return self._mask(node[1], data) | self._mask(node[2], data)
+        if kind == 'and':
+            return self._mask(node[1], data) & self._mask(node[2], data)
+        if kind == 'not':
+            return ~self._mask(node[1], data)
+        values = data[node[1]]
+        if kind == 'compare':
+            with np.errstate(invalid='ignore'):
+                return _COMPARISONS[node[2]](values, node[3])
+        if kind == 'changes':
+            changed = np.zeros(len(values), dtype=bool)
+            changed[1:] = values[1:] != values[:-1]
+            if values.dtype.kind == 'f':
+                changed[1:] &= ~(np.isnan(values[1:]) & np.isnan(values[:-1]))
+            return changed
+        return values.astype(bool)
+
+    def evaluate(self, history, start=0, stop=None, chunk_rows=1 << 20):
+        """Indices of the rows in [start, stop) that match, as an int64 array"""
+        stop = len(history) if stop is None else min(stop, len(history))
+        names = tuple(self.columns)
+        matches = []
+        for first in range(start, stop, chunk_rows):
+            last = min(first + chunk_rows, stop)
+            # One row of context before the chunk, for `changes`
+            context = 1 if first > 0 else 0
+            data = history.rows(first - context, last, names)
+            mask = self._mask(self.tree, data)[context:]
+            matches.append(np.flatnonzero(mask) + first)
+        if not matches:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(matches).astype(np.int64, copy=False)
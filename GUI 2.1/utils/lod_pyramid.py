@@ -0,0 +1,144 @@
+"""
+Min/max level-of-detail pyramid over FlightHistory columns, for plotting.
+
+Level k holds one (time, min, max) bin per 2**k history rows, so each
+level halves the resolution of the one below and all of them together
+take less memory than the rows they cover. Bins are built incrementally
+from the rows appended since the last update(). render() picks the
+coarsest level that still gives about one bin per pixel of the visible
+range, and draws every bin as a vertical min-max segment, so a one-sample
+spike stays visible at any zoom. Ranges short enough to draw directly are
+read from the history itself.
+"""
+
+import numpy as np
+
+
+class _Level:
+    """Growable bin arrays of one pyramid level"""
+
+    def __init__(self, names, capacity=1024):
+        self.size = 0
+        self.time = np.empty(capacity)
+        self.min = {name: np.empty(capacity) for name in names}
+        self.max = {name: np.empty(capacity) for name in names}
+        self.carry = None # Items of the level below not yet forming a full bin
+
+    def append(self, times, mins, maxs):
+        count = len(times)
+        if self.size + count > len(self.time):
+            capacity = max(2 * len(self.time), self.size + count)
+            self.time = _grow(self.time, capacity)
+            self.min = {name: _grow(values, capacity) for name, values in self.min.items()}
+            self.max = {name: _grow(values, capacity) for name, values in self.max.items()}
+        end = self.size + count
+        self.time[self.size:end] = times
+        for name in self.min:
+            self.min[name][self.size:end] = mins[name]
+            self.max[name][self.size:end] = maxs[name]
+        self.size = end
+
+
+def _grow(array, capacity):
+    grown = np.empty(capacity, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class MinMaxPyramid:
+    """Min/max decimation levels of some FlightHistory columns, updated as rows arrive"""
+
+    def __init__(self, history, names, first_level=3):
+        """
+        Args:
+            history: FlightHistory to decimate
+            names: columns to keep bins for
+            first_level: finest level kept (bins of 2**first_level rows); finer
+                ranges are drawn from the history rows
+        """
+        self.history = history
+        self.names = tuple(names)
+        self.first_level = first_level
+        self.levels = [] # levels[i] bins 2**(first_level + i) rows
+        self.rows = 0 # History rows folded into the levels
+
+    def update(self):
+        """Fold the rows appended to the history since the last call into the levels"""
+        count = len(self.history)
+        if count <= self.rows:
+            return
+        data = self.history.rows(self.rows, count, ('time',) + self.names)
+        self.rows = count
+        values = {name: data[name].astype(np.float64) for name in self.names}
+        self._fold(0, data['time'], values, values, 2 ** self.first_level)
+
+    def _fold(self, index, times, mins, maxs, factor):
+        """Combine items of the level below into full bins of `index`, then carry up"""
+        if index == len(self.levels):
+            self.levels.append(_Level(self.names))
+        level = self.levels[index]
+        if level.carry is not None:
+            carry_times, carry_mins, carry_maxs = level.carry
+            times = np.concatenate((carry_times, times))
+            mins = {name: np.concatenate((carry_mins[name], mins[name])) for name in self.names}
+            maxs = {name: np.concatenate((carry_maxs[name], maxs[name])) for name in self.names}
+        bins = len(times) // factor
+        used = bins * factor
+        level.carry = (times[used:], {name: mins[name][used:] for name in self.names},
+                       {name: maxs[name][used:] for name in self.names}) if used < len(times) else None
+        if not bins:
+            return
+        # fmin/fmax ignore NaN unless the whole bin is NaN
+        bin_times = times[:used:factor]
+        bin_mins = {name: np.fmin.reduce(mins[name][:used].reshape(bins, factor), axis=1) for name in self.names}
+        bin_maxs = {name: np.fmax.reduce(maxs[name][:used].reshape(bins, factor), axis=1) for name in self.names}
+        level.append(bin_times, bin_mins, bin_maxs)
+        self._fold(index + 1, bin_times, bin_mins, bin_maxs, 2)
+
+    def render(self, name, start, end, pixels):
+        """(x, y) arrays of `name` for start <= time <= end, about two points per pixel at most"""
+        history = self.history
+        # One row beyond each edge so the curve reaches the border of the view
+        first = max(history.index_at(start, 'left') - 1, 0)
+        stop = min(history.index_at(end, 'right') + 1, len(history))
+        count = stop - first
+        pixels = max(int(pixels), 1)
+        if count <= 2 * pixels or not self.levels or not self.levels[0].size:
+            data = history.rows(first, stop, ('time', name))
+            return data['time'], data[name]
+
+        # Coarsest level needed for about one bin per pixel (or the coarsest there is)
+        index = 0
+        while (count >> (self.first_level + index)) > pixels and index + 1 < len(self.levels) \
+                and self.levels[index + 1].size:
+            index += 1
+        level = self.levels[index]
+        shift = self.first_level + index
+        first_bin = first >> shift
+        stop_bin = min(-(-stop >> shift), level.size)
+        bins = max(stop_bin - first_bin, 0)
+
+        x = np.empty(2 * bins + 2)
+        y = np.empty(2 * bins + 2)
+        x[0:2 * bins:2] = level.time[first_bin:stop_bin]
+        x[1:2 * bins:2] = level.time[first_bin:stop_bin]
+        y[0:2 * bins:2] = level.min[name][first_bin:stop_bin]
+        y[1:2 * bins:2] = level.max[name][first_bin:stop_bin]
+
+        # Rows after the last full bin (the live end of the flight) become one more bin
+        tail = max(stop_bin << shift, first)
+        if tail >= stop:
+            return x[:2 * bins], y[:2 * bins]
+        data = history.rows(tail, stop, ('time', name))
+        values = data[name].astype(np.float64)
+        x[2 * bins:] = data['time'][0]
+        if np.isnan(values).all():
+            y[2 * bins:] = np.nan
+        else:
+            y[2 * bins] = np.nanmin(values)
+            y[2 * bins + 1] = np.nanmax(values)
+        return x, y
+
+    def memory_bytes(self):
+        return sum(level.time.nbytes + sum(values.nbytes for values in level.min.values()) +
+                   sum(values.nbytes for values in level.max.values()) for level in self.levels)
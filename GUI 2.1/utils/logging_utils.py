@@ -0,0 +1,292 @@
+"""
+Background log writing for the flight, event and tracking logs.
+
+Panels hand lines to a LogStream, which only puts them on a bounded queue;
+one LogService thread does all the file I/O. Lines are group-committed:
+the writer collects everything queued and writes it with one write() and
+flush() per file once `commit_bytes` are pending or the oldest line has
+waited `commit_interval_s`. A full queue drops lines (counted) instead of
+blocking the GUI thread.
+
+fsync policy:
+    'never'  - leave it to the OS
+    'close'  - when a file is closed or rotated (default)
+    'commit' - after every group commit
+
+Files rotate to <name>_partN<ext> after `max_bytes` or `max_age_s`, and
+can be gzip-compressed as they are written (<name>.gz).
+"""
+
+import gzip
+import os
+import queue
+import threading
+import time
+
+FSYNC_POLICIES = ('never', 'close', 'commit')
+
+# Queue item kinds
+_WRITE = 0
+_CLOSE = 1
+_STOP = 2
+
+
+class LogStream:
+    """One log file written by a LogService"""
+
+    def __init__(self, service, path, header, max_bytes, max_age_s, compress):
+        self.service = service
+        self.base_path = path + '.gz' if compress else path
+        self.path = self.base_path # Current part
+        self.header = header
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.compress = compress
+        self.error = None # Last I/O error, the stream stops writing after one
+        self.closed = False
+
+        # Writer thread state
+        self._file = None
+        self._part = 0
+        self._part_bytes = 0
+        self._part_opened = 0.0
+
+    def write(self, text):
+        """Queue text (newline included); False if the queue was full and it was dropped"""
+        if self.closed:
+            return False
+        return self.service._put(_WRITE, self, text)
+
+    def close(self, footer=''):
+        """Write the footer and close the file after everything queued before"""
+        if not self.closed:
+            self.closed = True
+            self.service._put(_CLOSE, self, footer, block=True)
+
+
+class LogService:
+    """Single writer thread with a bounded queue and group commit for all log files"""
+
+    def __init__(self, queue_size=10000, commit_bytes=64 * 1024, commit_interval_s=0.5, fsync='close',
+                 max_bytes=0, max_age_s=0, compress=False):
+        """
+        Args:
+            queue_size: lines (or joined batches) queued before writes are dropped
+            commit_bytes, commit_interval_s: group commit thresholds
+            fsync: one of FSYNC_POLICIES
+            max_bytes, max_age_s, compress: defaults for open()
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}")
+        self.commit_bytes = commit_bytes
+        self.commit_interval_s = commit_interval_s
+        self.fsync = fsync
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.compress = compress
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._streams = set()
+
+        # Statistics
+        self.queue_high_water = 0
+        self.dropped = 0
+        self.commits = 0
+        self.bytes_written = 0
+        self.errors = 0
+        self.last_latency_s = 0.0 # Oldest line of the last commit: queued -> written
+        self.max_latency_s = 0.0
+        self.last_write_s = 0.0 # Duration of the last commit's file I/O
+        self.max_write_s = 0.0
+
+    @classmethod
+    def from_settings(cls, settings_model):
+        return cls(
+            queue_size=settings_model.get('logging.queue_size', 10000),
+            commit_bytes=settings_model.get('logging.commit_bytes', 64 * 1024),
+            commit_interval_s=settings_model.get('logging.commit_interval_ms', 500) / 1000.0,
+            fsync=settings_model.get('logging.fsync', 'close'),
+            max_bytes=settings_model.get('logging.max_bytes', 0),
+            max_age_s=settings_model.get('logging.max_age_s', 0),
+            compress=settings_model.get('logging.compress', False),
+        )
+
+    def open(self, path, header='', max_bytes=None, max_age_s=None, compress=None):
+        """Create a stream; the file itself is opened by the writer thread on the first commit.
+
+        Args:
+            path: log file path (.gz is appended when compressing)
+            header: text written at the top of the file and of every rotated part
+            max_bytes, max_age_s: rotate after this many bytes / seconds (0 = never)
+            compress: gzip the file while writing
+            (None = the service defaults)
+        """
+        self._start()
+        return LogStream(self, path, header,
+                         self.max_bytes if max_bytes is None else max_bytes,
+                         self.max_age_s if max_age_s is None else max_age_s,
+                         self.compress if compress is None else compress)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+                self._thread.start()
+
+    def _put(self, kind, stream, payload, block=False):
+        item = (kind, stream, payload, time.monotonic())
+        try:
+            if block:
+                self._queue.put(item)
+            else:
+                self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        depth = self._queue.qsize()
+        if depth > self.queue_high_water:
+            self.queue_high_water = depth
+        return True
+
+    def stop(self, timeout=5.0):
+        """Commit everything queued, close all files and end the writer thread"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put((_STOP, None, None, time.monotonic()))
+        thread.join(timeout)
+
+    def get_stats(self):
+        return {
+            'queue_depth': self._queue.qsize(),
+            'queue_capacity': self._queue.maxsize,
+            'queue_high_water': self.queue_high_water,
+            'dropped': self.dropped,
+            'commits': self.commits,
+            'bytes_written': self.bytes_written,
+            'errors': self.errors,
+            'last_latency_ms': self.last_latency_s * 1000,
+            'max_latency_ms': self.max_latency_s * 1000,
+            'last_write_ms': self.last_write_s * 1000,
+            'max_write_ms': self.max_write_s * 1000,
+            'open_files': len(self._streams),
+        }
+
+    def _run(self):
+        """Writer thread: collect queued lines and commit them in groups"""
+        pending = {} # stream -> [text, ...]
+        pending_bytes = 0
+        oldest = None # Enqueue time of the oldest pending line
+        while True:
+            timeout = None if oldest is None else max(oldest + self.commit_interval_s - time.monotonic(), 0)
+            try:
+                kind, stream, payload, queued_at = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                kind = None
+
+            if kind == _WRITE:
+                pending.setdefault(stream, []).append(payload)
+                pending_bytes += len(payload)
+                if oldest is None:
+                    oldest = queued_at
+                if pending_bytes < self.commit_bytes and time.monotonic() - oldest < self.commit_interval_s:
+                    continue
+            elif kind == _CLOSE:
+                pending.setdefault(stream, []).append(payload)
+            elif kind == _STOP:
+                self._commit(pending, oldest)
+                for stream in list(self._streams):
+                    self._close_file(stream)
+                return
+
+            self._commit(pending, oldest)
+            pending = {}
+            pending_bytes = 0
+            oldest = None
+            if kind == _CLOSE:
+                self._close_file(stream)
+
+    def _commit(self, pending, oldest):
+        """One write and flush per file for everything pending"""
+        if not pending:
+            return
+        started = time.monotonic()
+        for stream, texts in pending.items():
+            if stream.error is not None:
+                continue
+            text = ''.join(texts)
+            if not text:
+                continue
+            try:
+                self._rotate_if_needed(stream)
+                data = text.encode('utf-8')
+                stream._file.write(data)
+                stream._file.flush()
+                if self.fsync == 'commit':
+                    os.fsync(stream._file.fileno())
+                stream._part_bytes += len(data)
+                self.bytes_written += len(data)
+            except OSError as e:
+                self._fail(stream, e)
+        finished = time.monotonic()
+        self.commits += 1
+        self.last_write_s = finished - started
+        self.max_write_s = max(self.max_write_s, self.last_write_s)
+        if oldest is not None:
+            self.last_latency_s = finished - oldest
+            self.max_latency_s = max(self.max_latency_s, self.last_latency_s)
+
+    def _rotate_if_needed(self, stream):
+        if stream._file is not None:
+            too_big = stream.max_bytes and stream._part_bytes >= stream.max_bytes
+            too_old = stream.max_age_s and time.monotonic() - stream._part_opened >= stream.max_age_s
+            if not (too_big or too_old):
+                return
+            self._close_file(stream)
+            stream._part += 1
+        self._open_file(stream)
+
+    def _open_file(self, stream):
+        path = stream.base_path
+        if stream._part:
+            root, ext = os.path.splitext(path[:-3] if stream.compress else path)
+            path = f"{root}_part{stream._part}{ext}" + ('.gz' if stream.compress else '')
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        stream._file = gzip.open(path, 'wb') if stream.compress else open(path, 'wb')
+        stream.path = path
+        stream._part_bytes = 0
+        stream._part_opened = time.monotonic()
+        self._streams.add(stream)
+        if stream.header:
+            data = stream.header.encode('utf-8')
+            stream._file.write(data)
+            stream._part_bytes += len(data)
+
+    def _close_file(self, stream):
+        file = stream._file
+        if file is None:
+            return
+        stream._file = None
+        self._streams.discard(stream)
+        try:
+            file.flush()
+            if self.fsync != 'never':
+                os.fsync(file.fileno())
+            file.close()
+        except OSError as e:
+            self._fail(stream, e)
+
+    def _fail(self, stream, error):
+        self.errors += 1
+        stream.error = str(error)
+        print(f"Error writing log {stream.path}: {error}")
+        if stream._file is not None:
+            try:
+                stream._file.close()
+            except OSError:
+                pass
+            stream._file = None
+            self._streams.discard(stream)
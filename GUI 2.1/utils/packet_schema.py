@@ -0,0 +1,192 @@
+"""
+Declarative packet layouts and the decoders compiled from them.
+
+Every consumer of FC packets (TelemetryController, FlightLogAnalyzer, the
+replay/benchmark tools) decodes through the tables below, so a firmware
+layout change is a single edit here.
+
+A layout is a tuple of Field(name, kind). The position in the tuple is the
+CSV field index. compile_decoder() turns a layout into a plain Python
+function with one inlined conversion per field - no per-field closures,
+no repeated len() checks - that maps a list of CSV strings to a dict.
+"""
+
+from collections import namedtuple
+
+Field = namedtuple('Field', 'name kind')
+
+INT = 'int'
+FLOAT = 'float'
+BOOL = 'bool'
+
+DEFAULTS = {INT: 0, FLOAT: 0.0, BOOL: False}
+
+# FC packet as relayed by the ground station after the 'FC:' prefix
+FC_FIELDS = (
+    # Basic fields (0-2)
+    Field('ack', INT),
+    Field('rssi', INT),
+    Field('snr', INT),
+    # FC time (3-4) - field 3 is sent empty
+    Field('fc_unix_time_usec', INT),
+    Field('fc_boot_time_ms', INT),
+    # Pixhawk GPS (5-9)
+    Field('gps_lat', FLOAT),
+    Field('gps_lon', FLOAT),
+    Field('gps_alt', FLOAT),
+    Field('ground_speed', FLOAT),
+    Field('gps_time', FLOAT),
+    # FC IMU (10-12) - sent empty
+    Field('abs_pressure1', FLOAT),
+    Field('temperature1', FLOAT),
+    Field('altitude1', FLOAT),
+    # Pixhawk IMU (13-15)
+    Field('abs_pressure2', FLOAT),
+    Field('temperature2', FLOAT),
+    Field('diff_pressure2', FLOAT),
+    # FC status (16-17)
+    Field('sd_status', BOOL),
+    Field('actuator_status', BOOL),
+    # Pixhawk status (18-20)
+    Field('logging_active', BOOL),
+    Field('write_rate', INT),
+    Field('space_left', INT),
+    # Pixhawk time (21-22) - field 21 is sent empty
+    Field('pix_unix_time_usec', INT),
+    Field('pix_boot_time_ms', INT),
+    # Vibration (23-28) - sent empty
+    Field('vibe_x', FLOAT),
+    Field('vibe_y', FLOAT),
+    Field('vibe_z', FLOAT),
+    Field('clip_x', INT),
+    Field('clip_y', INT),
+    Field('clip_z', INT),
+    # Navigation (29-34) - 31-34 sent empty
+    Field('gps_bearing', FLOAT),
+    Field('gps_bearing_magnetic', FLOAT),
+    Field('gps_bearing_true', FLOAT),
+    Field('gps_bearing_ground_speed', FLOAT),
+    Field('gps_bearing_ground_speed_magnetic', FLOAT),
+    Field('gps_bearing_ground_speed_true', FLOAT),
+    # Photodiodes (35-36)
+    Field('photodiode_value1', INT),
+    Field('photodiode_value2', INT),
+    # Battery voltages (37-38)
+    Field('fc_battery_voltage', FLOAT),
+    Field('led_battery_voltage', FLOAT),
+)
+
+FC_FIELD_INDEX = {field.name: index for index, field in enumerate(FC_FIELDS)}
+
+# Legacy radioPacket struct printed by lora.py in SDR mode
+SDR_FIELDS = (
+    # Communication data
+    Field('ack', INT),
+    Field('RSSI', INT),
+    Field('SNR', INT),
+    # IMU data
+    Field('fRoll', FLOAT),
+    Field('fPitch', FLOAT),
+    Field('fYaw', FLOAT),
+    Field('Pressure', FLOAT),
+    Field('Temperature', FLOAT),
+    Field('Altitude', FLOAT),
+    # System status
+    Field('SDStatus', BOOL),
+    Field('actuatorStatus', BOOL),
+    Field('photodiodeValue1', INT),
+    Field('photodiodeValue2', INT),
+    # GPS data
+    Field('gpsLat', FLOAT),
+    Field('gpsLon', FLOAT),
+    Field('gpsAlt', FLOAT),
+    Field('gpsSpeed', FLOAT),
+    Field('gpsTime', FLOAT),
+    Field('gpsValid', BOOL),
+)
+
+_CONVERT = {
+    INT: 'int(v)',
+    FLOAT: 'float(v)',
+    BOOL: 'int(v) != 0',
+}
+
+
+def compile_decoder(fields, strict=False, name='decode'):
+    """Build a decoder function values -> dict for a field layout.
+
+    Missing trailing fields and empty fields get the kind's default.
+    With strict=False an unparsable field also gets its default; with
+    strict=True it raises ValueError so the caller can reject the packet.
+
+    The generated function unpacks all fields at once and converts them in a
+    single dict display. Only if that raises (a malformed field) does it fall
+    back to converting field by field.
+    """
+    count = len(fields)
+    names = [f"v{index}" for index in range(count)]
+    lines = [f"def {name}(values):"]
+    lines.append(f"    if len(values) != {count}:")
+    lines.append(f"        values = (list(values) + _PAD)[:{count}]")
+    lines.append(f"    {', '.join(names)}, = values")
+
+    # Fast path: every field well-formed or empty. Empty fields are common
+    # (the firmware leaves unused slots blank), so they are tested first.
+    items = []
+    for index, field in enumerate(fields):
+        convert = _CONVERT[field.kind].replace('v', f"v{index}", 1)
+        items.append(f"{field.name!r}: {convert} if v{index} else {DEFAULTS[field.kind]!r}")
+    fast_return = "return {" + ", ".join(items) + "}"
+    if strict:
+        lines.append(f"    {fast_return}")
+    else:
+        # A stream that keeps sending one bad field (e.g. another firmware
+        # revision) would pay for a failed fast attempt on every packet, so
+        # stay on the slow path until a packet decodes cleanly again.
+        lines.append("    if not _state[0]:")
+        lines.append("        try:")
+        lines.append(f"            {fast_return}")
+        lines.append("        except ValueError:")
+        lines.append("            pass")
+
+        # Slow path: convert field by field, defaulting the bad ones
+        lines.append("    bad = False")
+        for index, field in enumerate(fields):
+            convert = _CONVERT[field.kind].replace('v', f"v{index}", 1)
+            lines.append("    try:")
+            lines.append(f"        v{index} = {convert} if v{index} else {DEFAULTS[field.kind]!r}")
+            lines.append("    except ValueError:")
+            lines.append(f"        v{index} = {DEFAULTS[field.kind]!r}")
+            lines.append("        bad = True")
+        lines.append("    _state[0] = bad")
+        lines.append("    return {" + ", ".join(f"{field.name!r}: v{index}" for index, field in enumerate(fields)) + "}")
+
+    namespace = {'_PAD': [''] * count, '_state': [False]}
+    exec('\n'.join(lines), namespace)
+    decoder = namespace[name]
+    decoder.fields = fields
+    decoder.source = '\n'.join(lines)
+    return decoder
+
+
+decode_fc_values = compile_decoder(FC_FIELDS, name='decode_fc_values')
+decode_sdr_values = compile_decoder(SDR_FIELDS, strict=True, name='decode_sdr_values')
+
+
+def derive_fc_fields(packet):
+    """Add the compatibility fields the model and panels expect to a decoded FC packet"""
+    packet['gps_valid'] = packet['gps_lat'] != 0.0 and packet['gps_lon'] != 0.0
+    packet['altitude'] = packet['gps_alt'] # Use GPS altitude as primary altitude
+    packet['pressure'] = packet['abs_pressure2'] # Use Pixhawk pressure
+    packet['temperature'] = packet['temperature2'] # Use Pixhawk temperature
+    return packet
+
+
+def decode_fc(data):
+    """Decode the CSV payload of an FC packet (without the 'FC:' prefix), including derived fields"""
+    return derive_fc_fields(decode_fc_values(data.split(',')))
+
+
+if __name__ == '__main__':
+    # Print the generated decoder, e.g. to review a layout change
+    print(decode_fc_values.source)
@@ -0,0 +1,84 @@
+"""
+Frame-paced view refresh, decoupled from packet arrival.
+
+The models absorb packets at whatever rate they arrive. RefreshScheduler
+collects what changed (TelemetryModel.fields_changed masks and the latest
+arguments of coalesced signals) and repaints the registered views at most
+once per `ui.update_interval` ms, from the latest state. Views that need
+every sample (plots appending to their buffers) keep a direct connection
+for that and only repaint here.
+"""
+
+from PyQt5.QtCore import QObject, QTimer
+
+from models.telemetry_snapshot import ALL_GROUPS
+
+
+class RefreshScheduler(QObject):
+    """Repaint registered views at a fixed frame rate from the latest coalesced state"""
+
+    def __init__(self, telemetry_model, interval_ms=100, parent=None):
+        super().__init__(parent)
+        self.interval_ms = max(int(interval_ms), 1)
+        self._views = [] # (groups, callback)
+        self._pending_mask = 0
+        self._latest = {} # slot -> latest signal args
+
+        # Statistics
+        self.updates = 0 # Model changes absorbed
+        self.frames = 0 # Refreshes run
+
+        # Single-shot: an idle link costs nothing, a busy one refreshes once per interval
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.refresh)
+
+        telemetry_model.fields_changed.connect(self._on_fields_changed)
+
+    def register(self, groups, callback):
+        """Call callback(changed_mask) once per frame when a field in one of `groups` changed"""
+        self._views.append((groups, callback))
+
+    def connect_latest(self, signal, slot):
+        """Deliver `signal` to `slot` at most once per frame, with the latest arguments"""
+        def on_signal(*args):
+            self._latest[slot] = args
+            self._schedule()
+        signal.connect(on_signal)
+        return on_signal
+
+    def set_interval(self, interval_ms):
+        self.interval_ms = max(int(interval_ms), 1)
+
+    def request(self, groups=ALL_GROUPS):
+        """Schedule a refresh of the views registered for `groups`"""
+        self._pending_mask |= groups
+        self._schedule()
+
+    def _on_fields_changed(self, mask):
+        self.updates += 1
+        self._pending_mask |= mask
+        self._schedule()
+
+    def _schedule(self):
+        if not self.timer.isActive():
+            self.timer.start(self.interval_ms)
+
+    def refresh(self):
+        """Run one frame: every view whose groups changed, then every coalesced signal"""
+        mask, self._pending_mask = self._pending_mask, 0
+        latest, self._latest = self._latest, {}
+        self.frames += 1
+        if mask:
+            for groups, callback in self._views:
+                if mask & groups:
+                    callback(mask)
+        for slot, args in latest.items():
+            slot(*args)
+
+    def get_stats(self):
+        return {
+            'interval_ms': self.interval_ms,
+            'updates': self.updates,
+            'frames': self.frames,
+        }
@@ -0,0 +1,89 @@
+"""
+Fixed-capacity time series backed by a preallocated NumPy array.
+
+The storage is mirrored: every value is written at slot i and at slot
+i + capacity, so the latest `len(series)` values are always one contiguous
+slice. append() is O(1) with no allocation, and view() returns an ordered,
+read-only view without copying - ready to hand to pyqtgraph's setData().
+"""
+
+import numpy as np
+
+
+class RingSeries:
+    """Ring buffer of the most recent `capacity` values with ordered zero-copy views"""
+
+    def __init__(self, capacity=1000, dtype=np.float64):
+        self.capacity = max(int(capacity), 1)
+        self.dtype = np.dtype(dtype)
+        self._data = np.zeros(2 * self.capacity, dtype=self.dtype)
+        self._pos = 0 # Next slot to write, 0 <= _pos < capacity
+        self._size = 0
+        self.total = 0 # Values ever appended
+
+    def __len__(self):
+        return self._size
+
+    def append(self, value):
+        pos = self._pos
+        self._data[pos] = value
+        self._data[pos + self.capacity] = value
+        pos += 1
+        self._pos = 0 if pos == self.capacity else pos
+        if self._size < self.capacity:
+            self._size += 1
+        self.total += 1
+
+    def extend(self, values):
+        """Append many values at once (only the last `capacity` are kept)"""
+        values = np.asarray(values, dtype=self.dtype)[-self.capacity:]
+        count = len(values)
+        if not count:
+            return
+        # Write the mirrored copy in at most two contiguous pieces per half
+        first = min(count, self.capacity - self._pos)
+        for offset in (0, self.capacity):
+            start = self._pos + offset
+            self._data[start:start + first] = values[:first]
+            self._data[offset:offset + count - first] = values[first:]
+        self._pos = (self._pos + count) % self.capacity
+        self._size = min(self._size + count, self.capacity)
+        self.total += count
+
+    def view(self):
+        """Ordered (oldest first) read-only view of the stored values"""
+        end = self._pos + self.capacity
+        view = self._data[end - self._size:end]
+        view.flags.writeable = False
+        return view
+
+    def __array__(self, dtype=None, copy=None):
+        view = self.view()
+        return view if dtype is None else view.astype(dtype)
+
+    def __getitem__(self, index):
+        return self.view()[index]
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def last(self, default=None):
+        """Most recent value, or default if empty"""
+        if not self._size:
+            return default
+        return self._data[self._pos - 1 + self.capacity]
+
+    def clear(self):
+        self._pos = 0
+        self._size = 0
+
+    def resize(self, capacity):
+        """Change the capacity, keeping the most recent values"""
+        capacity = max(int(capacity), 1)
+        if capacity == self.capacity:
+            return
+        values = self.view().copy()
+        total = self.total
+        self.__init__(capacity, self.dtype)
+        self.extend(values)
+        self.total = total
@@ -0,0 +1,134 @@
+import time
+
+from utils.binary_telemetry import SYNC, scan_records
+
+
+class SerialLineBuffer:
+    """Reusable byte buffer that accumulates serial reads and splits out complete lines.
+
+    Unread data always lives in buffer[head:tail]. Instead of wrapping around,
+    the unread tail is moved back to the front when there is no room left at the
+    end, so a partial line is always contiguous and can be searched with find().
+    """
+
+    def __init__(self, capacity=65536):
+        self.capacity = capacity
+        self.buffer = bytearray(capacity)
+        self.view = memoryview(self.buffer)
+        self.head = 0 # First unread byte
+        self.tail = 0 # One past the last written byte
+        self.high_water = 0 # Largest number of unread bytes seen
+        self.overflow_bytes = 0 # Bytes dropped because a line did not fit
+
+    def __len__(self):
+        return self.tail - self.head
+
+    def compact(self):
+        """Move unread bytes to the start of the buffer"""
+        pending = self.tail - self.head
+        if self.head == 0:
+            return
+        if pending:
+            self.buffer[0:pending] = self.buffer[self.head:self.tail] # Same-size assignment, view stays valid
+        self.head = 0
+        self.tail = pending
+
+    def writable(self, size=1):
+        """Return a writable view of up to `size` bytes (capped at the free space, at least one byte)"""
+        size = max(size, 1)
+        if self.capacity - self.tail < size:
+            self.compact()
+            if self.tail == self.capacity:
+                # A single "line" fills the whole buffer - drop it and resync on the next newline
+                self.overflow_bytes += self.tail - self.head
+                self.head = self.tail = 0
+        size = min(size, self.capacity - self.tail)
+        return self.view[self.tail:self.tail + size]
+
+    def commit(self, count):
+        """Mark `count` bytes written into the last writable() view as valid"""
+        self.tail += count
+        pending = self.tail - self.head
+        if pending > self.high_water:
+            self.high_water = pending
+
+    def write(self, data):
+        """Copy `data` into the buffer (for sources without readinto)"""
+        offset = 0
+        while offset < len(data):
+            target = self.writable(len(data) - offset)
+            count = len(target)
+            target[:] = data[offset:offset + count]
+            self.commit(count)
+            offset += count
+
+    def pop_lines(self):
+        """Remove and return all complete lines (without the trailing newline)"""
+        end = self.buffer.rfind(b'\n', self.head, self.tail)
+        if end < 0:
+            return []
+        lines = bytes(self.view[self.head:end]).split(b'\n')
+        self.head = end + 1
+        if self.head == self.tail: # Fully drained, restart at the front for free
+            self.head = self.tail = 0
+        return lines
+
+    def pop_records(self):
+        """Like pop_lines(), but also splits out binary frames as (frame_type, payload) tuples"""
+        if self.buffer.find(SYNC, self.head, self.tail) < 0:
+            return self.pop_lines() # Text only - the common case
+        records, self.head = scan_records(self.buffer, self.head, self.tail)
+        if self.head == self.tail:
+            self.head = self.tail = 0
+        return records
+
+    def clear(self):
+        self.head = self.tail = 0
+
+
+class IngestStats:
+    """Throughput counters for the serial reader thread"""
+
+    def __init__(self, baud_rate=115200, interval=1.0):
+        self.baud_rate = baud_rate
+        self.interval = interval # Seconds between published snapshots
+        self.total_bytes = 0
+        self.total_lines = 0
+        self.reads = 0
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._window_lines = 0
+        self.last = {}
+
+    def record(self, byte_count, line_count):
+        self.total_bytes += byte_count
+        self.total_lines += line_count
+        self.reads += 1
+        self._window_bytes += byte_count
+        self._window_lines += line_count
+
+    def poll(self, line_buffer=None):
+        """Return a stats dict once per interval, otherwise None"""
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed < self.interval:
+            return None
+
+        bytes_per_s = self._window_bytes / elapsed
+        # 8N1 framing puts 10 bits on the wire per byte
+        link_capacity = self.baud_rate / 10.0 if self.baud_rate else 0.0
+        self.last = {
+            'bytes_per_s': bytes_per_s,
+            'lines_per_s': self._window_lines / elapsed,
+            'link_utilization': bytes_per_s / link_capacity if link_capacity else 0.0,
+            'total_bytes': self.total_bytes,
+            'total_lines': self.total_lines,
+            'reads': self.reads,
+            'buffer_high_water': line_buffer.high_water if line_buffer else 0,
+            'buffer_capacity': line_buffer.capacity if line_buffer else 0,
+            'overflow_bytes': line_buffer.overflow_bytes if line_buffer else 0,
+        }
+        self._window_start = now
+        self._window_bytes = 0
+        self._window_lines = 0
+        return self.last
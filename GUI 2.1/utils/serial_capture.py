@@ -0,0 +1,353 @@
+"""
+Raw serial capture files and timed replay.
+
+A capture file is a short magic header followed by one record per received
+chunk:
+
+    <Q t_ns> <I length> <length bytes>
+
+t_ns is a monotonic timestamp in nanoseconds relative to the start of the
+capture. A truncated last record (e.g. after a crash) is ignored on read.
+
+Usage (from the GUI 2.1 directory):
+    python -m utils.serial_capture info capture.gscap
+    python -m utils.serial_capture from-log logs/flight_log_2025-07-23_21-41-08.txt capture.gscap
+    python -m utils.serial_capture pty capture.gscap --speed 10
+    python -m utils.serial_capture bench capture.gscap [--gui]
+    python -m utils.serial_capture columns capture.gscap fc_columns.npz
+"""
+
+import os
+import re
+import struct
+import threading
+import time
+
+CAPTURE_MAGIC = b'GSCAP\x00\x01\n'
+RECORD_HEADER = struct.Struct('<QI')
+
+
+class CaptureWriter:
+    """Append received byte chunks with monotonic nanosecond timestamps to a capture file"""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.file = open(path, 'wb')
+        self.file.write(CAPTURE_MAGIC)
+        self.start_ns = time.monotonic_ns()
+        self.chunks = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock() # Reader thread writes, GUI thread closes
+
+    def write(self, data, t_ns=None):
+        """Record one chunk; t_ns defaults to the time since the capture started"""
+        if t_ns is None:
+            t_ns = time.monotonic_ns() - self.start_ns
+        with self._lock:
+            if self.file is None:
+                return
+            self.file.write(RECORD_HEADER.pack(t_ns, len(data)))
+            self.file.write(data)
+            self.chunks += 1
+            self.bytes_written += len(data)
+
+    def close(self):
+        with self._lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CaptureReader:
+    """Iterate over (t_ns, chunk) records of a capture file"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            if f.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+                raise ValueError(f"{self.path} is not a serial capture file")
+            header_size = RECORD_HEADER.size
+            while True:
+                header = f.read(header_size)
+                if len(header) < header_size:
+                    return
+                t_ns, length = RECORD_HEADER.unpack(header)
+                data = f.read(length)
+                if len(data) < length:
+                    return # Truncated tail
+                yield t_ns, data
+
+    def summary(self):
+        chunks = 0
+        total = 0
+        last_ns = 0
+        for t_ns, data in self:
+            chunks += 1
+            total += len(data)
+            last_ns = t_ns
+        return {
+            'chunks': chunks,
+            'bytes': total,
+            'duration_s': last_ns / 1e9,
+            'bytes_per_s': total / (last_ns / 1e9) if last_ns else 0.0,
+        }
+
+
+def iter_paced(records, speed=1.0, stop_event=None):
+    """Yield records at their recorded pace scaled by `speed` (0 = as fast as possible)"""
+    start = time.monotonic()
+    for t_ns, data in records:
+        if stop_event is not None and stop_event.is_set():
+            return
+        if speed > 0:
+            delay = (t_ns / 1e9) / speed - (time.monotonic() - start)
+            if delay > 0:
+                time.sleep(delay)
+        yield t_ns, data
+
+
+class ReplaySerial:
+    """In-process stand-in for serial.Serial that plays back a capture file.
+
+    Implements the subset of the pyserial API used by SerialController, so
+    a capture goes through exactly the same reader, parser and model path.
+    """
+
+    def __init__(self, path, speed=1.0, timeout=1, max_buffered=1 << 20):
+        self.port = f"replay:{os.path.basename(path)}"
+        self.portstr = self.port
+        self.path = path
+        self.speed = speed
+        self.timeout = timeout
+        self.baudrate = 921600
+        self.max_buffered = max_buffered # Back-pressure for as-fast-as-possible replay
+        self.is_open = True
+        self.finished = threading.Event() # Set once the whole capture has been fed
+        self.tx_log = [] # Bytes "sent" to the port
+
+        self._buffer = bytearray()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._feeder = threading.Thread(target=self._feed, daemon=True)
+        self._feeder.start()
+
+    def _feed(self):
+        for t_ns, data in iter_paced(CaptureReader(self.path), self.speed, self._stop):
+            with self._cond:
+                while len(self._buffer) >= self.max_buffered and not self._stop.is_set():
+                    self._cond.wait(0.1)
+                self._buffer += data
+                self._cond.notify_all()
+        self.finished.set()
+
+    @property
+    def in_waiting(self):
+        return len(self._buffer)
+
+    def read(self, size=1):
+        with self._cond:
+            if not self._buffer:
+                self._cond.wait(self.timeout)
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            self._cond.notify_all()
+        return data
+
+    def readinto(self, b):
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def readline(self):
+        with self._cond:
+            deadline = time.monotonic() + self.timeout
+            while b'\n' not in self._buffer:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or (self.finished.is_set() and not self._buffer):
+                    break
+                self._cond.wait(remaining)
+            end = self._buffer.find(b'\n')
+            end = len(self._buffer) if end < 0 else end + 1
+            data = bytes(self._buffer[:end])
+            del self._buffer[:end]
+            self._cond.notify_all()
+        return data
+
+    def write(self, data):
+        self.tx_log.append(bytes(data))
+        return len(data)
+
+    def close(self):
+        self._stop.set()
+        with self._cond:
+            self.is_open = False
+            self._cond.notify_all()
+
+
+def capture_from_log(log_path, capture_path):
+    """Convert a console flight log ([HH:MM:SS.mmm] lines) into a capture file.
+
+    Each logged line becomes one chunk, timed from its log timestamp, so
+    existing flight-day logs can be replayed without the original raw bytes.
+    """
+    pattern = re.compile(r'^\[(\d{2}):(\d{2}):(\d{2})\.(\d{3})\] (.*)$')
+    first_ms = None
+    last_ms = 0
+    count = 0
+    with open(log_path, 'r', encoding='utf-8', errors='ignore') as src, CaptureWriter(capture_path) as writer:
+        for raw in src:
+            match = pattern.match(raw.rstrip('\r\n'))
+            if not match:
+                continue
+            content = match.group(5)
+            if content.startswith('TX:'):
+                continue # Commands we sent, not received bytes
+            h, m, s, ms = (int(g) for g in match.groups()[:4])
+            t_ms = ((h * 60 + m) * 60 + s) * 1000 + ms
+            if first_ms is None:
+                first_ms = t_ms
+            t_ms -= first_ms
+            if t_ms < 0:
+                t_ms += 24 * 3600 * 1000 # Log crossed midnight
+            t_ms = max(t_ms, last_ms)
+            last_ms = t_ms
+            writer.write((content + '\n').encode('utf-8'), t_ms * 1000000)
+            count += 1
+    return count
+
+
+def replay_to_pty(path, speed=1.0):
+    """Play a capture into a new pseudo-terminal; point SerialController.connect at the printed path"""
+    import pty
+    master, slave = pty.openpty()
+    print(f"Replaying {path} at {'max' if speed <= 0 else f'{speed:g}x'} speed on {os.ttyname(slave)}")
+    sent = 0
+    try:
+        for t_ns, data in iter_paced(CaptureReader(path), speed):
+            os.write(master, data)
+            sent += len(data)
+        print(f"Replay finished: {sent} bytes")
+        input("Press Enter to close the pty...")
+    except KeyboardInterrupt:
+        print(f"Replay stopped after {sent} bytes")
+    finally:
+        os.close(master)
+        os.close(slave)
+
+
+def benchmark(path, gui=False):
+    """Push every line of a capture through TelemetryController/TelemetryModel (and optionally all panels)"""
+    from PyQt5.QtWidgets import QApplication
+    from models.telemetry_model import TelemetryModel
+    from controllers.telemetry_controller import TelemetryController
+
+    app = QApplication.instance() or QApplication([])
+    telemetry_model = TelemetryModel()
+    telemetry_controller = TelemetryController(telemetry_model)
+
+    if gui:
+        from models.connection_model import ConnectionModel
+        from models.settings_model import SettingsModel
+        from controllers.serial_controller import SerialController
+        from controllers.map_controller import MapController
+        from controllers.command_controller import CommandController
+        from views.main_window import MainWindow
+        from utils.config import load_config
+
+        settings_model = SettingsModel(load_config())
+        serial_controller = SerialController(ConnectionModel())
+        main_window = MainWindow(telemetry_model, serial_controller.connection_model, settings_model,
+                                 serial_controller, CommandController(serial_controller, settings_model, telemetry_model),
+                                 MapController(telemetry_model, settings_model))
+        main_window.show()
+
+    lines = [line for line in capture_lines(path) if line and not line.startswith('Sending packet:')]
+
+    start = time.perf_counter()
+    for i, line in enumerate(lines):
+        telemetry_controller.process_packet(line)
+        if gui and i % 50 == 0:
+            app.processEvents()
+    if gui:
+        app.processEvents()
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(lines)} lines in {elapsed:.3f} s -> {len(lines) / elapsed:.0f} lines/s "
+          f"({elapsed / max(len(lines), 1) * 1e6:.1f} us/line){' with GUI' if gui else ''}")
+
+
+def capture_lines(path):
+    """All complete lines of a capture, decoded as text"""
+    from utils.serial_buffer import SerialLineBuffer
+
+    line_buffer = SerialLineBuffer()
+    lines = []
+    for t_ns, data in CaptureReader(path):
+        line_buffer.write(data)
+        lines.extend(line.decode('utf-8', errors='ignore').strip() for line in line_buffer.pop_lines())
+    return lines
+
+
+def export_columns(path, output_path):
+    """Batch-decode every FC packet of a capture into one NumPy array per field (.npz)"""
+    import numpy as np
+    from utils.packet_batch import decode_fc_batch
+
+    lines = capture_lines(path)
+    start = time.perf_counter()
+    columns = decode_fc_batch(lines, prefix='FC:')
+    elapsed = time.perf_counter() - start
+    np.savez(output_path, **columns)
+    print(f"Decoded {len(columns['row'])} FC packets from {len(lines)} lines in {elapsed:.3f} s -> {output_path}")
+    return columns
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serial capture and replay tools')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    info_parser = sub.add_parser('info', help='Show capture statistics')
+    info_parser.add_argument('capture')
+
+    log_parser = sub.add_parser('from-log', help='Convert a console flight log into a capture')
+    log_parser.add_argument('log')
+    log_parser.add_argument('capture')
+
+    pty_parser = sub.add_parser('pty', help='Replay a capture on a pseudo-terminal')
+    pty_parser.add_argument('capture')
+    pty_parser.add_argument('--speed', type=float, default=1.0, help='Replay speed factor (0 = as fast as possible)')
+
+    bench_parser = sub.add_parser('bench', help='Benchmark the parse/model path (and panels with --gui)')
+    bench_parser.add_argument('capture')
+    bench_parser.add_argument('--gui', action='store_true', help='Include the full main window')
+
+    columns_parser = sub.add_parser('columns', help='Batch-decode all FC packets into a .npz of column arrays')
+    columns_parser.add_argument('capture')
+    columns_parser.add_argument('output')
+
+    args = parser.parse_args()
+    if args.command == 'info':
+        for key, value in CaptureReader(args.capture).summary().items():
+            print(f"{key}: {value}")
+    elif args.command == 'from-log':
+        count = capture_from_log(args.log, args.capture)
+        print(f"Wrote {count} lines to {args.capture}")
+    elif args.command == 'pty':
+        replay_to_pty(args.capture, args.speed)
+    elif args.command == 'bench':
+        benchmark(args.capture, args.gui)
+    elif args.command == 'columns':
+        export_columns(args.capture, args.output)
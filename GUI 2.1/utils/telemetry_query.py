@@ -0,0 +1,187 @@
+"""
+Time-indexed queries over a FlightHistory.
+
+Every lookup is a binary search on the history's sorted 'time' column
+(flight-computer time for TelemetryModel.history), so a range, a nearest
+sample or a window aggregate costs O(log n) plus the rows it returns.
+Resampling and sliding-window aggregates are vectorized over the rows of
+the requested range.
+"""
+
+import numpy as np
+
+
+class TelemetryQuery:
+    """Time ranges, nearest samples, resampling and aggregates over a FlightHistory"""
+
+    def __init__(self, history):
+        self.history = history
+
+    def __len__(self):
+        return len(self.history)
+
+    def time_range(self):
+        return self.history.time_range()
+
+    def range(self, names, start=None, end=None):
+        """{'time': ..., name: ...} for start <= time <= end (None = open end)"""
+        return self.history.slice(start, end, _names(names))
+
+    def nearest(self, t, names=None, by='time', max_gap=None):
+        """The row closest to t in column `by` as {name: value}, or None.
+
+        by: any monotonic column ('time', or 'arrival_time' for receive time)
+        max_gap: ignore samples further than this from t
+        """
+        history = self.history
+        count = len(history)
+        if not count:
+            return None
+        index = history.index_at(t, 'left', column=by)
+        candidates = [i for i in (index - 1, index) if 0 <= i < count]
+        keys = history.rows(candidates[0], candidates[-1] + 1, (by,))[by]
+        best = int(np.argmin(np.abs(keys - t)))
+        if max_gap is not None and abs(keys[best] - t) > max_gap:
+            return None
+        row = candidates[0] + best
+        names = None if names is None else ('time',) + tuple(name for name in _names(names) if name != 'time')
+        return {name: values[0].item() for name, values in history.rows(row, row + 1, names).items()}
+
+    def resample(self, names, start, end, step, method='linear'):
+        """Values on the uniform grid start, start + step, ... <= end.
+
+        method: 'linear' interpolates between samples, 'previous' holds the
+        last sample. Grid points outside the recorded range are NaN.
+        """
+        grid = np.arange(start, end + step * 0.5, step, dtype=np.float64)
+        # One sample either side so the edges interpolate
+        first = max(self.history.index_at(start, 'left') - 1, 0)
+        stop = self.history.index_at(end, 'right') + 1
+        data = self.history.rows(first, stop, ('time',) + tuple(name for name in _names(names) if name != 'time'))
+        times = data.pop('time')
+        result = {'time': grid}
+        if not len(times):
+            for name in data:
+                result[name] = np.full(len(grid), np.nan)
+            return result
+        outside = (grid < times[0]) | (grid > times[-1])
+        if method == 'previous':
+            index = np.clip(np.searchsorted(times, grid, side='right') - 1, 0, len(times) - 1)
+        for name, values in data.items():
+            values = values.astype(np.float64)
+            if method == 'previous':
+                resampled = values[index]
+            else:
+                resampled = np.interp(grid, times, values)
+            resampled[outside] = np.nan
+            result[name] = resampled
+        return result
+
+    def aggregate(self, name, start=None, end=None):
+        """{'count', 'min', 'max', 'mean'} of a column over start <= time <= end (NaN ignored)"""
+        values = self.history.column(name, start, end).astype(np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return {'count': 0, 'min': np.nan, 'max': np.nan, 'mean': np.nan}
+        return {'count': len(values), 'min': float(values.min()), 'max': float(values.max()),
+                'mean': float(values.mean())}
+
+    def windows(self, name, start, end, width):
+        """Aggregates of consecutive `width` second windows from start to end.
+
+        Returns {'time': window starts, 'count', 'min', 'max', 'mean'}; empty
+        windows have count 0 and NaN statistics.
+        """
+        data = self.range((name,), start, end)
+        edges = np.arange(start, end + width, width, dtype=np.float64)
+        bounds = np.searchsorted(data['time'], edges, side='left')
+        return _window_stats(data[name], bounds[:-1], bounds[1:], edges[:-1])
+
+    def forward_windows(self, name, duration, start=None, end=None):
+        """For every sample in [start, end], aggregates over [its time, its time + duration].
+
+        The basis of "sustained for N seconds" detectors. Returns
+        {'time': sample times, 'count', 'min', 'max', 'mean'}.
+        """
+        data = self.range((name,), start, None if end is None else end + duration)
+        times = data['time']
+        last = len(times) if end is None else int(np.searchsorted(times, end, side='right'))
+        stops = np.searchsorted(times, times[:last] + duration, side='right')
+        return _window_stats(data[name], np.arange(last), stops, times[:last])
+
+    def rate(self, name, start=None, end=None, mask=None):
+        """Least-squares slope of a column per second of time over a range (NaN with < 2 samples).
+
+        mask: optional boolean column selecting the rows to fit (e.g. 'gps_valid')
+        """
+        data = self.range((name,) + ((mask,) if mask else ()), start, end)
+        keep = _keep(data, name, mask)
+        return _slope(data['time'][keep], data[name][keep].astype(np.float64))
+
+    def predict(self, names, ahead, window, mask=None):
+        """Linear extrapolation `ahead` seconds past the last sample, fitted over the last `window` seconds.
+
+        Returns {name: value}, or None when no row in the window passes `mask`.
+        """
+        time_range = self.time_range()
+        if time_range is None:
+            return None
+        names = _names(names)
+        data = self.range(names + ((mask,) if mask else ()), time_range[1] - window, time_range[1])
+        prediction = {}
+        for name in names:
+            keep = _keep(data, name, mask)
+            if not keep.any():
+                return None
+            values = data[name][keep].astype(np.float64)
+            slope = _slope(data['time'][keep], values)
+            prediction[name] = float(values[-1]) + (0.0 if np.isnan(slope) else slope * ahead)
+        return prediction
+
+
+def _names(names):
+    return (names,) if isinstance(names, str) else tuple(names)
+
+
+def _keep(data, name, mask):
+    """Rows with a value in `name` that pass the optional boolean `mask` column"""
+    keep = ~np.isnan(data[name].astype(np.float64))
+    if mask:
+        keep &= data[mask].astype(bool)
+    return keep
+
+
+def _slope(times, values):
+    if len(times) < 2 or times[-1] == times[0]:
+        return np.nan
+    dt = times - times.mean()
+    return float(np.dot(dt, values - values.mean()) / np.dot(dt, dt))
+
+
+def _window_stats(values, starts, stops, times):
+    """count/min/max/mean of values[starts[i]:stops[i]] for every i, NaN ignored"""
+    values = values.astype(np.float64)
+    valid = ~np.isnan(values)
+    zero = np.zeros(1)
+    counts = np.concatenate((zero, np.cumsum(valid)))
+    sums = np.concatenate((zero, np.cumsum(np.where(valid, values, 0.0))))
+    count = (counts[stops] - counts[starts]).astype(np.int64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = (sums[stops] - sums[starts]) / count
+
+    # reduceat over interleaved (start, stop) pairs reduces each window separately;
+    # fmin/fmax skip NaN, empty windows are blanked below
+    padded = np.append(values, np.nan)
+    pairs = np.empty(2 * len(starts), dtype=np.int64)
+    pairs[0::2] = starts
+    pairs[1::2] = stops
+    if len(pairs):
+        minimum = np.fmin.reduceat(padded, pairs)[0::2]
+        maximum = np.fmax.reduceat(padded, pairs)[0::2]
+    else:
+        minimum = maximum = np.empty(0)
+    empty = count == 0
+    minimum[empty] = np.nan
+    maximum[empty] = np.nan
+    mean[empty] = np.nan
+    return {'time': np.asarray(times, dtype=np.float64), 'count': count, 'min': minimum, 'max': maximum, 'mean': mean}
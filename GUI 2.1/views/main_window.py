@@ -1,3 +1,4 @@
+import os
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QTabWidget, QVBoxLayout,
     QHBoxLayout, QSplitter, QStatusBar, QLabel, QPushButton, QComboBox, QFrame, QAction, QMenuBar
@@ -13,6 +14,9 @@ from views.panels.console_panel import ConsolePanel
 from views.panels.tracking_panel import TrackingPanel
 from views.panels.event_panel import EventPanel
 from views.panels.table_panel import TablePanel
+from views.panels.history_panel import HistoryPanel
+from utils.refresh_scheduler import RefreshScheduler
+from utils.logging_utils import LogService
 
 class MainWindow(QMainWindow):
     """Main application window, structured based on gui.py"""
@@ -37,6 +41,14 @@ class MainWindow(QMainWindow):
         icon_path = self.settings_model.get('app.icon', 'resources/balloon_icon.png')
         self.setWindowIcon(QIcon(icon_path))
         
+        # Views are repainted at ui.update_interval, not once per packet
+        self.refresh_scheduler = RefreshScheduler(
+            self.telemetry_model, self.settings_model.get('ui.update_interval', 100), self)
+        self.settings_model.settings_changed.connect(self.apply_refresh_settings)
+
+        # One background writer for the flight, event and tracking logs
+        self.log_service = LogService.from_settings(self.settings_model)
+        
         self.setup_ui()
         self.setup_status_bar() # Separate method for status bar
         self.setup_menu_bar() # Optional: Add a menu bar
@@ -44,6 +56,7 @@ class MainWindow(QMainWindow):
         # Connect signals
         self.connection_model.connection_changed.connect(self.update_connection_status_display)
         self.serial_controller.connection_error.connect(self.show_error_message_in_statusbar)
+        self.serial_controller.ingest_stats_updated.connect(self.update_ingest_stats_display)
         self.command_controller.command_log.connect(self.show_status_message_in_statusbar) # For command feedback
         self.command_controller.command_log.connect(self.event_panel.log_event)
         # Connect after event_panel is created
@@ -51,6 +64,7 @@ class MainWindow(QMainWindow):
         # Connect new signal for raw packets to table panel
         if hasattr(self.telemetry_model, "packet_received"):
             self.telemetry_model.packet_received.connect(self.add_radio_packet_to_table)
+            self.telemetry_model.packets_received.connect(self.add_radio_packets_to_table)
 
         # Telemetry updates to panels (already connected in original file, ensure they are correct)
         # self.telemetry_model.data_updated.connect(self.dashboard_panel.update_indicators_from_model) # dashboard handles its own connection
@@ -72,13 +86,16 @@ class MainWindow(QMainWindow):
         
         # Tab widget for Dashboard, Plots, Map, Tracking, and Console
         self.tabs = QTabWidget()
-        self.dashboard_panel = DashboardPanel(self.telemetry_model, self.connection_model, self)
-        self.plot_panel = PlotPanel(self.telemetry_model, self.settings_model, self)
-        self.map_panel = MapPanel(self.map_controller, self.telemetry_model, self.settings_model, self)
-        self.tracking_panel = TrackingPanel(self.telemetry_model, self.map_controller, self)
-        self.console_panel = ConsolePanel(self.serial_controller, self.settings_model, self)
-        self.event_panel = EventPanel(self.serial_controller, self.settings_model, self)
+        self.dashboard_panel = DashboardPanel(self.telemetry_model, self.connection_model, self, self.refresh_scheduler)
+        self.plot_panel = PlotPanel(self.telemetry_model, self.settings_model, self, self.refresh_scheduler)
+        self.map_panel = MapPanel(self.map_controller, self.telemetry_model, self.settings_model, self, self.refresh_scheduler)
+        self.tracking_panel = TrackingPanel(self.telemetry_model, self.map_controller, self, self.refresh_scheduler,
+                                            log_service=self.log_service)
+        self.console_panel = ConsolePanel(self.serial_controller, self.settings_model, self, log_service=self.log_service)
+        self.console_panel.logging_toggled.connect(self.toggle_flight_recording)
+        self.event_panel = EventPanel(self.serial_controller, self.settings_model, self, log_service=self.log_service)
         self.table_panel = TablePanel(self)  # <-- Add this line
+        self.history_panel = HistoryPanel(self.telemetry_model, self)
 
         self.tabs.addTab(self.dashboard_panel, "Dashboard")
         self.tabs.addTab(self.plot_panel, "Plots")
@@ -87,6 +104,14 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(self.console_panel, "Console")
         self.tabs.addTab(self.event_panel, "Events")
         self.tabs.addTab(self.table_panel, "Packets")  # <-- Add this line
+        self.tabs.addTab(self.history_panel, "History")
+
+        # Hidden tabs pause their cosmetic work (views/panels/panel_lifecycle.py)
+        self.active_tab = None
+        for index in range(self.tabs.count()):
+            self.deactivate_tab(index)
+        self.tabs.currentChanged.connect(self.activate_tab)
+        self.activate_tab(self.tabs.currentIndex())
 
         left_v_layout.addWidget(self.tabs, 1) # Give full stretch to tabs
 
@@ -125,7 +150,18 @@ class MainWindow(QMainWindow):
         self.connection_status_label = QLabel("Not Connected")
         self.connection_status_label.setStyleSheet("color: #ff5500; font-weight: bold;")
         
+        self.ingest_stats_label = QLabel("")
+        self.ingest_stats_label.setStyleSheet("color: #aaaaaa;")
+
+        self.log_stats_label = QLabel("")
+        self.log_stats_label.setStyleSheet("color: #aaaaaa;")
+        self.log_stats_timer = QTimer(self)
+        self.log_stats_timer.timeout.connect(self.update_log_stats_display)
+        self.log_stats_timer.start(1000)
+        
         self.status_bar.addWidget(self.status_msg_label, 1) # Add with stretch factor
+        self.status_bar.addPermanentWidget(self.log_stats_label)
+        self.status_bar.addPermanentWidget(self.ingest_stats_label)
         self.status_bar.addPermanentWidget(self.connection_status_label)
 
     def setup_menu_bar(self):
@@ -157,6 +193,7 @@ class MainWindow(QMainWindow):
         else:
             self.connection_status_label.setText("Not Connected")
             self.connection_status_label.setStyleSheet("color: #ff5500; font-weight: bold;") # Orange-Red
+            self.ingest_stats_label.setText("")
             if hasattr(self, '_last_port_name') and self._last_port_name: # Check if previously connected
                  self.show_status_message_in_statusbar(f"Disconnected from {self._last_port_name}.")
             else:
@@ -164,6 +201,62 @@ class MainWindow(QMainWindow):
         self._last_port_name = port_name if connected else ""
 
 
+    def activate_tab(self, index):
+        """Deactivate the previously shown panel and activate the one at `index`"""
+        if self.active_tab is not None and self.active_tab != index:
+            self.deactivate_tab(self.active_tab)
+        self.active_tab = index
+        panel = self.tabs.widget(index)
+        if hasattr(panel, 'activate'):
+            panel.activate()
+
+    def deactivate_tab(self, index):
+        panel = self.tabs.widget(index)
+        if hasattr(panel, 'deactivate'):
+            panel.deactivate()
+
+    def apply_refresh_settings(self):
+        """Pick up a changed ui.update_interval"""
+        self.refresh_scheduler.set_interval(self.settings_model.get('ui.update_interval', 100))
+
+    def update_ingest_stats_display(self, stats):
+        """Show serial reader throughput and buffer usage in the status bar"""
+        self.ingest_stats_label.setText(
+            f"RX {stats['bytes_per_s'] / 1024:.1f} kB/s | {stats['lines_per_s']:.0f} lines/s | "
+            f"link {stats['link_utilization'] * 100:.0f}% | buf peak {stats['buffer_high_water']}/{stats['buffer_capacity']} B"
+        )
+        # Warn when the link is close to saturation or lines were dropped
+        if stats['link_utilization'] > 0.8 or stats['overflow_bytes']:
+            self.ingest_stats_label.setStyleSheet("color: #ffaa00;")
+        else:
+            self.ingest_stats_label.setStyleSheet("color: #aaaaaa;")
+
+    def toggle_flight_recording(self, is_logging, log_path):
+        """Binary flight recording (.gsrec) next to the text flight log"""
+        if is_logging:
+            record_path = os.path.splitext(log_path)[0] + '.gsrec'
+            try:
+                self.telemetry_model.start_recording(record_path)
+                self.console_panel.log_to_console(f"Recording flight data to {record_path}", "yellow")
+            except OSError as e:
+                self.show_error_message_in_statusbar(f"Could not start flight recording: {e}")
+        else:
+            self.telemetry_model.stop_recording()
+
+    def update_log_stats_display(self):
+        """Show the log writer queue and commit latency in the status bar"""
+        stats = self.log_service.get_stats()
+        self.log_stats_label.setText(
+            f"LOG q {stats['queue_depth']}/{stats['queue_capacity']} | "
+            f"commit {stats['last_latency_ms']:.0f} ms (max {stats['max_latency_ms']:.0f})"
+            + (f" | dropped {stats['dropped']}" if stats['dropped'] else "")
+        )
+        # Warn when lines were dropped, writes failed or the queue is filling up
+        if stats['dropped'] or stats['errors'] or stats['queue_depth'] > stats['queue_capacity'] // 2:
+            self.log_stats_label.setStyleSheet("color: #ffaa00;")
+        else:
+            self.log_stats_label.setStyleSheet("color: #aaaaaa;")
+
     def show_error_message_in_statusbar(self, message):
         self.status_msg_label.setText(f"Error: {message}")
         self.status_msg_label.setStyleSheet("color: #ff3333;") # Red for errors
@@ -184,7 +277,7 @@ class MainWindow(QMainWindow):
         # We need to tell CommandPanel to select and connect.
         if self.command_panel:
             ports = [self.command_panel.port_selector.itemText(i) for i in range(self.command_panel.port_selector.count())]
-            if port_to_connect in ports:
+            if port_to_connect in ports or os.path.exists(port_to_connect): # Pseudo-terminals are not enumerated
                 self.command_panel.port_selector.setCurrentText(port_to_connect)
                 # Give a slight delay for UI to settle before auto-connecting
                 QTimer.singleShot(200, self.command_panel.toggle_connection) 
@@ -211,9 +304,20 @@ class MainWindow(QMainWindow):
         # Ensure disconnection on close
         if self.serial_controller.is_connected():
             self.serial_controller.disconnect()
+        self.serial_controller.stop_capture()
+        self.telemetry_model.close_history()
+        # Footers for the open logs, then commit everything queued
+        for panel in (self.console_panel, self.event_panel):
+            if panel.is_logging:
+                panel.toggle_logging()
+        self.log_service.stop()
         # Add any other cleanup (e.g., stopping timers, threads)
         super().closeEvent(event)
 
     def add_radio_packet_to_table(self, packet: dict):
         """Call this method whenever a radio packet is received."""
-        self.table_panel.add_packet(packet)
\ No newline at end of file
+        self.table_panel.add_packet(packet)
+
+    def add_radio_packets_to_table(self, packets: list):
+        """Add a batch of radio packets to the table."""
+        self.table_panel.add_packets(packets)
@@ -1,7 +1,7 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
     QLabel, QComboBox, QGroupBox, QSlider, QSpinBox, 
-    QLineEdit, QFrame # Removed QCheckBox
+    QLineEdit, QFrame, QTableWidget, QTableWidgetItem, QHeaderView # Removed QCheckBox
 )
 from PyQt5.QtCore import Qt # Removed QTimer
 
@@ -21,6 +21,7 @@ class CommandPanel(QWidget):
         
         # Connect signals
         self.connection_model.connection_changed.connect(self.update_button_states)
+        self.command_controller.command_stats_updated.connect(self.update_command_stats)
         # Initialize button states
         self.update_button_states(self.connection_model.is_connected())
 
@@ -53,6 +54,10 @@ class CommandPanel(QWidget):
 
         # Manual command section
         self.create_manual_command_section(layout)
+        layout.addWidget(self.create_separator())
+
+        # Command round-trip statistics
+        self.create_command_stats_section(layout)
         
         layout.addStretch(1) # Push all groups to the top
         
@@ -71,6 +76,7 @@ class CommandPanel(QWidget):
         port_layout = QHBoxLayout()
         port_layout.addWidget(QLabel("Port:"))
         self.port_selector = QComboBox()
+        self.port_selector.setEditable(True) # Allow typing ports that are not enumerated (e.g. /dev/pts/N)
         self.refresh_ports()
         port_layout.addWidget(self.port_selector, 1)
         
@@ -160,6 +166,42 @@ class CommandPanel(QWidget):
         
         parent_layout.addWidget(group)
 
+    def create_command_stats_section(self, parent_layout):
+        group = QGroupBox("Command Link")
+        layout = QVBoxLayout(group)
+
+        self.command_link_label = QLabel("No commands sent")
+        layout.addWidget(self.command_link_label)
+
+        self.command_stats_table = QTableWidget(0, 5)
+        self.command_stats_table.setHorizontalHeaderLabels(["Command", "Acked", "Failed", "Last ms", "Avg ms"])
+        self.command_stats_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.command_stats_table.verticalHeader().setVisible(False)
+        self.command_stats_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.command_stats_table.setMaximumHeight(140)
+        layout.addWidget(self.command_stats_table)
+
+        parent_layout.addWidget(group)
+
+    def update_command_stats(self, stats):
+        """Show per-command round-trip latency from CommandController.get_latency_stats()"""
+        in_flight = stats['in_flight'] or "none"
+        period = f"{stats['radio_period_ms']:.0f} ms" if stats['radio_period_ms'] else "n/a"
+        self.command_link_label.setText(f"Pending: {stats['pending']} | In flight: {in_flight} | Radio cycle: {period}")
+
+        commands = stats['commands']
+        self.command_stats_table.setRowCount(len(commands))
+        for row, (name, command_stats) in enumerate(sorted(commands.items())):
+            values = [
+                name,
+                f"{command_stats['acked']}/{command_stats['sent']}",
+                str(command_stats['failed']),
+                f"{command_stats['last_ms']:.0f}" if 'last_ms' in command_stats else "-",
+                f"{command_stats['avg_ms']:.0f}" if 'avg_ms' in command_stats else "-",
+            ]
+            for col, value in enumerate(values):
+                self.command_stats_table.setItem(row, col, QTableWidgetItem(value))
+
     def refresh_ports(self):
         self.port_selector.clear()
         ports = self.serial_controller.get_available_ports()
@@ -1,34 +1,52 @@
 import os
+from collections import deque
 from datetime import datetime # Keep this for timestamps
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-    QLabel, QTextEdit, QLineEdit, QCheckBox, QComboBox, QGroupBox, QFileDialog, QMessageBox
+    QLabel, QPlainTextEdit, QLineEdit, QCheckBox, QComboBox, QGroupBox, QFileDialog, QMessageBox
 )
-from PyQt5.QtGui import QTextCursor, QFont, QColor # Removed QTextCharFormat, QBrush
-from PyQt5.QtCore import Qt, pyqtSlot
+from PyQt5.QtGui import QTextCursor, QTextCharFormat, QFont, QColor
+from PyQt5.QtCore import Qt, QTimer, pyqtSlot, pyqtSignal
+
+from views.panels.panel_lifecycle import PanelLifecycle
+from utils.logging_utils import LogService
 # import datetime # Redundant import
 
-class ConsolePanel(QWidget):
+class ConsolePanel(PanelLifecycle, QWidget):
     """Panel for displaying serial console output, similar to gui.py's raw data section"""
+
+    logging_toggled = pyqtSignal(bool, str) # is_logging, flight log path ('' when stopped)
     
-    def __init__(self, serial_controller, settings_model, parent=None):
+    def __init__(self, serial_controller, settings_model, parent=None, log_service=None):
         super().__init__(parent)
         self.serial_controller = serial_controller
         self.settings_model = settings_model # Keep for potential settings like log path
         
         # Logging variables from gui.py
         self.is_logging = False
-        self.log_file = None
+        self.log_file = None # LogStream, written by the log service thread
+        self.log_service = log_service or LogService.from_settings(settings_model)
         
         # Max lines for console display
         self.max_console_lines = self.settings_model.get('console.max_lines', 200)
+        # (text, colour) lines waiting for the next flush - only the last
+        # max_console_lines can be shown, so older ones are dropped here
+        self.pending_lines = deque(maxlen=self.max_console_lines)
+        self.line_formats = {} # colour -> QTextCharFormat
 
         self.setup_ui()
+
+        # Lines are appended once per refresh tick, in one edit
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(self.settings_model.get('ui.update_interval', 100))
+        self.flush_timer.timeout.connect(self.flush_pending_lines)
         
         # Connect signals
         # packet_received is now handled by TelemetryController, which updates TelemetryModel.
         # If raw data needs to be displayed directly from serial_controller:
         self.serial_controller.raw_data_received.connect(self.display_raw_data) # Assuming serial_controller emits this
+        self.serial_controller.raw_data_batch_received.connect(self.display_raw_data_batch)
         self.serial_controller.connection_error.connect(self.display_connection_error)
         # If console needs to log commands sent via command_controller:
         # self.command_controller.command_log.connect(self.log_to_console) # Assuming command_controller exists and has this signal
@@ -55,11 +73,13 @@ class ConsolePanel(QWidget):
         
         layout.addLayout(header_layout)
         
-        # Raw data display (QTextEdit)
-        self.data_display = QTextEdit()
+        # Raw data display - the document drops its oldest lines beyond max_console_lines
+        self.data_display = QPlainTextEdit()
         self.data_display.setReadOnly(True)
+        self.data_display.setUndoRedoEnabled(False)
+        self.data_display.setMaximumBlockCount(self.max_console_lines)
         self.data_display.setStyleSheet("""
-            QTextEdit {
+            QPlainTextEdit {
                 background-color: #1a1a1a;
                 color: #00ff00; /* Green text like in gui.py */
                 font-family: 'Courier New', monospace;
@@ -132,20 +152,70 @@ class ConsolePanel(QWidget):
         timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
         formatted_line = f"[{timestamp}] {data_line}"
         
-        self.data_display.append(formatted_line)
-        self.trim_console_lines()
-        self.auto_scroll_to_bottom()
+        self.queue_lines([formatted_line])
 
         if self.is_logging and self.log_file:
-            try:
-                self.log_file.write(f"{formatted_line}\n")
-                self.log_file.flush()
-            except Exception as e:
-                error_msg = f"[{timestamp}] Error writing to log: {str(e)}"
-                self.data_display.append(error_msg)
-                self.trim_console_lines()
-                self.auto_scroll_to_bottom()
-                self.stop_logging_on_error() # Stop logging on error
+            self.write_log(f"{formatted_line}\n", timestamp)
+
+    def display_raw_data_batch(self, data_lines):
+        """Display a batch of raw lines with a timestamp."""
+        if not data_lines:
+            return
+        timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
+        formatted_lines = [f"[{timestamp}] {line}" for line in data_lines]
+        
+        self.queue_lines(formatted_lines)
+
+        if self.is_logging and self.log_file:
+            self.write_log("\n".join(formatted_lines) + "\n", timestamp)
+
+    def write_log(self, text, timestamp):
+        """Queue text for the log file; I/O errors of the writer thread stop logging."""
+        if self.log_file.error is not None:
+            self.queue_lines([f"[{timestamp}] Error writing to log: {self.log_file.error}"], "red")
+            self.stop_logging_on_error() # Stop logging on error
+            return
+        self.log_file.write(text)
+
+    def queue_lines(self, lines, color=None):
+        """Queue lines for the next flush (held while the tab is hidden)."""
+        self.pending_lines.extend((line, color) for line in lines)
+        if self.active and not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def resync(self):
+        self.flush_pending_lines()
+
+    def flush_pending_lines(self):
+        """Append the queued lines in one edit, one insert per run of same-coloured lines."""
+        if not self.pending_lines:
+            return
+        lines = list(self.pending_lines)
+        self.pending_lines.clear()
+
+        cursor = QTextCursor(self.data_display.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        first = self.data_display.document().isEmpty()
+        start = 0
+        for index in range(1, len(lines) + 1):
+            if index == len(lines) or lines[index][1] != lines[start][1]:
+                text = "\n".join(line for line, color in lines[start:index])
+                cursor.insertText(text if first else "\n" + text, self.line_format(lines[start][1]))
+                first = False
+                start = index
+        cursor.endEditBlock()
+        self.auto_scroll_to_bottom()
+
+    def line_format(self, color):
+        """Character format for a line colour (None = the console default)"""
+        line_format = self.line_formats.get(color)
+        if line_format is None:
+            line_format = QTextCharFormat()
+            if color:
+                line_format.setForeground(QColor(color))
+            self.line_formats[color] = line_format
+        return line_format
 
     def stop_logging_on_error(self):
         if self.is_logging:
@@ -155,40 +225,17 @@ class ConsolePanel(QWidget):
     def display_connection_error(self, error_message):
         """Display connection errors."""
         timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-        self.data_display.setTextColor(QColor("red")) # Show errors in red
-        self.data_display.append(f"[{timestamp}] ERROR: {error_message}")
-        self.data_display.setTextColor(QColor("#00ff00")) # Reset to default color
-        self.trim_console_lines()
-        self.auto_scroll_to_bottom()
+        self.queue_lines([f"[{timestamp}] ERROR: {error_message}"], "red") # Show errors in red
 
     def log_to_console(self, message, color=None):
         """Generic method to log messages to the console display."""
         timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-        if color:
-            self.data_display.setTextColor(QColor(color))
-        
-        self.data_display.append(f"[{timestamp}] {message}")
-        
-        if color: # Reset to default color if a specific color was used
-            self.data_display.setTextColor(QColor("#00ff00"))
-        self.trim_console_lines()
-        self.auto_scroll_to_bottom()
+        self.queue_lines([f"[{timestamp}] {message}"], color)
 
     def clear_data_display(self):
+        self.pending_lines.clear()
         self.data_display.clear()
 
-    def trim_console_lines(self):
-        """Keep only the last N lines in the data display."""
-        doc = self.data_display.document()
-        while doc.blockCount() > self.max_console_lines:
-            cursor = QTextCursor(doc.firstBlock())
-            cursor.select(QTextCursor.BlockUnderCursor)
-            cursor.removeSelectedText()
-            # QTextEdit's BlockUnderCursor selection sometimes leaves the newline,
-            # an explicit deleteChar can help ensure the block is fully removed.
-            if doc.blockCount() > self.max_console_lines : # Check again before deleting char
-                 cursor.deleteChar()
-
 
     def toggle_logging(self):
         """Toggle serial data logging to file, from gui.py."""
@@ -201,34 +248,34 @@ class ConsolePanel(QWidget):
                 ts_filename = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
                 log_file_path = os.path.join(log_dir, f"flight_log_{ts_filename}.txt")
                 
-                self.log_file = open(log_file_path, 'w')
-                self.log_file.write(f"HAB Ground Station Log\n")
-                self.log_file.write(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                self.log_file.write(f"----------------------------------------\n\n")
-                self.log_file.flush()
+                # Header is repeated at the top of every rotated part
+                self.log_file = self.log_service.open(
+                    log_file_path,
+                    header=(f"HAB Ground Station Log\n"
+                            f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                            f"----------------------------------------\n\n"))
                 
                 self.is_logging = True
                 self.log_button.setText("Stop Logging")
-                self.log_to_console(f"Started logging to {log_file_path}", "yellow")
+                self.log_to_console(f"Started logging to {self.log_file.path}", "yellow")
+                self.logging_toggled.emit(True, log_file_path)
             except Exception as e:
                 QMessageBox.critical(self, "Logging Error", f"Could not create log file: {str(e)}")
-                if self.log_file: # Ensure file is closed if opened partially
-                    self.log_file.close()
-                    self.log_file = None
+                self.log_file = None
                 self.is_logging = False # Reset state
                 self.log_button.setText("Start Logging")
 
         else:
             try:
                 if self.log_file:
-                    self.log_file.write(f"\n----------------------------------------\n")
-                    self.log_file.write(f"Ended: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    self.log_file.close()
+                    self.log_file.close(footer=(f"\n----------------------------------------\n"
+                                                f"Ended: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"))
                     self.log_file = None
                 
                 self.is_logging = False
                 self.log_button.setText("Start Logging")
                 self.log_to_console("Stopped logging", "yellow")
+                self.logging_toggled.emit(False, "")
             except Exception as e:
                 QMessageBox.critical(self, "Logging Error", f"Error closing log file: {str(e)}")
                 # Even if closing fails, update state
@@ -251,6 +298,7 @@ class ConsolePanel(QWidget):
             )
             
             if filename:
+                self.flush_pending_lines()
                 with open(filename, 'w') as f:
                     f.write(self.data_display.toPlainText())
                 self.log_to_console(f"Console saved to {filename}", "yellow")
@@ -282,17 +330,17 @@ class ConsolePanel(QWidget):
         try:
             new_max = int(new_max_str)
             self.max_console_lines = new_max
+            self.pending_lines = deque(self.pending_lines, maxlen=new_max)
             self.settings_model.set('console.max_lines', new_max)
-            self.trim_console_lines()  # Apply new limit immediately
+            self.data_display.setMaximumBlockCount(new_max)  # Apply new limit immediately
         except ValueError:
             pass  # Ignore invalid values
 
     def auto_scroll_to_bottom(self):
         """Automatically scroll to bottom if auto-scroll is enabled."""
         if self.auto_scroll_checkbox.isChecked():
-            cursor = self.data_display.textCursor()
-            cursor.movePosition(QTextCursor.End)
-            self.data_display.setTextCursor(cursor)
+            scroll_bar = self.data_display.verticalScrollBar()
+            scroll_bar.setValue(scroll_bar.maximum())
 
     def display_packet(self, packet_data):
         """Display parsed telemetry packet data"""
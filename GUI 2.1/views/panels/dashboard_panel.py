@@ -8,13 +8,15 @@ from PyQt5.QtGui import QFont, QColor # Removed QPalette, QPixmap, QPainter, QBr
 from views.widgets.compass_widget import CompassWidget
 from views.widgets.dial_widget import SpeedDialWidget
 from views.widgets.clock_widget import DigitalClockWidget # Assuming this is equivalent to gui.py's DigitalClockWidget
+from models.telemetry_snapshot import NAVIGATION, RADIO, POWER, STATUS, ENVIRONMENT, ALL_GROUPS
+from views.panels.panel_lifecycle import PanelLifecycle
 
 # Removed GaugeWidget, ModernIndicator, StatusCard, MissionClockWidget, EventLogger classes
 
-class DashboardPanel(QWidget):
+class DashboardPanel(PanelLifecycle, QWidget):
     """Dashboard panel based on gui.py structure"""
     
-    def __init__(self, telemetry_model, connection_model, parent=None):
+    def __init__(self, telemetry_model, connection_model, parent=None, refresh_scheduler=None):
         super().__init__(parent)
         self.telemetry_model = telemetry_model
         self.connection_model = connection_model
@@ -42,7 +44,12 @@ class DashboardPanel(QWidget):
         """)
         
         # Connect to model signals
-        self.telemetry_model.data_updated.connect(self.update_indicators_from_model)
+        # Repainted once per frame by the refresh scheduler, or on every change without one
+        groups = NAVIGATION | RADIO | POWER | STATUS | ENVIRONMENT
+        if refresh_scheduler is not None:
+            refresh_scheduler.register(groups, self.update_indicators_from_model)
+        else:
+            self.telemetry_model.connect_fields(groups, self.update_indicators_from_model)
         # self.connection_model.connection_changed.connect(self.update_connection_status) # MainWindow handles this
 
         # Setup UI
@@ -53,10 +60,6 @@ class DashboardPanel(QWidget):
         # self.timer.timeout.connect(self.update_dynamic_displays)
         # self.timer.start(1000)
 
-        # Initialize last altitude and time for vertical speed calculation
-        self.last_altitude = None
-        self.last_altitude_time = None
-
     def setup_ui(self):
         """Set up the dashboard UI based on gui.py."""
         main_layout = QGridLayout(self) # Changed to QGridLayout for better structure
@@ -229,76 +232,57 @@ class DashboardPanel(QWidget):
                 except ValueError:
                     pass # Non-numeric value, keep default style
 
-    def calculate_vertical_speed(self, current_altitude):
-        """Calculate vertical speed based on altitude changes, from gui.py"""
-        if self.last_altitude is None or self.last_altitude_time is None:
-            self.last_altitude = current_altitude
-            self.last_altitude_time = time.time()
-            return 0.0
-        
-        now = time.time()
-        time_diff = now - self.last_altitude_time
-        
-        if time_diff < 0.1:  # Avoid division by very small numbers or if time hasn't advanced
-            return getattr(self, 'last_vertical_speed', 0.0) # Return last known speed
-            
-        altitude_diff = current_altitude - self.last_altitude
-        vertical_speed = altitude_diff / time_diff
-        
-        self.last_altitude = current_altitude
-        self.last_altitude_time = now
-        self.last_vertical_speed = vertical_speed # Store for next potential quick return
-        
-        return vertical_speed
-
-    def update_indicators_from_model(self):
-        """Update dashboard indicators with data from telemetry_model."""
-        data = self.telemetry_model.get_latest_telemetry()
+    def update_indicators_from_model(self, changed=ALL_GROUPS):
+        """Update the dashboard indicators of the field groups in `changed` from telemetry_model."""
+        if not self.active:
+            return # Repainted by resync() when the tab is shown
+        data = self.telemetry_model.get_snapshot()
 
         # Navigation
-        if data.get('gps_valid') and data.get('gps_lat') != 0 and data.get('gps_lon') != 0:
-            # Vehicle heading (yaw from IMU or calculated from GPS if available)
-            self.vehicle_compass.setBearing(data.get('fYaw', 0.0)) # Prefer IMU Yaw
-            # Target bearing would be calculated by MapController and signaled
-        else:
-            self.vehicle_compass.setBearing(0.0)
+        if changed & NAVIGATION:
+            if data.gps_valid and data.gps_lat != 0 and data.gps_lon != 0:
+                # Vehicle heading (yaw from IMU or calculated from GPS if available)
+                self.vehicle_compass.setBearing(data.yaw) # Prefer IMU Yaw
+                # Target bearing would be calculated by MapController and signaled
+            else:
+                self.vehicle_compass.setBearing(0.0)
 
-        self.ground_speed_dial.setValue(data.get('gps_speed', 0.0))
-        
-        # Calculate and set vertical speed
-        baro_alt = data.get('altitude', None)
-        if baro_alt is not None:
-            vertical_speed = self.calculate_vertical_speed(baro_alt)
-            self.vertical_speed_dial.setValue(vertical_speed)
-            self.update_parameter("Vertical Speed", vertical_speed) # Also update label if exists
-        else:
-            self.vertical_speed_dial.setValue(0.0)
-            self.update_parameter("Vertical Speed", 0.0)
+            self.ground_speed_dial.setValue(data.gps_speed)
 
-
-        if data.get('gps_time', 0) > 0:
-            self.gps_clock.setTime(data.get('gps_time'))
+            if data.gps_time > 0:
+                self.gps_clock.setTime(data.gps_time)
+            self.update_parameter("GPS Altitude", data.gps_alt)
+            self.update_parameter("GPS Status", "Fix" if data.gps_valid else "No Fix", format_str="{}")
 
         # Flight Data
-        self.update_parameter("Altitude", data.get('altitude', 0.0))
-        self.update_parameter("Temperature", data.get('temperature2', 0.0))
-        self.update_parameter("Pressure", data.get('pressure2', 0.0))
-        self.update_parameter("GPS Altitude", data.get('gps_alt', 0.0))
+        if changed & ENVIRONMENT:
+            # Vertical speed from the model's derived metrics
+            self.vertical_speed_dial.setValue(data.vertical_speed)
+            self.update_parameter("Vertical Speed", data.vertical_speed) # Also update label if exists
+
+            self.update_parameter("Altitude", data.altitude)
+            self.update_parameter("Temperature", data.temperature2)
+            self.update_parameter("Pressure", data.abs_pressure2)
 
         # Radio Status
-        self.update_parameter("RSSI", data.get('rssi', 0), format_str="{:.0f}")
-        self.update_parameter("SNR", data.get('snr', 0), format_str="{:.0f}")
-        self.update_parameter("ACK", "Yes" if data.get('ack', 0) == 1 else "No", format_str="{}")
-        self.update_parameter("GPS Status", "Fix" if data.get('gps_valid', False) else "No Fix", format_str="{}")
+        if changed & RADIO:
+            self.update_parameter("RSSI", data.rssi, format_str="{:.0f}")
+            self.update_parameter("SNR", data.snr, format_str="{:.0f}")
+            self.update_parameter("ACK", "Yes" if data.ack == 1 else "No", format_str="{}")
 
         # System Status
-        self.update_parameter("SD Status", "Active" if data.get('sd_status', False) else "Inactive", format_str="{}")
-        self.update_parameter("Actuator Status", "Active" if data.get('actuator_status', False) else "Inactive", format_str="{}")
-        self.update_parameter("Main Battery Voltage", data.get('fc_battery_voltage', 0.0), format_str="{:.2f} V")
-        self.update_parameter("LED Battery Voltage", data.get('led_battery_voltage', 0.0), format_str="{:.2f} V")
-        # self.update_parameter("Roll", data.get('fRoll', 0.0))
-        # self.update_parameter("Pitch", data.get('fPitch', 0.0))
-        # self.update_parameter("Yaw", data.get('fYaw', 0.0))
+        if changed & STATUS:
+            self.update_parameter("SD Status", "Active" if data.sd_status else "Inactive", format_str="{}")
+            self.update_parameter("Actuator Status", "Active" if data.actuator_status else "Inactive", format_str="{}")
+        if changed & POWER:
+            self.update_parameter("Main Battery Voltage", data.fc_battery_voltage, format_str="{:.2f} V")
+            self.update_parameter("LED Battery Voltage", data.led_battery_voltage, format_str="{:.2f} V")
+        # self.update_parameter("Roll", data.roll)
+        # self.update_parameter("Pitch", data.pitch)
+        # self.update_parameter("Yaw", data.yaw)
+
+    def resync(self):
+        self.update_indicators_from_model(ALL_GROUPS)
 
     # Placeholder for target bearing updates if MapController signals it
     def update_target_bearing(self, bearing):
@@ -6,16 +6,19 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtGui import QTextCursor, QColor
 from PyQt5.QtCore import Qt
 
+from utils.logging_utils import LogService
+
 class EventPanel(QWidget):
     """Panel for displaying and logging system events (e.g., GPS, telemetry, etc)."""
 
-    def __init__(self, serial_controller, settings_model, parent=None):
+    def __init__(self, serial_controller, settings_model, parent=None, log_service=None):
         super().__init__(parent)
         self.serial_controller = serial_controller
         self.settings_model = settings_model
 
         self.is_logging = False
-        self.log_file = None
+        self.log_file = None # LogStream, written by the log service thread
+        self.log_service = log_service or LogService.from_settings(settings_model)
         self.max_event_lines = self.settings_model.get('event_panel.max_lines', 200)
 
         self.setup_ui()
@@ -104,12 +107,11 @@ class EventPanel(QWidget):
         self.trim_event_lines()
         self.auto_scroll_to_bottom()
         if self.is_logging and self.log_file:
-            try:
+            if self.log_file.error is None:
                 self.log_file.write(formatted + "\n")
-                self.log_file.flush()
-            except Exception as e:
+            else: # Reported by the writer thread
                 self.event_display.setTextColor(QColor("red"))
-                self.event_display.append(f"[{timestamp}] Error writing to log: {str(e)}")
+                self.event_display.append(f"[{timestamp}] Error writing to log: {self.log_file.error}")
                 self.event_display.setTextColor(QColor("#ffcc00"))
                 self.trim_event_lines()
                 self.auto_scroll_to_bottom()
@@ -139,26 +141,23 @@ class EventPanel(QWidget):
                     os.makedirs(log_dir)
                 ts_filename = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
                 log_file_path = os.path.join(log_dir, f"event_log_{ts_filename}.txt")
-                self.log_file = open(log_file_path, 'w')
-                self.log_file.write(f"Event Log\nStarted: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                self.log_file.write(f"----------------------------------------\n\n")
-                self.log_file.flush()
+                self.log_file = self.log_service.open(
+                    log_file_path,
+                    header=(f"Event Log\nStarted: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                            f"----------------------------------------\n\n"))
                 self.is_logging = True
                 self.log_button.setText("Stop Logging")
-                self.log_event(f"Started logging to {log_file_path}", color="yellow")
+                self.log_event(f"Started logging to {self.log_file.path}", color="yellow")
             except Exception as e:
                 QMessageBox.critical(self, "Logging Error", f"Could not create log file: {str(e)}")
-                if self.log_file:
-                    self.log_file.close()
-                    self.log_file = None
+                self.log_file = None
                 self.is_logging = False
                 self.log_button.setText("Start Logging")
         else:
             try:
                 if self.log_file:
-                    self.log_file.write(f"\n----------------------------------------\n")
-                    self.log_file.write(f"Ended: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    self.log_file.close()
+                    self.log_file.close(footer=(f"\n----------------------------------------\n"
+                                                f"Ended: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"))
                     self.log_file = None
                 self.is_logging = False
                 self.log_button.setText("Start Logging")
@@ -0,0 +1,325 @@
+"""
+Scrollable, filterable browser over the whole-flight history.
+
+The table model holds no rows of its own: a view row maps to a history
+row either directly or through `order`, an int64 index array built by a
+filter (utils.history_filter) and/or a sort (an argsort permutation of
+that array, the columns themselves are never copied or reordered). Cell
+values are fetched from the history one page of rows at a time, and only
+a few pages are cached, so memory per visible row is constant however
+many millions of rows the flight has.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QComboBox,
+    QTableView, QHeaderView, QAbstractItemView, QFileDialog
+)
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant, QTimer
+
+from views.panels.panel_lifecycle import PanelLifecycle
+from views.panels.table_panel import format_value
+from utils.history_filter import HistoryFilter
+from utils.flight_recorder import FlightRecording
+
+
+class HistoryTableModel(QAbstractTableModel):
+    """Lazily fetched rows of a FlightHistory (or FlightRecording), filtered and sorted by index"""
+
+    PAGE_ROWS = 256
+    MAX_PAGES = 8 # Pages of values kept
+
+    def __init__(self, history, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.names = history.names
+        self.filter = None
+        self.filtered = None # Matching history rows (int64, history order), None without a filter
+        self.scanned_rows = len(history) # History rows the filter has seen
+        self.sort_column = None
+        self.sort_descending = False
+        self.permuted = False # order is a sort permutation, not history order
+        self.order = None # History rows in view order, None = all rows in history order
+        self.row_count = len(history)
+        self._pages = OrderedDict() # page -> {name: list of values}
+
+    def set_history(self, history):
+        self.beginResetModel()
+        self.history = history
+        self.names = history.names
+        self.filter = None
+        self.sort_column = None
+        self._refilter()
+        self._apply_sort()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def history_row(self, row):
+        return row if self.order is None else int(self.order[row])
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return QVariant()
+        row = index.row()
+        page = self._page(row // self.PAGE_ROWS)
+        name = self.names[index.column()]
+        return format_value(name, page[name][row % self.PAGE_ROWS])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal:
+            return self.names[section]
+        return str(self.history_row(section)) # History row number
+
+    def _page(self, page):
+        values = self._pages.get(page)
+        if values is not None:
+            self._pages.move_to_end(page)
+            return values
+        start = page * self.PAGE_ROWS
+        stop = min(start + self.PAGE_ROWS, self.row_count)
+        if self.order is None:
+            columns = self.history.rows(start, stop)
+        else:
+            columns = self.history.take(self.order[start:stop])
+        values = {name: array.tolist() for name, array in columns.items()}
+        self._pages[page] = values
+        if len(self._pages) > self.MAX_PAGES:
+            self._pages.popitem(last=False)
+        return values
+
+    def set_filter(self, history_filter):
+        """Show only the rows matching a HistoryFilter (None = all rows)"""
+        self.beginResetModel()
+        self.filter = history_filter
+        self._refilter()
+        self._apply_sort()
+        self.endResetModel()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sort the view rows by a column: an argsort permutation of the row indices"""
+        self.beginResetModel()
+        self.sort_column = self.names[column] if 0 <= column < len(self.names) else None
+        self.sort_descending = order == Qt.DescendingOrder
+        self._scan_new_rows()
+        self._apply_sort()
+        self.endResetModel()
+
+    def _refilter(self):
+        self.filtered = None
+        self.scanned_rows = 0
+        self._scan_new_rows()
+
+    def _scan_new_rows(self):
+        """Run the filter over the history rows appended since the last scan; returns the new matches"""
+        count = len(self.history)
+        first = self.scanned_rows
+        self.scanned_rows = count
+        if self.filter is None:
+            return None
+        new_rows = self.filter.evaluate(self.history, first, count)
+        self.filtered = new_rows if self.filtered is None else np.concatenate((self.filtered, new_rows))
+        return new_rows
+
+    def _apply_sort(self):
+        self._pages.clear()
+        rows = self.filtered
+        # History order is time order: no permutation needed
+        self.permuted = self.sort_column is not None and not (self.sort_column == 'time' and not self.sort_descending)
+        if self.permuted:
+            if rows is None:
+                keys = self.history.rows(0, self.scanned_rows, (self.sort_column,))[self.sort_column]
+            else:
+                keys = self.history.take(rows, (self.sort_column,))[self.sort_column]
+            keys = keys.astype(np.float64)
+            # Negated keys keep ties in history order and NaN last when descending
+            permutation = np.argsort(-keys if self.sort_descending else keys, kind='stable')
+            rows = permutation if rows is None else rows[permutation]
+        self.order = rows
+        self.row_count = self.scanned_rows if rows is None else len(rows)
+
+    def append_new_rows(self):
+        """Show history rows appended since the last call; a sorted view keeps its snapshot.
+
+        Returns the number of rows added to the view.
+        """
+        if self.permuted or len(self.history) <= self.scanned_rows:
+            return 0
+        new_rows = self._scan_new_rows()
+        added = (self.scanned_rows - self.row_count) if new_rows is None else len(new_rows)
+        if not added:
+            return 0
+        first = self.row_count
+        # The last page may have been cached short
+        self._pages.pop(first // self.PAGE_ROWS, None)
+        self.beginInsertRows(QModelIndex(), first, first + added - 1)
+        self.order = self.filtered
+        self.row_count += added
+        self.endInsertRows()
+        return added
+
+
+class HistoryPanel(PanelLifecycle, QWidget):
+    """Browse, filter and sort every packet of the flight"""
+
+    SOURCES = [
+        ("FC packets", 'history'),
+        ("GS packets", 'signal_history'),
+    ]
+
+    def __init__(self, telemetry_model, parent=None):
+        super().__init__(parent)
+        self.telemetry_model = telemetry_model
+        self.model = HistoryTableModel(telemetry_model.history, self)
+        self.recording = None # FlightRecording opened from a file
+        self.setup_ui()
+
+        # New rows are picked up once a second while the tab is shown
+        self.update_timer = QTimer(self)
+        self.update_timer.timeout.connect(self.append_new_rows)
+        self.update_timer.start(1000)
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        controls_layout = QHBoxLayout()
+        self.source_combo = QComboBox()
+        for label, attribute in self.SOURCES:
+            self.source_combo.addItem(label, attribute)
+        self.source_combo.currentIndexChanged.connect(self.change_source)
+        self.source_combo.setToolTip("History to browse")
+        controls_layout.addWidget(self.source_combo)
+
+        open_button = QPushButton("Open Recording...")
+        open_button.clicked.connect(self.open_recording)
+        open_button.setToolTip("Browse a .gsrec flight recording")
+        controls_layout.addWidget(open_button)
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter, e.g. rssi < -110   or   actuator_status changes and gps_valid")
+        self.filter_edit.returnPressed.connect(self.apply_filter)
+        controls_layout.addWidget(self.filter_edit, 1)
+
+        apply_button = QPushButton("Apply")
+        apply_button.clicked.connect(self.apply_filter)
+        controls_layout.addWidget(apply_button)
+
+        clear_button = QPushButton("Clear")
+        clear_button.clicked.connect(self.clear_filter)
+        controls_layout.addWidget(clear_button)
+        layout.addLayout(controls_layout)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setWordWrap(False)
+        # Fixed row heights and column widths: the view never measures rows it does not show
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setDefaultSectionSize(110)
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
+        self.table.setStyleSheet("""
+            QTableView {
+                background-color: #232323;
+                color: #ffcc00;
+                font-family: 'Courier New', monospace;
+                font-size: 10pt;
+                gridline-color: #444444;
+                selection-background-color: #444444;
+                selection-color: #ffffff;
+            }
+            QHeaderView::section {
+                background-color: #222222;
+                color: #ffcc00;
+                font-weight: bold;
+                border: 1px solid #444444;
+                padding: 4px;
+            }
+        """)
+        layout.addWidget(self.table, 1)
+
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #aaaaaa;")
+        layout.addWidget(self.status_label)
+        self.update_status()
+
+    def update_status(self, message=None, error=False):
+        history_rows = len(self.model.history)
+        text = f"{self.model.rowCount():,} of {history_rows:,} rows"
+        if self.model.filter is not None:
+            text += f" matching '{self.model.filter.text}'"
+        if self.model.permuted and history_rows > self.model.scanned_rows:
+            text += f" ({history_rows - self.model.scanned_rows:,} newer rows - sort again to include them)"
+        if message:
+            text = f"{message} | {text}"
+        self.status_label.setText(text)
+        self.status_label.setStyleSheet("color: #ff3333;" if error else "color: #aaaaaa;")
+
+    def current_history(self):
+        if self.recording is not None:
+            return self.recording
+        return getattr(self.telemetry_model, self.source_combo.currentData())
+
+    def change_source(self):
+        self.recording = None
+        self.set_history(self.current_history())
+
+    def open_recording(self):
+        filename, _ = QFileDialog.getOpenFileName(self, "Open Flight Recording", "logs",
+                                                  "Flight Recordings (*.gsrec);;All Files (*)")
+        if not filename:
+            return
+        try:
+            self.recording = FlightRecording(filename)
+        except (OSError, ValueError) as e:
+            self.update_status(f"Could not open {filename}: {e}", error=True)
+            return
+        self.set_history(self.recording)
+        self.update_status(f"Recording {filename}")
+
+    def set_history(self, history):
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.model.set_history(history)
+        self.apply_filter()
+
+    def apply_filter(self):
+        text = self.filter_edit.text().strip()
+        if not text:
+            self.model.set_filter(None)
+            self.update_status()
+            return
+        try:
+            history_filter = HistoryFilter(text, self.model.names)
+        except ValueError as e:
+            self.update_status(f"Filter error: {e}", error=True)
+            return
+        self.model.set_filter(history_filter)
+        self.update_status()
+
+    def clear_filter(self):
+        self.filter_edit.clear()
+        self.apply_filter()
+
+    def append_new_rows(self):
+        if not self.active:
+            return
+        if isinstance(self.model.history, FlightRecording):
+            self.model.history.refresh() # The recorder may still be writing it
+        scrollbar = self.table.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        if self.model.append_new_rows() and at_bottom:
+            self.table.scrollToBottom()
+        self.update_status()
+
+    def resync(self):
+        self.append_new_rows()
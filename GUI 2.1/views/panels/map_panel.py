@@ -8,6 +8,8 @@ from PyQt5.QtWebChannel import QWebChannel
 from PyQt5.QtCore import QObject, pyqtSlot, QUrl, Qt, QTimer, pyqtSignal
 import webbrowser  # For Open in Google Maps
 
+from views.panels.panel_lifecycle import PanelLifecycle
+
 # Working MAP_HTML from gui.py - proven to work
 MAP_HTML = """
 <!DOCTYPE html>
@@ -68,6 +70,18 @@ MAP_HTML = """
             }
         }
         
+        function appendPath(points) {
+            // Positions received while the tab was hidden, drawn in one update
+            var last = points[points.length - 1];
+            marker.setLatLng(last);
+            coordinates.push.apply(coordinates, points);
+            pathLine.setLatLngs(coordinates);
+            
+            if (followMarker) {
+                map.setView(last);
+            }
+        }
+        
         function updateUserMarker(lat, lon) {
             userMarker.setLatLng([lat, lon]);
             userMarker.bindPopup('Ground Station').openPopup();
@@ -144,10 +158,10 @@ class LocationHandler(QObject):
         self.map_panel.map_controller.detect_user_location()
 
 
-class MapPanel(QWidget):
+class MapPanel(PanelLifecycle, QWidget):
     """Panel for displaying the map, based on working gui.py implementation"""
     
-    def __init__(self, map_controller, telemetry_model, settings_model, parent=None):
+    def __init__(self, map_controller, telemetry_model, settings_model, parent=None, refresh_scheduler=None):
         super().__init__(parent)
         self.map_controller = map_controller
         self.telemetry_model = telemetry_model
@@ -158,11 +172,16 @@ class MapPanel(QWidget):
         self.user_lon = None
         self.last_gps_lat = None
         self.last_gps_lon = None
+        self.last_vehicle = None # Latest (lat, lon, alt) received
+        self.pending_path = [] # Positions received while the tab was hidden
         
         self.setup_ui()
         
         # Connect signals from models/controllers
-        self.telemetry_model.position_updated.connect(self.update_vehicle_marker)
+        if refresh_scheduler is not None:
+            refresh_scheduler.connect_latest(self.telemetry_model.position_updated, self.update_vehicle_marker)
+        else:
+            self.telemetry_model.position_updated.connect(self.update_vehicle_marker)
         self.map_controller.user_location_changed.connect(self.update_user_marker)
 
     def setup_ui(self):
@@ -254,13 +273,21 @@ class MapPanel(QWidget):
             # Only update if position actually changed
             if (self.last_gps_lat, self.last_gps_lon) != (lat, lon):
                 self.last_gps_lat, self.last_gps_lon = lat, lon
-                try:
-                    # Update map marker using the working JavaScript function
-                    js_code = f"updateMarker({lat}, {lon});"
-                    self.map_view.page().runJavaScript(js_code)
-                except Exception as e:
-                    print(f"MapPanel: Error updating vehicle marker: {e}")
-            # ...existing code for updating GPS label...
+                if not self.active:
+                    self.pending_path.append([lat, lon]) # Drawn by resync()
+                else:
+                    try:
+                        # Update map marker using the working JavaScript function
+                        js_code = f"updateMarker({lat}, {lon});"
+                        self.map_view.page().runJavaScript(js_code)
+                    except Exception as e:
+                        print(f"MapPanel: Error updating vehicle marker: {e}")
+        self.last_vehicle = (lat, lon, alt)
+        if self.active:
+            self.update_gps_label(lat, lon, alt)
+
+    def update_gps_label(self, lat, lon, alt):
+        if lat != 0 and lon != 0:
             lat_direction = "N" if lat >= 0 else "S"
             lon_direction = "E" if lon >= 0 else "W"
             self.gps_label.setText(
@@ -279,6 +306,17 @@ class MapPanel(QWidget):
                 "font-size: 10pt; font-weight: bold; min-width: 280px;"
             )
 
+    def resync(self):
+        """Draw the path received while hidden and the latest vehicle position"""
+        if self.pending_path:
+            points, self.pending_path = self.pending_path, []
+            try:
+                self.map_view.page().runJavaScript(f"appendPath({points});")
+            except Exception as e:
+                print(f"MapPanel: Error updating vehicle path: {e}")
+        if self.last_vehicle is not None:
+            self.update_gps_label(*self.last_vehicle)
+
     def update_user_marker(self, lat, lon):
         """Update user marker from map controller"""
         self.user_lat, self.user_lon = lat, lon
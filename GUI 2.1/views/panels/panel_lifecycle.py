@@ -0,0 +1,27 @@
+"""
+Tab lifecycle for the main window panels.
+
+MainWindow activates the panel of the current tab and deactivates the
+others (QTabWidget.currentChanged). An inactive panel skips cosmetic work -
+repainting plots, labels, the map - but keeps its operational duties such
+as logging, mount slewing and camera triggering. activate() calls resync()
+so the panel catches up with the models before it is seen.
+"""
+
+
+class PanelLifecycle:
+    """Mixin for tab panels that pause their cosmetic work while hidden"""
+
+    active = True # Panels outside a MainWindow tab stay active
+
+    def activate(self):
+        """The panel's tab was shown"""
+        self.active = True
+        self.resync()
+
+    def deactivate(self):
+        """The panel's tab was hidden"""
+        self.active = False
+
+    def resync(self):
+        """Bring the display up to date with the models (override)"""
@@ -2,39 +2,64 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QComboBox, 
     QStackedWidget, QGridLayout, QLabel, QFrame
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 import pyqtgraph as pg
-import time # For time data
+import math
+from utils.ring_series import RingSeries
+from utils.lod_pyramid import MinMaxPyramid
+from models.telemetry_snapshot import NAVIGATION, ENVIRONMENT
+from views.panels.panel_lifecycle import PanelLifecycle
 
-class PlotPanel(QWidget):
+# History columns of the plotted series, in ring buffer order after time
+HISTORY_PLOT_COLUMNS = ('gps_alt', 'altitude', 'ground_speed', 'vertical_speed', 'temperature', 'pressure', 'rssi', 'snr')
+
+# (label, plot.time_window_s) - 0 plots the ring buffers, anything else the history
+PLOT_SPANS = (("Recent samples", 0), ("Last 10 min", 600), ("Last hour", 3600), ("Whole flight", math.inf))
+
+class PlotPanel(PanelLifecycle, QWidget):
     """Panel for displaying telemetry data plots, based on gui.py structure"""
     
-    def __init__(self, telemetry_model, settings_model, parent=None): # Added settings_model if needed
+    def __init__(self, telemetry_model, settings_model, parent=None, refresh_scheduler=None): # Added settings_model if needed
         super().__init__(parent)
         self.telemetry_model = telemetry_model
+        self.refresh_scheduler = refresh_scheduler
         self.settings_model = settings_model # Store if needed for plot configurations
-        self.start_time = time.time() # For x-axis time data
-
-        # Data storage for plots
-        self.time_data = []
-        self.altitude_gps_data = []
-        self.altitude_baro_data = []
-        self.ground_speed_data = []
-        self.vertical_speed_data = [] # Calculated
-        self.temperature_data = []
-        self.pressure_data = []
-        self.rssi_data = []
-        self.snr_data = []
-        
-        # Last values for vertical speed calculation
-        self.last_plot_altitude = None
-        self.last_plot_altitude_time = None
+        self.sampled_rows = 0 # History rows already in the plot buffers
+
+        # Data storage for plots - ring buffers of the last plot.max_points history rows
+        self.max_points = self.settings_model.get('plot.max_points', 500)
+        self.time_data = RingSeries(self.max_points)
+        self.altitude_gps_data = RingSeries(self.max_points)
+        self.altitude_baro_data = RingSeries(self.max_points)
+        self.ground_speed_data = RingSeries(self.max_points)
+        self.vertical_speed_data = RingSeries(self.max_points) # Derived by the model
+        self.temperature_data = RingSeries(self.max_points)
+        self.pressure_data = RingSeries(self.max_points)
+        self.rssi_data = RingSeries(self.max_points)
+        self.snr_data = RingSeries(self.max_points)
+        self.plot_series = (self.time_data, self.altitude_gps_data, self.altitude_baro_data,
+                            self.ground_speed_data, self.vertical_speed_data, self.temperature_data,
+                            self.pressure_data, self.rssi_data, self.snr_data)
+
+        # Min/max decimation of the whole-flight history for the time window spans
+        self.lod = MinMaxPyramid(self.telemetry_model.history, HISTORY_PLOT_COLUMNS)
+        # Zooming and panning re-feed the visible page, coalesced to one redraw
+        self.view_timer = QTimer(self)
+        self.view_timer.setSingleShot(True)
+        self.view_timer.setInterval(30)
+        self.view_timer.timeout.connect(self.redraw_plots)
 
 
         self.setup_ui()
 
         # Connect to model signals
-        self.telemetry_model.data_updated.connect(self.update_plots_from_model)
+        # fields_changed is coalesced per batch, so each call takes every history row since the last one
+        if self.refresh_scheduler is not None:
+            # Every packet goes into the buffers, the curves are redrawn once per frame
+            self.telemetry_model.connect_fields(NAVIGATION | ENVIRONMENT, self.append_samples_from_history)
+            self.refresh_scheduler.register(NAVIGATION | ENVIRONMENT, self.redraw_plots)
+        else:
+            self.telemetry_model.connect_fields(NAVIGATION | ENVIRONMENT, self.update_plots_from_model)
 
     def setup_ui(self):
         main_layout = QVBoxLayout(self)
@@ -44,7 +69,24 @@ class PlotPanel(QWidget):
         self.plot_selector.addItems(["Flight Data", "Signal Strength", "All Plots"])
         self.plot_selector.setStyleSheet("QComboBox { background-color: #2a2a2a; color: #ffffff; padding: 5px; border: 1px solid #3a3a3a; border-radius: 4px; min-width: 150px; }")
         self.plot_selector.currentIndexChanged.connect(self.switch_plot_view)
-        main_layout.addWidget(self.plot_selector)
+
+        # Time span selector
+        self.span_selector = QComboBox()
+        self.span_selector.setStyleSheet(self.plot_selector.styleSheet())
+        window_s = self.settings_model.get('plot.time_window_s', 0)
+        spans = list(PLOT_SPANS)
+        if window_s not in [span for label, span in spans]:
+            spans.append((f"Last {window_s:g} s", window_s))
+        for label, span in spans:
+            self.span_selector.addItem(label, span)
+        self.span_selector.setCurrentIndex([span for label, span in spans].index(window_s))
+        self.span_selector.currentIndexChanged.connect(self.switch_plot_span)
+
+        selector_layout = QHBoxLayout()
+        selector_layout.addWidget(self.plot_selector)
+        selector_layout.addWidget(self.span_selector)
+        selector_layout.addStretch()
+        main_layout.addLayout(selector_layout)
         
         # Stacked widget for plot pages
         self.plot_stack = QStackedWidget()
@@ -55,6 +97,33 @@ class PlotPanel(QWidget):
         self.create_signal_strength_page()
         self.create_all_plots_page()
 
+        # (curve, index into plot_series, plot giving its x range) for each
+        # page - only the visible page is redrawn, hidden pages catch up when they are shown
+        self.page_curves = (
+            ((self.altitude_gps_curve_flight, 1, self.altitude_plot_flight),
+             (self.altitude_baro_curve_flight, 2, self.altitude_plot_flight),
+             (self.ground_speed_curve_flight, 3, self.speed_plot_flight),
+             (self.vertical_speed_curve_flight, 4, self.speed_plot_flight),
+             (self.temp_curve_flight, 5, self.temp_plot_flight),
+             (self.press_curve_flight, 6, self.press_plot_flight)),
+            ((self.rssi_curve_signal, 7, self.rssi_plot_signal),
+             (self.snr_curve_signal, 8, self.snr_plot_signal)),
+            ((self.altitude_gps_curve_all, 1, self.altitude_plot_all),
+             (self.altitude_baro_curve_all, 2, self.altitude_plot_all),
+             (self.ground_speed_curve_all, 3, self.speed_plot_all),
+             (self.vertical_speed_curve_all, 4, self.speed_plot_all),
+             (self.rssi_curve_all, 7, self.signal_plot_all),
+             (self.snr_curve_all, 8, self.signal_plot_all),
+             (self.temp_curve_all, 5, self.temp_press_plot_all),
+             (self.press_curve_all, 6, self.temp_press_plot_all)),
+        )
+        self.page_plots = tuple(tuple(dict.fromkeys(plot for curve, column, plot in page)) for page in self.page_curves)
+        self._page_versions = [None] * len(self.page_curves) # Data version each page last drew
+        for plots in self.page_plots:
+            for plot in plots:
+                plot.getViewBox().sigXRangeChanged.connect(self.view_timer.start)
+                plot.getViewBox().sigResized.connect(self.view_timer.start)
+
     def create_flight_data_page(self):
         page = QWidget()
         layout = QGridLayout(page)
@@ -189,78 +258,98 @@ class PlotPanel(QWidget):
 
     def switch_plot_view(self, index):
         self.plot_stack.setCurrentIndex(index)
+        self.draw_page(index) # Re-sync the page if samples arrived while it was hidden
 
-    def _calculate_plot_vertical_speed(self, current_altitude):
-        if self.last_plot_altitude is None or self.last_plot_altitude_time is None:
-            self.last_plot_altitude = current_altitude
-            self.last_plot_altitude_time = time.time()
-            return 0.0
-        
-        now = time.time()
-        time_diff = now - self.last_plot_altitude_time
-        
-        if time_diff < 0.1:
-            return getattr(self, 'last_calculated_plot_vs', 0.0)
-            
-        altitude_diff = current_altitude - self.last_plot_altitude
-        vertical_speed = altitude_diff / time_diff
-        
-        self.last_plot_altitude = current_altitude
-        self.last_plot_altitude_time = now
-        self.last_calculated_plot_vs = vertical_speed
-        return vertical_speed
+    def switch_plot_span(self, index):
+        self.settings_model.set('plot.time_window_s', self.span_selector.itemData(index))
+        for plots in self.page_plots:
+            for plot in plots:
+                plot.enableAutoRange()
+        self.redraw_plots()
 
-    def update_plots_from_model(self):
+    def update_plots_from_model(self, changed=None):
         """Update plots with new data from telemetry_model."""
-        data = self.telemetry_model.get_latest_telemetry()
-        current_time_abs = time.time() - self.start_time
-        
-        self.time_data.append(current_time_abs)
-        self.altitude_gps_data.append(data.get('gps_alt', float('nan')))
-        self.altitude_baro_data.append(data.get('altitude', float('nan')))
-        self.ground_speed_data.append(data.get('gps_speed', float('nan')))
-        
-        baro_alt_for_vs = data.get('altitude', None)
-        if baro_alt_for_vs is not None:
-            vs = self._calculate_plot_vertical_speed(baro_alt_for_vs)
-            self.vertical_speed_data.append(vs)
+        self.append_samples_from_history(changed)
+        self.redraw_plots(changed)
+
+    def append_samples_from_history(self, changed=None):
+        """Append the FC history rows received since the last call to the plot buffers (no redraw).
+
+        One sample per packet, at its flight-computer time - the same x axis as the time window spans.
+        """
+        # Limit data points - the ring buffers drop the oldest values themselves
+        max_points = self.settings_model.get('plot.max_points', 500)
+        if max_points != self.max_points:
+            self.max_points = max_points
+            for series in self.plot_series:
+                series.resize(max_points)
+
+        history = self.telemetry_model.history
+        count = len(history)
+        if count <= self.sampled_rows:
+            return
+        # Rows that would be pushed out of the buffers anyway are not read
+        first = max(self.sampled_rows, count - self.max_points)
+        self.sampled_rows = count
+        columns = history.rows(first, count, ('time',) + HISTORY_PLOT_COLUMNS)
+        self.time_data.extend(columns['time'])
+        for series, name in zip(self.plot_series[1:], HISTORY_PLOT_COLUMNS):
+            series.extend(columns[name])
+
+    def _view_state(self, index):
+        """x range (None while auto-ranging) and pixel width of each plot on a page"""
+        state = []
+        for plot in self.page_plots[index]:
+            view_box = plot.getViewBox()
+            x_range = None if view_box.autoRangeEnabled()[0] else tuple(view_box.viewRange()[0])
+            state.append((x_range, int(view_box.width())))
+        return tuple(state)
+
+    def _data_version(self, index, window_s):
+        """Changes whenever the plotted arrays would differ"""
+        if window_s > 0:
+            return ('history', window_s, len(self.telemetry_model.history), self._view_state(index))
+        return ('buffers', self.max_points, self.time_data.total)
+
+    def draw_page(self, index):
+        """Hand the current samples to the curves of one page, unless it already shows them."""
+        # plot.time_window_s > 0 plots a span of flight-computer time from the history,
+        # otherwise the last plot.max_points samples
+        window_s = self.settings_model.get('plot.time_window_s', 0)
+        version = self._data_version(index, window_s)
+        if self._page_versions[index] == version:
+            return
+        if window_s > 0:
+            self._draw_history_page(index, window_s)
         else:
-            self.vertical_speed_data.append(float('nan'))
-
-        self.temperature_data.append(data.get('temperature', float('nan')))
-        self.pressure_data.append(data.get('pressure', float('nan')))
-        self.rssi_data.append(data.get('rssi', float('nan')))
-        self.snr_data.append(data.get('snr', float('nan')))
-
-        # Limit data points
-        max_points = self.settings_model.get('plot.max_points', 500) 
-        for arr in [self.time_data, self.altitude_gps_data, self.altitude_baro_data, 
-                    self.ground_speed_data, self.vertical_speed_data, self.temperature_data, 
-                    self.pressure_data, self.rssi_data, self.snr_data]:
-            if len(arr) > max_points:
-                arr.pop(0)
-        
-        # Update Flight Data Page
-        self.altitude_gps_curve_flight.setData(self.time_data, self.altitude_gps_data)
-        self.altitude_baro_curve_flight.setData(self.time_data, self.altitude_baro_data)
-        self.ground_speed_curve_flight.setData(self.time_data, self.ground_speed_data)
-        self.vertical_speed_curve_flight.setData(self.time_data, self.vertical_speed_data)
-        self.temp_curve_flight.setData(self.time_data, self.temperature_data)
-        self.press_curve_flight.setData(self.time_data, self.pressure_data)
-
-        # Update Signal Strength Page
-        self.rssi_curve_signal.setData(self.time_data, self.rssi_data)
-        self.snr_curve_signal.setData(self.time_data, self.snr_data)
-
-        # Update All Plots Page
-        self.altitude_gps_curve_all.setData(self.time_data, self.altitude_gps_data)
-        self.altitude_baro_curve_all.setData(self.time_data, self.altitude_baro_data)
-        self.ground_speed_curve_all.setData(self.time_data, self.ground_speed_data)
-        self.vertical_speed_curve_all.setData(self.time_data, self.vertical_speed_data)
-        self.rssi_curve_all.setData(self.time_data, self.rssi_data)
-        self.snr_curve_all.setData(self.time_data, self.snr_data)
-        self.temp_curve_all.setData(self.time_data, self.temperature_data)
-        self.press_curve_all.setData(self.time_data, self.pressure_data)
+            # Ordered zero-copy views of the ring buffers
+            arrays = tuple(series.view() for series in self.plot_series)
+            for curve, column, plot in self.page_curves[index]:
+                curve.setData(arrays[0], arrays[column])
+        self._page_versions[index] = version
+
+    def _draw_history_page(self, index, window_s):
+        """Feed each curve the pyramid level that fits its plot's visible range and width."""
+        time_range = self.telemetry_model.query.time_range()
+        if time_range is None:
+            return
+        self.lod.update()
+        for curve, column, plot in self.page_curves[index]:
+            view_box = plot.getViewBox()
+            if view_box.autoRangeEnabled()[0]:
+                start, end = time_range[1] - window_s, time_range[1]
+            else:
+                start, end = view_box.viewRange()[0]
+            pixels = view_box.width() or 1000 # Not laid out yet
+            curve.setData(*self.lod.render(HISTORY_PLOT_COLUMNS[column - 1], start, end, pixels))
+
+    def redraw_plots(self, changed=None):
+        """Redraw the visible page; hidden pages are drawn when switched to."""
+        if self.active: # Samples keep going into the buffers while the tab is hidden
+            self.draw_page(self.plot_stack.currentIndex())
+
+    def resync(self):
+        self.redraw_plots()
 
     def update_plots(self):
         # This method was in gui.py, now replaced by update_plots_from_model
@@ -1,27 +1,183 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView
-from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableView, QHeaderView
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+from PyQt5.QtGui import QBrush
+import bisect
 import datetime
 
+# Important fields first, in this order; the rest follow alphabetically
+PRIORITY_FIELDS = [
+    'ack', 'rssi', 'snr',
+    'gps_lat', 'gps_lon', 'gps_alt', 'gps_valid', 'gps_time',
+    'altitude', 'temperature', 'pressure', 'ground_speed',
+    'fc_battery_voltage', 'led_battery_voltage',
+    'photodiode_value1', 'photodiode_value2'
+]
+
+GOOD_BRUSH = QBrush(Qt.darkGreen)
+BAD_BRUSH = QBrush(Qt.darkRed)
+
+
+def field_sort_key(field):
+    if field in PRIORITY_FIELDS:
+        return (0, PRIORITY_FIELDS.index(field), '')
+    return (1, 0, field)
+
+
+def format_value(field, value):
+    """Display text of a packet value"""
+    if isinstance(value, float):
+        if field in ['gps_lat', 'gps_lon']:
+            return f"{value:.6f}"  # GPS coordinates with 6 decimal places
+        if field in ['gps_time'] and value > 1000000000:  # Unix timestamp
+            try:
+                # Handle microseconds if value is very large
+                if value > 1000000000000:  # Microseconds
+                    dt = datetime.datetime.fromtimestamp(value / 1000000.0, tz=datetime.timezone.utc)
+                else:  # Seconds
+                    dt = datetime.datetime.fromtimestamp(value, tz=datetime.timezone.utc)
+                return dt.strftime("%Y-%m-%d %H:%M:%S UTC")
+            except (ValueError, OverflowError, OSError):
+                return f"{value:.2f}"
+        return f"{value:.2f}"  # 2 decimal places for other floats
+    if isinstance(value, bool):
+        return "YES" if value else "NO"
+    if isinstance(value, int):
+        return str(value)
+    return str(value) if value != "" else "N/A"
+
+
+def value_background(field, value):
+    """Colour coding for important fields, or None"""
+    if field == 'gps_valid':
+        return GOOD_BRUSH if value else BAD_BRUSH
+    if field in ['rssi', 'snr'] and isinstance(value, (int, float)):
+        if field == 'rssi' and value > -80:
+            return GOOD_BRUSH
+        if field == 'rssi' and value < -100:
+            return BAD_BRUSH
+        if field == 'snr' and value > 5:
+            return GOOD_BRUSH
+        if field == 'snr' and value < 0:
+            return BAD_BRUSH
+    return None
+
+
+class PacketTableModel(QAbstractTableModel):
+    """Latest value of every packet field ever seen, one field per row.
+
+    Rows keep their field (new fields are inserted at their sorted place),
+    formatted text and colours are cached, and an update emits dataChanged
+    only for the value cells whose text or colour changed.
+    """
+
+    HEADERS = ["Field", "Value"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.fields = []
+        self.sort_keys = [] # field_sort_key of each row, for inserting new fields
+        self.row_of = {} # field -> row
+        self.values = [] # Last raw value per row
+        self.texts = []
+        self.backgrounds = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.fields)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 2
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+        row = index.row()
+        if role == Qt.DisplayRole:
+            return self.fields[row] if index.column() == 0 else self.texts[row]
+        if role == Qt.BackgroundRole and index.column() == 1:
+            background = self.backgrounds[row]
+            return QVariant() if background is None else background
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return QVariant()
+
+    def flags(self, index):
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled
+
+    def update_packet(self, packet):
+        """Take the values of a packet; returns the number of value cells that changed"""
+        # New fields first: inserting one shifts the rows below it
+        for field, value in packet.items():
+            if field not in self.row_of:
+                self.insert_field(field, value)
+
+        changed_rows = []
+        for field, value in packet.items():
+            row = self.row_of[field]
+            old = self.values[row]
+            if value is old or (type(value) is type(old) and value == old):
+                continue
+            self.values[row] = value
+            text = format_value(field, value)
+            background = value_background(field, value)
+            if text != self.texts[row] or background is not self.backgrounds[row]:
+                self.texts[row] = text
+                self.backgrounds[row] = background
+                changed_rows.append(row)
+
+        # One dataChanged per run of adjacent changed rows
+        changed_rows.sort()
+        start = 0
+        for i in range(1, len(changed_rows) + 1):
+            if i == len(changed_rows) or changed_rows[i] != changed_rows[i - 1] + 1:
+                self.dataChanged.emit(self.index(changed_rows[start], 1), self.index(changed_rows[i - 1], 1),
+                                      [Qt.DisplayRole, Qt.BackgroundRole])
+                start = i
+        return len(changed_rows)
+
+    def insert_field(self, field, value):
+        key = field_sort_key(field)
+        row = bisect.bisect_right(self.sort_keys, key)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.fields.insert(row, str(field))
+        self.sort_keys.insert(row, key)
+        self.values.insert(row, value)
+        self.texts.insert(row, format_value(field, value))
+        self.backgrounds.insert(row, value_background(field, value))
+        self.row_of = {name: i for i, name in enumerate(self.fields)}
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.fields = []
+        self.sort_keys = []
+        self.row_of = {}
+        self.values = []
+        self.texts = []
+        self.backgrounds = []
+        self.endResetModel()
+
+
 class TablePanel(QWidget):
     """Panel to display the latest received radio data packet in a vertical key-value table."""
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        # Store the last set of fields to keep the table structure consistent
-        self.all_fields = []
+        self.model = PacketTableModel(self)
         self.setup_ui()
 
     def setup_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
-        self.table = QTableWidget()
-        self.table.setColumnCount(2)
-        self.table.setRowCount(0)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setAlternatingRowColors(False)
         self.table.setShowGrid(True)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: #232323;
                 color: #ffcc00;
                 font-family: 'Courier New', monospace;
@@ -31,7 +187,7 @@ class TablePanel(QWidget):
                 selection-background-color: #444444;
                 selection-color: #ffffff;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background: #444444;
                 color: #ffffff;
             }
@@ -44,96 +200,26 @@ class TablePanel(QWidget):
                 font-size: 16pt;
             }
         """)
-        self.table.setHorizontalHeaderLabels(["Field", "Value"])
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.verticalHeader().setVisible(False)
         layout.addWidget(self.table)
         self.setLayout(layout)
 
     def add_packet(self, packet: dict):
-        """Show only the latest packet (dict) in the table, one field per row.
-        Keep all fields ever seen, and update their values as new packets arrive.
-        """
+        """Show the latest value of every field ever seen, one field per row."""
         if not isinstance(packet, dict):
             return
-            
-        # Update the list of all fields ever seen, preserving order
-        for key in packet.keys():
-            if key not in self.all_fields:
-                self.all_fields.append(key)
-                
-        # Sort fields in a logical order: important fields first
-        priority_fields = [
-            'ack', 'rssi', 'snr', 
-            'gps_lat', 'gps_lon', 'gps_alt', 'gps_valid', 'gps_time',
-            'altitude', 'temperature', 'pressure', 'ground_speed',
-            'fc_battery_voltage', 'led_battery_voltage',
-            'photodiode_value1', 'photodiode_value2'
-        ]
-        
-        # Start with priority fields that exist in the packet
-        ordered_fields = [field for field in priority_fields if field in packet]
-        
-        # Add remaining fields
-        remaining_fields = [field for field in packet if field not in priority_fields]
-        remaining_fields.sort()  # Sort alphabetically
-        
-        self.all_fields = ordered_fields + remaining_fields
-
-        self.table.setRowCount(len(self.all_fields))
-        
-        for row, field in enumerate(self.all_fields):
-            key_item = QTableWidgetItem(str(field))
-            key_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-            
-            # Format the value based on its type
-            value = packet.get(field, "")
-            if isinstance(value, float):
-                if field in ['gps_lat', 'gps_lon']:
-                    formatted_value = f"{value:.6f}"  # GPS coordinates with 6 decimal places
-                elif field in ['gps_time'] and value > 1000000000:  # Unix timestamp
-                    try:
-                        # Handle microseconds if value is very large
-                        if value > 1000000000000:  # Microseconds
-                            dt = datetime.datetime.fromtimestamp(value / 1000000.0, tz=datetime.timezone.utc)
-                        else:  # Seconds
-                            dt = datetime.datetime.fromtimestamp(value, tz=datetime.timezone.utc)
-                        formatted_value = dt.strftime("%Y-%m-%d %H:%M:%S UTC")
-                    except:
-                        formatted_value = f"{value:.2f}"
-                else:
-                    formatted_value = f"{value:.2f}"  # 2 decimal places for other floats
-            elif isinstance(value, bool):
-                formatted_value = "YES" if value else "NO"
-            elif isinstance(value, int):
-                formatted_value = str(value)
-            else:
-                formatted_value = str(value) if value != "" else "N/A"
-            
-            value_item = QTableWidgetItem(formatted_value)
-            value_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-            
-            # Color coding for important fields
-            if field == 'gps_valid':
-                if value:
-                    value_item.setBackground(Qt.darkGreen)
-                else:
-                    value_item.setBackground(Qt.darkRed)
-            elif field in ['rssi', 'snr']:
-                if isinstance(value, (int, float)):
-                    if field == 'rssi' and value > -80:
-                        value_item.setBackground(Qt.darkGreen)
-                    elif field == 'rssi' and value < -100:
-                        value_item.setBackground(Qt.darkRed)
-                    elif field == 'snr' and value > 5:
-                        value_item.setBackground(Qt.darkGreen)
-                    elif field == 'snr' and value < 0:
-                        value_item.setBackground(Qt.darkRed)
-            
-            self.table.setItem(row, 0, key_item)
-            self.table.setItem(row, 1, value_item)
+        self.model.update_packet(packet)
+
+    def add_packets(self, packets: list):
+        """Apply a batch of packets; only the latest value of each field is shown."""
+        latest = {}
+        for packet in packets:
+            if isinstance(packet, dict):
+                latest.update(packet)
+        if latest:
+            self.model.update_packet(latest)
 
     def clear_table(self):
         """Clear all data from the table"""
-        self.all_fields = []
-        self.table.setRowCount(0)
+        self.model.clear()
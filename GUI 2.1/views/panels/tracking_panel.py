@@ -5,7 +5,6 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import QDateTime, QTimeZone, Qt, QTimer, QDateTime
 from PyQt5.QtGui import QFont, QColor, QPalette
 import time
-import math
 import threading
 import numpy as np
 import matplotlib.pyplot as plt
@@ -18,9 +17,11 @@ from astropy.coordinates import SkyCoord, EarthLocation, AltAz
 from astropy.time import Time
 import astropy.units as u
 from views.widgets.compass_widget import CompassWidget
+from views.panels.panel_lifecycle import PanelLifecycle
+from utils.derived_metrics import look_angles
+from utils.logging_utils import LogService
 import pytz
 from datetime import datetime
-from .EKF_algo.EKF import EKF
 # Import ZWO camera functionality
 try:
     sys.path.append(os.path.join(os.path.dirname(__file__), 'ZWO_Trigger'))
@@ -225,15 +226,17 @@ class StatusIndicator(QFrame):
         print(f"StatusIndicator '{self.label_text}' set to custom '{text}' with color {color}")
 
 
-class TrackingPanel(QWidget):
+class TrackingPanel(PanelLifecycle, QWidget):
 
 
     """Panel for balloon tracking visualization and ground station operations"""
     
-    def __init__(self, telemetry_model, map_controller, parent=None):
+    def __init__(self, telemetry_model, map_controller, parent=None, refresh_scheduler=None, log_service=None):
         super().__init__(parent)
         self.telemetry_model = telemetry_model
         self.map_controller = map_controller
+        self.refresh_scheduler = refresh_scheduler
+        self.log_service = log_service or LogService()
         
         # Tracking data
         self.balloon_lat = 0
@@ -263,22 +266,32 @@ class TrackingPanel(QWidget):
         self.log_dir = os.path.join(os.path.dirname(__file__), '../../logs')
         os.makedirs(self.log_dir, exist_ok=True)
         now = datetime.utcnow().strftime('%Y-%m-%d %H-%M-%S')
-        self.log_file = os.path.join(self.log_dir, f'tracking_panel_log_{now}.txt')
+        self.log_file = self.log_service.open(os.path.join(self.log_dir, f'tracking_panel_log_{now}.txt'))
 
-        self.ekf = EKF()
         self.pred_lat = 0.0
         self.pred_lon = 0.0
         self.pred_alt = 0.0
         self.tracking_enabled = True
         self.last_pred_slew_time = 0
+        self.ra = None # Latest mount target
+        self.dec = None
+        self.pred_bearing = None
 
-        self.prediction_thread = threading.Thread(target=self.prediction_loop, daemon=True)
-        self.prediction_thread.start()
+        # Predicted position 5 s ahead, fitted on the telemetry history every 5 s
+        self.prediction_timer = QTimer()
+        self.prediction_timer.timeout.connect(self.update_prediction)
+        self.prediction_timer.start(5000)
 
         self.setup_ui()
         self.setup_connections()
         
-        # Timer for updates
+        # Operational timers keep running while the tab is hidden:
+        # mount target, tracking log and slews
+        self.tracking_timer = QTimer()
+        self.tracking_timer.timeout.connect(self.update_tracking)
+        self.tracking_timer.start(1000)
+        
+        # Timer for display updates (paused while the tab is hidden)
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self.update_displays)
         self.update_timer.start(1000)  # Update every second
@@ -288,7 +301,7 @@ class TrackingPanel(QWidget):
         self.exposure_timer.timeout.connect(self.check_exposure_timing)
         self.exposure_timer.start(1000)  # Check every second
         
-        # Timer for LED plot updates
+        # Timer for LED plot updates (paused while the tab is hidden)
         self.led_plot_timer = QTimer()
         self.led_plot_timer.timeout.connect(self.update_led_timing_plot)
         self.led_plot_timer.start(100)  # Update plot every 100ms for smooth animation
@@ -522,8 +535,7 @@ class TrackingPanel(QWidget):
             data['ra'] = 'N/A'
             data['dec'] = 'N/A'
         # Write as a single line (CSV style)
-        with open(self.log_file, 'a') as f:
-            f.write(','.join(f'{k}={v}' for k, v in data.items()) + '\n')
+        self.log_file.write(','.join(f'{k}={v}' for k, v in data.items()) + '\n')
 
     def apply_manual_ground_station(self):
         """Apply manual ground station coordinates from user input"""
@@ -864,8 +876,13 @@ class TrackingPanel(QWidget):
     
     def setup_connections(self):
         """Connect to model signals"""
-        self.telemetry_model.acc_updated.connect(self.update_acceleration)
-        self.telemetry_model.position_updated.connect(self.update_balloon_position)
+        if self.refresh_scheduler is not None:
+            # Recalculate tracking once per frame with the latest values
+            self.refresh_scheduler.connect_latest(self.telemetry_model.acc_updated, self.update_acceleration)
+            self.refresh_scheduler.connect_latest(self.telemetry_model.position_updated, self.update_balloon_position)
+        else:
+            self.telemetry_model.acc_updated.connect(self.update_acceleration)
+            self.telemetry_model.position_updated.connect(self.update_balloon_position)
         self.telemetry_model.ground_station_gps_updated.connect(self.update_ground_position)
         self.map_controller.user_location_changed.connect(self.update_ground_position_from_controller)
     
@@ -902,69 +919,17 @@ class TrackingPanel(QWidget):
         if self.ground_lat == 0 or self.ground_lon == 0 or self.balloon_lat == 0 or self.balloon_lon == 0:
             return
 
-        # Calculate bearing
-        self.bearing = self.calculate_bearing(self.ground_lat, self.ground_lon, 
-                                            self.balloon_lat, self.balloon_lon)
-
-        # Calculate distance
-        self.distance = self.calculate_distance(self.ground_lat, self.ground_lon,
-                                              self.balloon_lat, self.balloon_lon)
-
-        # Calculate elevation angle
-        if self.distance > 0:
-            # Convert distance to meters and calculate elevation
-            distance_m = self.distance * 1000
-            height_diff = self.balloon_alt - self.ground_alt  # Altitude relative to user
-            self.elevation = math.degrees(math.atan2(height_diff, distance_m))
-        else:
-            self.elevation = 0
+        # From this panel's ground station - it can be set manually, unlike the model's (MapController)
+        self.bearing, self.elevation, self.distance = self.calculate_parameters_for(
+            self.balloon_lat, self.balloon_lon, self.balloon_alt)
 
         # Update compass
         self.bearing_compass.setBearing(self.bearing)
     
-    def calculate_bearing(self, lat1, lon1, lat2, lon2):
-        """Calculate bearing from point 1 to point 2"""
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        dlon_rad = math.radians(lon2 - lon1)
-        
-        y = math.sin(dlon_rad) * math.cos(lat2_rad)
-        x = (math.cos(lat1_rad) * math.sin(lat2_rad) - 
-             math.sin(lat1_rad) * math.cos(lat2_rad) * math.cos(dlon_rad))
-        
-        bearing_rad = math.atan2(y, x)
-        bearing_deg = math.degrees(bearing_rad)
-        
-        return (bearing_deg + 360) % 360
-    
-    def calculate_distance(self, lat1, lon1, lat2, lon2):
-        """Calculate distance between two points using Haversine formula"""
-        R = 6371  # Earth's radius in km
-        
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        dlat_rad = math.radians(lat2 - lat1)
-        dlon_rad = math.radians(lon2 - lon1)
-        
-        a = (math.sin(dlat_rad/2) * math.sin(dlat_rad/2) +
-             math.cos(lat1_rad) * math.cos(lat2_rad) *
-             math.sin(dlon_rad/2) * math.sin(dlon_rad/2))
-        
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        
-        return R * c
-    
     def calculate_parameters_for(self, lat, lon, alt):
-        """Calculate bearing, elevation and distance for given coordinates."""
-        bearing = self.calculate_bearing(self.ground_lat, self.ground_lon, lat, lon)
-        distance = self.calculate_distance(self.ground_lat, self.ground_lon, lat, lon)
-        if distance > 0:
-            distance_m = distance * 1000
-            height_diff = alt - self.ground_alt
-            elevation = math.degrees(math.atan2(height_diff, distance_m))
-        else:
-            elevation = 0
-        return bearing, elevation, distance
+        """Calculate bearing, elevation and distance (km) for given coordinates."""
+        bearing, distance, elevation = look_angles(self.ground_lat, self.ground_lon, self.ground_alt, lat, lon, alt)
+        return bearing, elevation, distance / 1000
     
     def calculate_celestial_coordinates(self, bearing=None, elevation=None):
         """Calculate right ascension and declination using astropy"""
@@ -996,16 +961,22 @@ class TrackingPanel(QWidget):
         return ra, dec
     
 
-    def update_displays(self):
-        """Update all display elements"""
-        # Update bearing display
-        self.bearing_label.setText(f"{self.bearing:.1f}°")
+    def activate(self):
+        super().activate()
+        self.update_timer.start(1000)
+        self.led_plot_timer.start(100)
 
-        # Update tracking parameters
-        self.altitude_label.setText(f"{self.balloon_alt:.1f} m")
-        self.elevation_label.setText(f"{self.elevation:.1f}°")
-        self.distance_label.setText(f"{self.distance:.2f} km")
+    def deactivate(self):
+        super().deactivate()
+        self.update_timer.stop()
+        self.led_plot_timer.stop()
+
+    def resync(self):
+        self.update_displays()
+        self.update_led_timing_plot()
 
+    def update_tracking(self):
+        """Compute the mount target, log it and slew (runs whether or not the tab is shown)"""
         # Slew the telescope mount to the calculated RA/DEC
         # Convert RA to hours as float, DEC to degrees as float
         if self.tracking_enabled:
@@ -1013,14 +984,33 @@ class TrackingPanel(QWidget):
         else:
             pb, pe, _ = self.calculate_parameters_for(self.pred_lat, self.pred_lon, self.pred_alt)
             ra, dec = self.calculate_celestial_coordinates(pb, pe)
-            self.pred_bearing_label.setText(f"{pb:.1f}°")  
-
-        self.ra_label.setText(ra.to_string(unit=u.hour, sep=':'))
-        self.dec_label.setText(dec.to_string(unit=u.deg, sep=':'))
+            self.pred_bearing = pb
+        self.ra, self.dec = ra, dec
 
         # Log tracking data
         self.log_tracking_data()
 
+        if time.time() - self.last_pred_slew_time >= 5:
+            self.safe_slew(ra.hour, dec.degree)
+            self.last_pred_slew_time = time.time()
+
+    def update_displays(self):
+        """Update all display elements"""
+        # Update bearing display
+        self.bearing_label.setText(f"{self.bearing:.1f}°")
+
+        # Update tracking parameters
+        self.altitude_label.setText(f"{self.balloon_alt:.1f} m")
+        self.elevation_label.setText(f"{self.elevation:.1f}°")
+        self.distance_label.setText(f"{self.distance:.2f} km")
+
+        # Mount target from update_tracking()
+        if not self.tracking_enabled and self.pred_bearing is not None:
+            self.pred_bearing_label.setText(f"{self.pred_bearing:.1f}°")
+        if self.ra is not None:
+            self.ra_label.setText(self.ra.to_string(unit=u.hour, sep=':'))
+            self.dec_label.setText(self.dec.to_string(unit=u.deg, sep=':'))
+
         # Update UTC time from ground station GPS if available
         if hasattr(self.telemetry_model, 'gs_gps_utc_unix') and self.telemetry_model.gs_gps_utc_unix > 0:
             # Use ground station GPS UTC time
@@ -1056,10 +1046,6 @@ class TrackingPanel(QWidget):
         # Update LED status based on UTC time (after other status updates)
         self.update_led_status()
 
-        if time.time() - self.last_pred_slew_time >= 5:
-            self.safe_slew(ra.hour, dec.degree)
-            self.last_pred_slew_time = time.time()
-
     def update_status_indicators(self):
         """Update status indicators based on system state"""
         print("DEBUG: Updating status indicators...")
@@ -1356,13 +1342,11 @@ class TrackingPanel(QWidget):
     def set_tracking_enabled(self, enabled:bool):
         self.tracking_enabled = bool(enabled)
     
-    def prediction_loop(self):
-        while True:
-            time.sleep(5)
-            if self.balloon_lat != 0 and self.balloon_lon != 0:
-                self.ekf.update(
-                    self.balloon_lat, 
-                    self.balloon_lon,
-                    self.balloon_alt
-                )
-                self.pred_lat, self.pred_lon, self.pred_alt = self.ekf.get_state()
+    def update_prediction(self):
+        """Extrapolate the balloon position from the GPS fixes of the last 30 s of flight-computer time"""
+        prediction = self.telemetry_model.query.predict(
+            ('gps_lat', 'gps_lon', 'gps_alt'), ahead=5.0, window=30.0, mask='gps_valid')
+        if prediction is not None and prediction['gps_lat'] != 0 and prediction['gps_lon'] != 0:
+            self.pred_lat = prediction['gps_lat']
+            self.pred_lon = prediction['gps_lon']
+            self.pred_alt = prediction['gps_alt']